@@ -47,7 +47,18 @@ def get_db_path() -> Path:
 # Database connection settings for network reliability
 DB_TIMEOUT = 30  # seconds to wait for database lock
 DB_RETRY_ATTEMPTS = 3  # number of retries on failure
-DB_RETRY_DELAY = 1  # seconds between retries
+DB_RETRY_DELAY = 1  # base delay in seconds (doubles each retry, with jitter)
+DB_RETRY_MAX_DELAY = 8  # cap on the delay between retries
+
+# Circuit breaker per remote database file (fail fast while P: is unreachable)
+DB_BREAKER_FAILURE_THRESHOLD = 3  # consecutive failures before the breaker opens
+DB_BREAKER_RESET_TIMEOUT = 30  # seconds before an open breaker lets a trial call through
+DB_PROBE_INTERVAL = 15  # seconds between health probes while a breaker is open
+DB_PROBE_TIMEOUT = 3  # seconds a reachability check may take before the share counts as offline
+
+# Connection pooling (see database/connection.py)
+DB_POOL_MAX_IDLE = 4  # idle connections kept open per database file
+DB_POOL_HEALTH_CHECK_INTERVAL = 30  # seconds idle before a pooled connection is re-checked
 
 
 # ==================== SKU Cache Configuration ====================
@@ -82,3 +93,13 @@ def get_sku_cache_path() -> Path:
 
     cache_dir.mkdir(parents=True, exist_ok=True)
     return cache_dir / 'sku_cache.db'
+
+
+def get_schema_cache_path() -> Path:
+    """Get the local file recording schema versions already verified on this machine."""
+    return get_sku_cache_path().parent / 'schema_versions.json'
+
+
+def get_user_cache_path() -> Path:
+    """Get local user cache path in AppData (lets login work before P: answers)."""
+    return get_sku_cache_path().parent / 'user_cache.db'
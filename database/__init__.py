@@ -28,6 +28,8 @@ from .inventory import (
     update_inventory_item,
     delete_inventory_item,
     move_inventory_to_imported,
+    archive_active_inventory,
+    iter_archive_batch,
     export_inventory_to_csv,
     get_all_imported_inventory,
     get_imported_inventory_count,
@@ -0,0 +1,1053 @@
+"""Time-partitioned archive storage on the P: drive.
+
+A project's archive is a set of partition files, one per
+ARCHIVE_PARTITION_MONTHS months of archive date (imported_at):
+
+    halo_archive_2026_01.db, halo_archive_2026_02.db, ...
+
+plus a small manifest database (halo_archive_manifest.db) with one row per
+partition: its row count, id and archive-date range, whether it is sealed,
+and its checksum once sealed.
+
+- Archiving writes only to the current period's partition, and updates that
+  partition's manifest row in the same transaction. The manifest write lock
+  serializes archivers, which is what keeps ids unique across partitions.
+- The newest ARCHIVE_HOT_PARTITIONS periods stay writable. Older partitions
+  are sealed: checkpointed out of WAL, checksummed and made read-only, then
+  rewritten as a compressed columnar file (database/columnar.py) that
+  replaces the SQLite file. Readers fetch only the columns a query touches.
+- Counts are answered from the manifest. Queries, pages and mirror pulls only
+  open the partitions whose range they need.
+
+The single {project}_imported_inventory.db used before partitioning is folded
+into partitions the first time the archive is used, then renamed aside.
+"""
+
+import hashlib
+import heapq
+import json
+import os
+import re
+import sqlite3
+import stat
+import threading
+import uuid
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from itertools import islice
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import get_db_path, DB_TIMEOUT
+from .columnar import ColumnarReader, write_columnar
+from .connection import get_pool, get_pooled_connection, with_retry, attached_database
+from .migrations import ensure_schema, add_column_if_missing
+from .query import compile_query, like_condition
+from .stamps import get_stamp, stamp_unchanged, remember_stamp
+
+# ==================== Configuration ====================
+ARCHIVE_PARTITION_MONTHS = 1  # months of archive date per partition file (1 = monthly, 3 = quarterly)
+ARCHIVE_HOT_PARTITIONS = 2  # newest periods kept writable; older partitions are sealed
+ARCHIVE_FETCH_SIZE = 500  # rows fetched from P: per round trip
+ARCHIVE_COLUMNAR_READERS = 4  # columnar partitions kept open (with their decoded columns)
+
+_ROW_FIELDS = ["id", "item_sku", "serial_number", "lpn", "location", "repair_state",
+               "entered_by", "created_at", "imported_at", "order_number", "tracking_number"]
+_ROW_COLUMNS = ", ".join(_ROW_FIELDS)
+# Columns free-text search looks in (the same ones as the inventory search box)
+_SEARCH_FIELDS = ["item_sku", "serial_number", "lpn", "order_number", "tracking_number",
+                  "location", "repair_state", "entered_by"]
+# Everything a partition holds, as stored in its columnar file
+_COLUMNAR_FIELDS = _ROW_FIELDS + ["sync_key", "archive_batch"]
+
+_manifests = {}  # {project: partitions as of the manifest stamp remembered for "archive_manifest:{project}"}
+_manifests_lock = threading.Lock()
+_legacy_checked = set()  # projects whose pre-partitioning archive has been looked for
+_legacy_lock = threading.Lock()
+_maintained = set()  # projects whose old partitions have been sealed and converted this process
+_maintained_lock = threading.Lock()
+_columnar_readers = OrderedDict()  # {(path, checksum): ColumnarReader}
+_columnar_readers_lock = threading.Lock()
+
+
+# ==================== Paths ====================
+
+def get_manifest_path(project: str = "ecoflow") -> Path:
+    """Get the archive manifest database path (same directory as users.db)."""
+    return get_db_path().parent / f"{project}_archive_manifest.db"
+
+
+def get_partition_path(project: str, partition_key: str) -> Path:
+    """Get the database path of one archive partition."""
+    return get_db_path().parent / f"{project}_archive_{partition_key}.db"
+
+
+def get_columnar_path(project: str, partition_key: str) -> Path:
+    """Get the compressed columnar file a sealed partition is rewritten to."""
+    return get_db_path().parent / f"{project}_archive_{partition_key}.col"
+
+
+def get_legacy_archive_path(project: str = "ecoflow") -> Path:
+    """Get the single archive database used before partitioning."""
+    return get_db_path().parent / f"{project}_imported_inventory.db"
+
+
+def get_partition_key(timestamp: str) -> str:
+    """Get the partition an ISO archive date belongs to ("YYYY_MM" of the period's first month)."""
+    months = int(timestamp[:4]) * 12 + int(timestamp[5:7]) - 1
+    months -= months % ARCHIVE_PARTITION_MONTHS
+    return f"{months // 12:04d}_{months % 12 + 1:02d}"
+
+
+def _period_bounds(partition_key: str) -> tuple[str, str]:
+    """Get the [start, end) archive-date prefixes a partition key covers."""
+    months = int(partition_key[:4]) * 12 + int(partition_key[5:7]) - 1
+    end = months + ARCHIVE_PARTITION_MONTHS
+    return (f"{months // 12:04d}-{months % 12 + 1:02d}", f"{end // 12:04d}-{end % 12 + 1:02d}")
+
+
+def _hot_cutoff_key() -> str:
+    """Partitions with keys below this are sealed."""
+    now = datetime.now()
+    months = now.year * 12 + now.month - 1
+    months -= months % ARCHIVE_PARTITION_MONTHS
+    months -= (ARCHIVE_HOT_PARTITIONS - 1) * ARCHIVE_PARTITION_MONTHS
+    return f"{months // 12:04d}_{months % 12 + 1:02d}"
+
+
+# ==================== Schema ====================
+
+def _migrate_manifest_v1(cursor):
+    """Partition manifest."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS partitions (
+            partition_key TEXT PRIMARY KEY,
+            file_name TEXT NOT NULL,
+            row_count INTEGER NOT NULL DEFAULT 0,
+            min_id INTEGER,
+            max_id INTEGER,
+            date_from TEXT,
+            date_to TEXT,
+            sealed INTEGER NOT NULL DEFAULT 0,
+            checksum TEXT,
+            updated_at TEXT NOT NULL
+        )
+    """)
+
+
+def _migrate_manifest_v2(cursor):
+    """Partition storage format ('sqlite', or 'columnar' once a sealed partition is rewritten)."""
+    add_column_if_missing(cursor, "partitions", "storage", "TEXT NOT NULL DEFAULT 'sqlite'")
+
+
+_MANIFEST_MIGRATIONS = [
+    (1, "Archive partition manifest", _migrate_manifest_v1),
+    (2, "Columnar storage for sealed partitions", _migrate_manifest_v2),
+]
+
+
+def _migrate_partition_v1(cursor):
+    """Baseline archive schema (also upgrades pre-versioning databases)."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS imported_inventory (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            item_sku TEXT NOT NULL,
+            serial_number TEXT NOT NULL,
+            lpn TEXT NOT NULL,
+            location TEXT DEFAULT '',
+            repair_state TEXT NOT NULL,
+            entered_by TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            imported_at TEXT NOT NULL,
+            order_number TEXT DEFAULT ''
+        )
+    """)
+    # Columns added after the first release (for existing databases)
+    add_column_if_missing(cursor, "imported_inventory", "location", "TEXT DEFAULT ''")
+    add_column_if_missing(cursor, "imported_inventory", "order_number", "TEXT DEFAULT ''")
+    add_column_if_missing(cursor, "imported_inventory", "tracking_number", "TEXT DEFAULT ''")
+
+
+def _migrate_partition_v2(cursor):
+    """Index the archive's display order so pages can be read from any depth."""
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_imported_order ON imported_inventory(imported_at, created_at)
+    """)
+
+
+def _migrate_partition_v3(cursor):
+    """Archive batches, and sync keys so re-running an interrupted move can't duplicate rows."""
+    add_column_if_missing(cursor, "imported_inventory", "sync_key", "TEXT")
+    add_column_if_missing(cursor, "imported_inventory", "archive_batch", "TEXT")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_imported_sync_key ON imported_inventory(sync_key)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_imported_archive_batch ON imported_inventory(archive_batch)")
+
+
+def _migrate_partition_v4(cursor):
+    """Index serial numbers (folding the old archive matches rows on serial + created_at)."""
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_imported_serial ON imported_inventory(serial_number)")
+
+
+def _migrate_partition_v5(cursor):
+    """Case-insensitive serial index for serial: search terms."""
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_imported_serial_nocase ON imported_inventory(serial_number COLLATE NOCASE)
+    """)
+
+
+# Shared by every partition file and the pre-partitioning archive
+_PARTITION_MIGRATIONS = [
+    (1, "Baseline imported inventory table", _migrate_partition_v1),
+    (2, "Index imported_at for archive paging", _migrate_partition_v2),
+    (3, "Archive batches and sync keys", _migrate_partition_v3),
+    (4, "Index serial numbers", _migrate_partition_v4),
+    (5, "Case-insensitive serial index", _migrate_partition_v5),
+]
+
+
+def _get_manifest_connection(project: str):
+    return get_pooled_connection(get_manifest_path(project), timeout=DB_TIMEOUT)
+
+
+def _get_partition_connection(partition: dict):
+    """Get a connection for reading a partition (immutable once sealed)."""
+    return get_pooled_connection(partition["path"], timeout=30, synchronous=None,
+                                 read_only=partition["sealed"])
+
+
+def _ensure_partition_schema(db_path: Path):
+    ensure_schema(lambda: get_pooled_connection(db_path, timeout=DB_TIMEOUT), db_path, _PARTITION_MIGRATIONS)
+
+
+@with_retry
+def init_archive(project: str = "ecoflow"):
+    """Initialize a project's archive manifest, folding in the pre-partitioning archive once.
+
+    Cheap after the first call in a process. Sealing and columnar conversion
+    are left to maintain_archive(), so readers never wait on them.
+    """
+    manifest_path = get_manifest_path(project)
+    ensure_schema(lambda: _get_manifest_connection(project), manifest_path, _MANIFEST_MIGRATIONS)
+
+    with _legacy_lock:
+        if project in _legacy_checked:
+            return
+        if get_legacy_archive_path(project).exists():
+            _fold_legacy_archive(project)
+        _legacy_checked.add(project)
+
+
+def maintain_archive(project: str = "ecoflow"):
+    """Seal the partitions that have left the hot window and convert them to columnar files.
+
+    Runs once per process (from the background sync worker); slow only the
+    first time after partitions age out. Archiving runs it again after each move.
+    """
+    with _maintained_lock:
+        if project in _maintained:
+            return
+        _maintained.add(project)
+    try:
+        init_archive(project)
+        seal_partitions(project)
+    except Exception:
+        with _maintained_lock:
+            _maintained.discard(project)  # Try again on the next sync
+        raise
+
+
+# ==================== Manifest ====================
+
+def get_partitions(project: str = "ecoflow", date_from: date = None, date_to: date = None) -> list[dict]:
+    """Get the partitions holding rows in an archive-date range (inclusive; None = open), newest first.
+
+    Served from memory while the manifest's stamp is unchanged.
+    """
+    init_archive(project)
+    stamp_key = f"archive_manifest:{project}"
+    stamp = get_stamp(get_manifest_path(project))
+    with _manifests_lock:
+        partitions = _manifests.get(project)
+    if partitions is None or not stamp_unchanged(stamp_key, stamp):
+        partitions = _read_manifest(project)
+        with _manifests_lock:
+            _manifests[project] = partitions
+        remember_stamp(stamp_key, stamp)
+
+    start, end = _range_bounds(date_from, date_to)
+    return [
+        partition for partition in partitions
+        if partition["row_count"]
+        and (start is None or partition["date_to"] >= start)
+        and (end is None or partition["date_from"] < end)
+    ]
+
+
+@with_retry
+def _read_manifest(project: str) -> list[dict]:
+    conn = _get_manifest_connection(project)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT partition_key, row_count, min_id, max_id, date_from, date_to, sealed, checksum, storage
+            FROM partitions
+            ORDER BY date_to DESC, partition_key DESC
+        """)
+        return [
+            {
+                "key": row[0],
+                "path": get_partition_path(project, row[0]),
+                "row_count": row[1],
+                "min_id": row[2],
+                "max_id": row[3],
+                "date_from": row[4],
+                "date_to": row[5],
+                "sealed": bool(row[6]),
+                "checksum": row[7],
+                "storage": row[8],
+                "columnar_path": get_columnar_path(project, row[0]),
+            }
+            for row in cursor.fetchall()
+        ]
+    finally:
+        conn.close()
+
+
+def _range_bounds(date_from: date = None, date_to: date = None) -> tuple[str | None, str | None]:
+    """ISO bounds [start, end) for an inclusive date range."""
+    start = date_from.isoformat() if date_from else None
+    end = (date_to + timedelta(days=1)).isoformat() if date_to else None
+    return start, end
+
+
+def _range_condition(date_from: date = None, date_to: date = None) -> tuple[str, tuple]:
+    """SQL condition for rows archived between two dates (inclusive; None = open)."""
+    start, end = _range_bounds(date_from, date_to)
+    conditions = []
+    params = ()
+    if start:
+        conditions.append("imported_at >= ?")
+        params += (start,)
+    if end:
+        conditions.append("imported_at < ?")
+        params += (end,)
+    return " AND ".join(conditions) or "1", params
+
+
+# Recount a partition's manifest row (the partition attached as "archive", the manifest as "manifest")
+_UPDATE_PARTITION_STATS_SQL = """
+    UPDATE manifest.partitions SET
+        (row_count, min_id, max_id, date_from, date_to) = (
+            SELECT COUNT(*), MIN(id), MAX(id), MIN(imported_at), MAX(imported_at)
+            FROM archive.imported_inventory
+        ),
+        updated_at = ?
+    WHERE partition_key = ?
+"""
+
+
+def _register_partition(cursor, project: str, partition_key: str) -> int:
+    """Add a partition to the manifest (inside the write transaction). Returns the archive's max id."""
+    cursor.execute("""
+        INSERT OR IGNORE INTO manifest.partitions (partition_key, file_name, updated_at)
+        VALUES (?, ?, ?)
+    """, (partition_key, get_partition_path(project, partition_key).name, datetime.now().isoformat()))
+    cursor.execute("SELECT COALESCE(MAX(max_id), 0) FROM manifest.partitions")
+    return cursor.fetchone()[0]
+
+
+# ==================== Writes ====================
+
+@with_retry
+def archive_active_inventory(project: str = "ecoflow", up_to_id: int = None) -> tuple[str, int]:
+    """Move all active inventory (or rows with id <= up_to_id) into the current partition.
+
+    The active db, the manifest and the partition are attached to one
+    connection and the move is a single transaction. In WAL mode SQLite
+    commits each file separately, so rows carry their sync_key into the
+    partition (unique there): if the delete never lands, re-running the move
+    moves the copies already archived into the new batch instead of
+    duplicating them.
+
+    Returns (archive_batch, row count); read the rows with iter_archive_batch().
+    """
+    from .inventory import get_connection, init_inventory_db
+
+    init_inventory_db(project)
+    init_archive(project)
+
+    archive_batch = uuid.uuid4().hex
+    imported_at = datetime.now().isoformat()
+    partition_key = get_partition_key(imported_at)
+    partition_path = get_partition_path(project, partition_key)
+    _ensure_partition_schema(partition_path)
+
+    conn = get_connection(project)
+    try:
+        # Manifest before partition: every writer takes the locks in the same order
+        with attached_database(conn, get_manifest_path(project), "manifest"), \
+                attached_database(conn, partition_path, "archive"):
+            cursor = conn.cursor()
+            limit_clause = "id <= ?" if up_to_id is not None else "1"
+            limit_params = (up_to_id,) if up_to_id is not None else ()
+            cursor.execute("BEGIN IMMEDIATE")
+            max_id = _register_partition(cursor, project, partition_key)
+            cursor.execute(f"""
+                INSERT INTO archive.imported_inventory
+                (id, item_sku, serial_number, lpn, location, repair_state, entered_by, created_at,
+                 imported_at, order_number, tracking_number, sync_key, archive_batch)
+                SELECT ? + ROW_NUMBER() OVER (ORDER BY created_at DESC),
+                       item_sku, serial_number, lpn, location, repair_state, entered_by, created_at,
+                       ?, order_number, tracking_number, sync_key, ?
+                FROM main.inventory
+                WHERE {limit_clause}
+                ORDER BY created_at DESC
+                ON CONFLICT(sync_key) DO UPDATE SET
+                    imported_at = excluded.imported_at, archive_batch = excluded.archive_batch
+            """, (max_id, imported_at, archive_batch) + limit_params)
+            cursor.execute(f"DELETE FROM main.inventory WHERE {limit_clause}", limit_params)
+            moved = cursor.rowcount
+            cursor.execute(_UPDATE_PARTITION_STATS_SQL, (datetime.now().isoformat(), partition_key))
+            conn.commit()
+    finally:
+        conn.close()
+
+    seal_partitions(project)
+    return archive_batch, moved
+
+
+def _fold_legacy_archive(project: str):
+    """Copy the pre-partitioning archive into partitions, then rename it aside.
+
+    Rows keep their ids on the first fold, so local mirrors stay valid. A file
+    recreated later by an older app version gets new ids. Rows already in a
+    partition of their period (same serial number and created_at) are skipped,
+    so an interrupted fold can simply run again. Sealed files are never written
+    again: late rows for a sealed period go to a late partition of that period
+    ("YYYY_MM_1", ...), which the readers merge with it.
+    """
+    legacy_path = get_legacy_archive_path(project)
+    _ensure_partition_schema(legacy_path)
+
+    conn = get_pooled_connection(legacy_path, timeout=DB_TIMEOUT)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT DISTINCT substr(imported_at, 1, 7) FROM imported_inventory")
+        partition_keys = sorted({get_partition_key(row[0]) for row in cursor.fetchall()})
+        partitions = _read_manifest(project)
+        keep_ids = not partitions
+        sealed = {partition["key"]: partition for partition in partitions if partition["sealed"]}
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS fold_sealed (serial_number TEXT, created_at TEXT)")
+
+        for partition_key in partition_keys:
+            start, end = _period_bounds(partition_key)
+            target_key = partition_key
+            while target_key in sealed:
+                target_key = f"{partition_key}_{int(target_key[8:] or 0) + 1}"
+            # Rows of the period already in its sealed partitions
+            cursor.execute("DELETE FROM temp.fold_sealed")
+            for key, partition in sealed.items():
+                if key[:7] == partition_key:
+                    cursor.executemany("INSERT INTO temp.fold_sealed VALUES (?, ?)",
+                                       _partition_serial_dates(partition))
+            conn.commit()
+
+            partition_path = get_partition_path(project, target_key)
+            _ensure_partition_schema(partition_path)
+            with attached_database(conn, get_manifest_path(project), "manifest"), \
+                    attached_database(conn, partition_path, "archive"):
+                cursor.execute("BEGIN IMMEDIATE")
+                max_id = _register_partition(cursor, project, target_key)
+                id_expr = "l.id" if keep_ids else "? + ROW_NUMBER() OVER (ORDER BY l.id)"
+                cursor.execute(f"""
+                    INSERT OR IGNORE INTO archive.imported_inventory
+                    (id, item_sku, serial_number, lpn, location, repair_state, entered_by, created_at,
+                     imported_at, order_number, tracking_number, sync_key, archive_batch)
+                    SELECT {id_expr}, l.item_sku, l.serial_number, l.lpn, l.location, l.repair_state,
+                           l.entered_by, l.created_at, l.imported_at, l.order_number, l.tracking_number,
+                           l.sync_key, l.archive_batch
+                    FROM main.imported_inventory l
+                    WHERE l.imported_at >= ? AND l.imported_at < ?
+                      AND NOT EXISTS (
+                          SELECT 1 FROM archive.imported_inventory a
+                          WHERE a.serial_number = l.serial_number AND a.created_at = l.created_at
+                      )
+                      AND NOT EXISTS (
+                          SELECT 1 FROM temp.fold_sealed s
+                          WHERE s.serial_number = l.serial_number AND s.created_at = l.created_at
+                      )
+                """, (() if keep_ids else (max_id,)) + (start, end))
+                cursor.execute(_UPDATE_PARTITION_STATS_SQL, (datetime.now().isoformat(), target_key))
+                conn.commit()
+    finally:
+        try:
+            conn.execute("DROP TABLE IF EXISTS temp.fold_sealed")  # Pooled connection
+        except Exception:
+            pass
+        conn.close()
+
+    # The renamed file stays as a backup; drop our idle handles so the rename can go through
+    get_pool(legacy_path).close_idle()
+    try:
+        os.replace(legacy_path, legacy_path.with_name(
+            f"{legacy_path.name}.folded-{datetime.now().strftime('%Y%m%d%H%M%S')}"))
+    except OSError:
+        pass  # Still open elsewhere; folded again (skipping copied rows) on the next launch
+
+
+def _file_checksum(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def seal_partitions(project: str = "ecoflow") -> list[str]:
+    """Seal partitions older than the hot window. Returns the keys sealed.
+
+    Sealing checkpoints the file out of WAL mode, records its checksum and
+    makes it read-only. A partition another client still has open is left
+    for a later call. Sealed partitions are then rewritten as columnar files.
+    """
+    cutoff = _hot_cutoff_key()
+    candidates = [partition for partition in _read_manifest(project)
+                  if partition["key"] < cutoff and not partition["sealed"]]
+    sealed = []
+    for partition in candidates:
+        path = partition["path"]
+        manifest_conn = _get_manifest_connection(project)
+        try:
+            manifest_cursor = manifest_conn.cursor()
+            # Hold the manifest lock so no archiver writes while the file is sealed
+            manifest_cursor.execute("BEGIN IMMEDIATE")
+            conn = get_pooled_connection(path, timeout=DB_TIMEOUT)
+            try:
+                cursor = conn.cursor()
+                cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                cursor.execute("PRAGMA journal_mode=DELETE")
+                if cursor.fetchone()[0].lower() != "delete":
+                    continue  # Other connections still open
+                cursor.execute("""
+                    SELECT COUNT(*), MIN(id), MAX(id), MIN(imported_at), MAX(imported_at)
+                    FROM imported_inventory
+                """)
+                stats = cursor.fetchone()
+            finally:
+                conn.close()
+                # The pool's connections expect WAL; later reads use the immutable pool
+                get_pool(path).close_idle()
+
+            manifest_cursor.execute("""
+                UPDATE partitions SET
+                    row_count = ?, min_id = ?, max_id = ?, date_from = ?, date_to = ?,
+                    sealed = 1, checksum = ?, updated_at = ?
+                WHERE partition_key = ?
+            """, stats + (_file_checksum(path), datetime.now().isoformat(), partition["key"]))
+            manifest_conn.commit()
+        except Exception:
+            continue
+        finally:
+            manifest_conn.close()
+
+        try:
+            os.chmod(path, stat.S_IREAD | stat.S_IRGRP | stat.S_IROTH)
+        except OSError:
+            pass
+        sealed.append(partition["key"])
+
+    for partition in _read_manifest(project):
+        if partition["sealed"] and partition["storage"] == "sqlite":
+            try:
+                _convert_to_columnar(project, partition)
+            except Exception:
+                pass  # Still readable as SQLite; converted on a later call
+        elif partition["storage"] == "columnar" and partition["path"].exists():
+            _remove_sealed_file(partition["path"])  # Was still open elsewhere last time
+    return sealed
+
+
+def _remove_sealed_file(path: Path):
+    get_pool(path, read_only=True).close_idle()
+    try:
+        os.chmod(path, stat.S_IREAD | stat.S_IWRITE)
+        os.remove(path)
+    except OSError:
+        return
+    for leftover in (f"{path}.epoch", f"{path}-wal", f"{path}-shm"):
+        try:
+            os.remove(leftover)
+        except OSError:
+            pass
+
+
+def _values_digest(values: list) -> bytes:
+    return hashlib.blake2b(json.dumps(values).encode('utf-8'), digest_size=16).digest()
+
+
+def _convert_to_columnar(project: str, partition: dict):
+    """Rewrite a sealed partition as a compressed columnar file, then drop the SQLite file.
+
+    Columns are read one at a time, so only one is held in memory. The file is
+    written under a name unique to this process, read back and compared
+    column by column, then moved into place atomically before the manifest is
+    switched over.
+    """
+    digests = {}
+
+    def read_columns(cursor):
+        for name in _COLUMNAR_FIELDS:
+            cursor.execute(f"""
+                SELECT {name}
+                FROM imported_inventory
+                ORDER BY imported_at DESC, created_at DESC, id DESC
+            """)
+            values = [row[0] for row in cursor]
+            digests[name] = _values_digest(values)
+            yield values
+
+    columnar_path = partition["columnar_path"]
+    part_path = columnar_path.with_name(f"{columnar_path.name}.{os.getpid()}.{uuid.uuid4().hex}.part")
+    try:
+        conn = _get_partition_connection(partition)
+        try:
+            write_columnar(part_path, _COLUMNAR_FIELDS, read_columns(conn.cursor()))
+        finally:
+            conn.close()
+
+        reader = ColumnarReader(part_path)
+        if any(_values_digest(reader.column(name, keep=False)) != digests[name] for name in _COLUMNAR_FIELDS):
+            raise ValueError(f"Columnar rewrite of partition {partition['key']} did not read back")
+        os.replace(part_path, columnar_path)
+    finally:
+        if part_path.exists():
+            os.remove(part_path)
+
+    manifest_conn = _get_manifest_connection(project)
+    try:
+        manifest_conn.execute("""
+            UPDATE partitions SET storage = 'columnar', checksum = ?, updated_at = ?
+            WHERE partition_key = ? AND storage = 'sqlite'
+        """, (_file_checksum(columnar_path), datetime.now().isoformat(), partition["key"]))
+        manifest_conn.commit()
+    finally:
+        manifest_conn.close()
+
+    _remove_sealed_file(partition["path"])
+
+
+def verify_partitions(project: str = "ecoflow") -> list[str]:
+    """Check sealed partitions against their manifest checksums. Returns the keys that differ."""
+    return [partition["key"] for partition in get_partitions(project)
+            if partition["sealed"] and _file_checksum(_partition_file(partition)) != partition["checksum"]]
+
+
+# ==================== Reads ====================
+# Each per-partition read has a SQLite and a columnar version; the public
+# readers below walk the manifest and only touch the partitions they need.
+
+def _row_to_dict(row) -> dict:
+    return {
+        "id": row[0],
+        "item_sku": row[1],
+        "serial_number": row[2],
+        "lpn": row[3],
+        "location": row[4] or '',
+        "repair_state": row[5],
+        "entered_by": row[6],
+        "created_at": row[7],
+        "imported_at": row[8],
+        "order_number": row[9] or '',
+        "tracking_number": row[10] or ''
+    }
+
+
+def _partition_file(partition: dict) -> Path:
+    return partition["columnar_path"] if partition["storage"] == "columnar" else partition["path"]
+
+
+def _get_columnar_reader(partition: dict) -> ColumnarReader:
+    """Get the (cached) reader for a columnar partition; only its header is read up front."""
+    key = (str(partition["columnar_path"]), partition["checksum"])
+    with _columnar_readers_lock:
+        if key in _columnar_readers:
+            _columnar_readers.move_to_end(key)
+            return _columnar_readers[key]
+
+    reader = ColumnarReader(partition["columnar_path"])
+    with _columnar_readers_lock:
+        _columnar_readers[key] = reader
+        while len(_columnar_readers) > ARCHIVE_COLUMNAR_READERS:
+            _columnar_readers.popitem(last=False)
+    return reader
+
+
+def _columnar_range(reader: ColumnarReader, start: str = None, end: str = None) -> range:
+    """Rows archived in [start, end): stored newest first, so always one contiguous slice."""
+    imported_at = reader.column("imported_at")
+    rows = range(reader.rows)
+    first = 0 if end is None else bisect_left(rows, True, key=lambda i: imported_at[i] < end)
+    last = reader.rows if start is None else bisect_left(rows, True, key=lambda i: imported_at[i] < start)
+    return range(first, max(first, last))
+
+
+def _iter_columnar_rows(reader: ColumnarReader, indices, batch_size: int):
+    indices = list(indices)
+    for i in range(0, len(indices), batch_size):
+        yield from reader.take(_ROW_FIELDS, indices[i:i + batch_size])
+
+
+def _iter_partition_rows(partition: dict, query: str, params: tuple, batch_size: int):
+    conn = _get_partition_connection(partition)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        conn.close()
+
+
+def _partition_count(partition: dict, date_from: date = None, date_to: date = None) -> int:
+    if partition["storage"] == "columnar":
+        # Reads only the imported_at column
+        return len(_columnar_range(_get_columnar_reader(partition), *_range_bounds(date_from, date_to)))
+
+    where, params = _range_condition(date_from, date_to)
+    conn = _get_partition_connection(partition)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM imported_inventory WHERE {where}", params)
+        return cursor.fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _partition_rows(partition: dict, date_from: date, date_to: date, batch_size: int):
+    """Rows of one partition in a date range, newest first."""
+    if partition["storage"] == "columnar":
+        reader = _get_columnar_reader(partition)
+        return _iter_columnar_rows(reader, _columnar_range(reader, *_range_bounds(date_from, date_to)),
+                                   batch_size)
+
+    where, params = _range_condition(date_from, date_to)
+    return _iter_partition_rows(partition, f"""
+        SELECT {_ROW_COLUMNS}
+        FROM imported_inventory
+        WHERE {where}
+        ORDER BY imported_at DESC, created_at DESC, id DESC
+    """, params, batch_size)
+
+
+def _partition_rows_after(partition: dict, after_id: int, batch_size: int):
+    """Rows of one partition with ids above after_id, in id order."""
+    if partition["storage"] == "columnar":
+        reader = _get_columnar_reader(partition)
+        ids = reader.column("id")
+        indices = sorted((i for i, row_id in enumerate(ids) if row_id > after_id), key=ids.__getitem__)
+        return _iter_columnar_rows(reader, indices, batch_size)
+
+    return _iter_partition_rows(partition, f"""
+        SELECT {_ROW_COLUMNS}
+        FROM imported_inventory
+        WHERE id > ?
+        ORDER BY id
+    """, (after_id,), batch_size)
+
+
+def _partition_page(partition: dict, limit: int, offset: int) -> list[tuple]:
+    if partition["storage"] == "columnar":
+        reader = _get_columnar_reader(partition)
+        return reader.take(_ROW_FIELDS, range(offset, min(offset + limit, reader.rows)))
+
+    conn = _get_partition_connection(partition)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT {_ROW_COLUMNS}
+            FROM imported_inventory
+            ORDER BY imported_at DESC, created_at DESC, id DESC
+            LIMIT ? OFFSET ?
+        """, (limit, offset))
+        return cursor.fetchall()
+    finally:
+        conn.close()
+
+
+def _partition_page_after(partition: dict, limit: int, after: tuple = None) -> list[tuple]:
+    """Rows after an (imported_at, created_at, id) key in display order, newest first."""
+    if partition["storage"] == "columnar":
+        reader = _get_columnar_reader(partition)
+        first = 0
+        if after is not None:
+            imported_at, created_at, ids = (reader.column(name) for name in ("imported_at", "created_at", "id"))
+            first = bisect_left(range(reader.rows), True,
+                                key=lambda i: (imported_at[i], created_at[i], ids[i]) < after)
+        return reader.take(_ROW_FIELDS, range(first, min(first + limit, reader.rows)))
+
+    condition, params = "", ()
+    if after is not None:
+        condition, params = "WHERE (imported_at, created_at, id) < (?, ?, ?)", tuple(after)
+    conn = _get_partition_connection(partition)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT {_ROW_COLUMNS}
+            FROM imported_inventory
+            {condition}
+            ORDER BY imported_at DESC, created_at DESC, id DESC
+            LIMIT ?
+        """, params + (limit,))
+        return cursor.fetchall()
+    finally:
+        conn.close()
+
+
+def _columnar_search(partition: dict, condition: str, params: list, limit: int) -> tuple[list[tuple], int]:
+    """_partition_search() for a columnar partition.
+
+    Only the columns the condition names are decoded, and SQLite evaluates it
+    over just those to find the matching row indices; only the rows returned
+    are then read in full. Stored order is already the search order.
+    """
+    reader = _get_columnar_reader(partition)
+    names = [name for name in _ROW_FIELDS if re.search(rf"\b{name}\b", condition)]
+    conn = sqlite3.connect(":memory:")
+    try:
+        conn.execute(f"CREATE TABLE imported_inventory ({', '.join(['row_index INTEGER PRIMARY KEY'] + names)})")
+        conn.executemany(f"INSERT INTO imported_inventory VALUES ({', '.join('?' * (len(names) + 1))})",
+                         zip(range(reader.rows), *(reader.column(name) for name in names)))
+        cursor = conn.execute(f"SELECT row_index FROM imported_inventory WHERE {condition} ORDER BY row_index",
+                              params)
+        matches = [row[0] for row in cursor]
+    finally:
+        conn.close()
+    return reader.take(_ROW_FIELDS, matches[:max(limit, 0)]), len(matches)
+
+
+def _partition_search(partition: dict, condition: str, params: list, limit: int,
+                      before: tuple = None) -> tuple[list[tuple], int]:
+    """Rows of a partition matching a search (newest first, up to limit) and how many match in all."""
+    if before is not None:
+        condition = f"({condition}) AND (imported_at, created_at, id) < (?, ?, ?)"
+        params = list(params) + list(before)
+
+    if partition["storage"] == "columnar":
+        return _columnar_search(partition, condition, params, limit)
+
+    conn = _get_partition_connection(partition)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM imported_inventory WHERE {condition}", params)
+        count = cursor.fetchone()[0]
+        rows = []
+        if count and limit > 0:
+            cursor.execute(f"""
+                SELECT {_ROW_COLUMNS}
+                FROM imported_inventory
+                WHERE {condition}
+                ORDER BY imported_at DESC, created_at DESC, id DESC
+                LIMIT ?
+            """, list(params) + [limit])
+            rows = cursor.fetchall()
+        return rows, count
+    finally:
+        conn.close()
+
+
+def _partition_batch_rows(partition: dict, archive_batch: str, batch_size: int):
+    """Rows of one archive batch in a partition, newest first."""
+    if partition["storage"] == "columnar":
+        reader = _get_columnar_reader(partition)
+        # One batch shares one imported_at, so stored order is already created_at DESC
+        indices = [i for i, value in enumerate(reader.column("archive_batch")) if value == archive_batch]
+        return _iter_columnar_rows(reader, indices, batch_size)
+
+    return _iter_partition_rows(partition, f"""
+        SELECT {_ROW_COLUMNS}
+        FROM imported_inventory
+        WHERE archive_batch = ?
+        ORDER BY created_at DESC
+    """, (archive_batch,), batch_size)
+
+
+def _partition_serial_dates(partition: dict):
+    """(serial_number, created_at) of every row of a partition."""
+    if partition["storage"] == "columnar":
+        reader = _get_columnar_reader(partition)
+        return zip(reader.column("serial_number"), reader.column("created_at"))
+    return _iter_partition_rows(partition, "SELECT serial_number, created_at FROM imported_inventory",
+                                (), ARCHIVE_FETCH_SIZE)
+
+
+def _row_key(row: tuple) -> tuple:
+    """A row's position in display order: (imported_at, created_at, id)."""
+    return row[8], row[7], row[0]
+
+
+def _overlapping_groups(partitions: list[dict]):
+    """Split partitions (newest first) into runs whose archive-date ranges overlap.
+
+    Almost every run is a single partition; a late legacy partition runs with
+    the sealed one of its period, and their rows must be merged by _row_key.
+    """
+    group = []
+    for partition in partitions:
+        if group and partition["date_to"] < min(member["date_from"] for member in group):
+            yield group
+            group = []
+        group.append(partition)
+    if group:
+        yield group
+
+
+def _merge_rows(sources: list, limit: int = None) -> list[tuple]:
+    """Merge newest-first row lists/iterators into one, newest first."""
+    return list(islice(heapq.merge(*sources, key=_row_key, reverse=True), limit))
+
+
+def get_archive_count(project: str = "ecoflow", date_from: date = None, date_to: date = None) -> int:
+    """Count archived rows in a date range.
+
+    Partitions entirely inside the range are counted from the manifest; only
+    the ones it cuts through are opened.
+    """
+    start, end = _range_bounds(date_from, date_to)
+    total = 0
+    for partition in get_partitions(project, date_from, date_to):
+        if (start is None or partition["date_from"] >= start) and (end is None or partition["date_to"] < end):
+            total += partition["row_count"]
+        else:
+            total += _partition_count(partition, date_from, date_to)
+    return total
+
+
+def iter_archive_rows(project: str = "ecoflow", date_from: date = None, date_to: date = None,
+                      batch_size: int = ARCHIVE_FETCH_SIZE):
+    """Stream archived rows in a date range (newest first) as tuples, one partition at a time."""
+    for group in _overlapping_groups(get_partitions(project, date_from, date_to)):
+        yield from heapq.merge(*(_partition_rows(partition, date_from, date_to, batch_size)
+                                 for partition in group), key=_row_key, reverse=True)
+
+
+def iter_archived_inventory(project: str = "ecoflow", date_from: date = None, date_to: date = None,
+                            batch_size: int = ARCHIVE_FETCH_SIZE):
+    """Stream archived rows in a date range (newest first) as dicts."""
+    for row in iter_archive_rows(project, date_from, date_to, batch_size):
+        yield _row_to_dict(row)
+
+
+def iter_archive_rows_after(project: str = "ecoflow", after_id: int = 0, batch_size: int = ARCHIVE_FETCH_SIZE):
+    """Stream rows archived with ids above after_id (id order) as tuples.
+
+    Only partitions whose id range reaches past after_id are opened.
+    """
+    partitions = [partition for partition in get_partitions(project) if partition["max_id"] > after_id]
+    for partition in sorted(partitions, key=lambda partition: partition["min_id"]):
+        yield from _partition_rows_after(partition, after_id, batch_size)
+
+
+def iter_archive_serials(project: str = "ecoflow", batch_size: int = ARCHIVE_FETCH_SIZE):
+    """Stream every archived serial number (one column only, in no particular order)."""
+    for partition in get_partitions(project):
+        if partition["storage"] == "columnar":
+            yield from _get_columnar_reader(partition).column("serial_number")
+        else:
+            for (serial,) in _iter_partition_rows(partition, "SELECT serial_number FROM imported_inventory",
+                                                  (), batch_size):
+                yield serial
+
+
+def get_archive_page(project: str = "ecoflow", limit: int = 100, offset: int = 0) -> list[tuple]:
+    """Get one page of the archive (newest first) as tuples.
+
+    Whole partitions before the offset are skipped using the manifest counts.
+    """
+    rows = []
+    for group in _overlapping_groups(get_partitions(project)):
+        group_count = sum(partition["row_count"] for partition in group)
+        if offset >= group_count:
+            offset -= group_count
+            continue
+        wanted = limit - len(rows)
+        if len(group) == 1:
+            rows.extend(_partition_page(group[0], wanted, offset))
+        else:
+            heads = [_partition_page(partition, offset + wanted, 0) for partition in group]
+            rows.extend(_merge_rows(heads, offset + wanted)[offset:])
+        offset = 0
+        if len(rows) >= limit:
+            break
+    return rows
+
+
+def get_archive_page_after(project: str = "ecoflow", limit: int = 100, after: tuple = None) -> list[tuple]:
+    """Get the archive page (newest first) that follows an (imported_at, created_at, id) key.
+
+    None starts at the newest row. Partitions holding only newer rows are
+    skipped using the manifest, so a deep page costs the same as the first.
+    """
+    rows = []
+    for group in _overlapping_groups(get_partitions(project)):
+        group = [partition for partition in group if after is None or partition["date_from"] <= after[0]]
+        wanted = limit - len(rows)
+        rows.extend(_merge_rows([_partition_page_after(partition, wanted, after) for partition in group], wanted))
+        if len(rows) >= limit:
+            break
+    return rows
+
+
+def search_archive(project: str = "ecoflow", search_term: str = "", limit: int = 100,
+                   before: tuple = None) -> tuple[list[tuple], int]:
+    """Search the whole archive with a filter query (database/query.py).
+
+    Returns (rows, count): up to limit matching rows, newest first, and the
+    number of matches in all. before, an (imported_at, created_at, id) key,
+    restricts the search to older rows (e.g. those not mirrored locally).
+    """
+    condition, params = compile_query(search_term, lambda text: like_condition(text, _SEARCH_FIELDS))
+    rows, count = [], 0
+    for group in _overlapping_groups(get_partitions(project)):
+        wanted, found = limit - len(rows), []
+        for partition in group:
+            if before is not None and partition["date_from"] > before[0]:
+                continue
+            partition_rows, matched = _partition_search(partition, condition, params, wanted, before)
+            found.append(partition_rows)
+            count += matched
+        rows.extend(_merge_rows(found, max(wanted, 0)))
+    return rows, count
+
+
+def iter_archive_batch(project: str = "ecoflow", archive_batch: str = "", batch_size: int = ARCHIVE_FETCH_SIZE):
+    """Stream the rows of one archive batch (newest first) without loading them all."""
+    # A batch is written to a single partition, almost always the newest
+    for partition in get_partitions(project):
+        found = False
+        for row in _partition_batch_rows(partition, archive_batch, batch_size):
+            found = True
+            yield _row_to_dict(row)
+        if found:
+            break
+
+
+def get_imported_inventory_count(project: str = "ecoflow") -> int:
+    """Get total count of archived/imported inventory items (from the manifest)."""
+    return sum(partition["row_count"] for partition in get_partitions(project))
+
+
+def get_all_imported_inventory(project: str = "ecoflow", limit: int = None) -> list[dict]:
+    """Get archived inventory, newest first.
+
+    Args:
+        project: The project name (ecoflow or halo)
+        limit: Optional limit on number of records to return (for performance)
+    """
+    if limit:
+        return [_row_to_dict(row) for row in get_archive_page(project, limit, 0)]
+    return list(iter_archived_inventory(project))
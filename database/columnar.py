@@ -0,0 +1,154 @@
+"""Compressed columnar files for data that never changes again (sealed archive partitions).
+
+Layout:
+
+    MAGIC | header length (4 bytes, little endian) | JSON header | column segments
+
+The header lists each column's encoding and the byte ranges of its
+segments, so a reader fetches and decompresses only the columns it touches.
+Each segment is compressed on its own with COLUMNAR_CODEC:
+
+    int    deltas between consecutive values, as 64-bit integers
+    dict   the distinct values (JSON), plus one small integer code per row
+    plain  the values as a JSON list (columns with few repeats, e.g. timestamps)
+
+Rows are stored in whatever order the writer gives them; callers pick an
+order that makes their filters contiguous slices.
+"""
+
+import json
+import lzma
+import struct
+import threading
+import zlib
+from array import array
+from pathlib import Path
+
+MAGIC = b"UPLINKCOL1\n"
+COLUMNAR_CODEC = "lzma"  # "lzma" (smallest) or "zlib" (faster)
+
+_CODECS = {
+    "lzma": (lambda data: lzma.compress(data, preset=6), lzma.decompress),
+    "zlib": (lambda data: zlib.compress(data, 9), zlib.decompress),
+}
+
+
+# ==================== Writing ====================
+
+def _encode_column(values: list, compress: callable) -> tuple[str, list[bytes]]:
+    """Pick an encoding for one column and return (encoding, segments)."""
+    if values and all(type(value) is int for value in values):
+        deltas = array('q', [values[0]] + [b - a for a, b in zip(values, values[1:])])
+        return "int", [compress(deltas.tobytes())]
+
+    dictionary = list(dict.fromkeys(values))
+    if len(dictionary) * 2 <= len(values):
+        codes_type = 'H' if len(dictionary) <= 0xFFFF else 'I'
+        index = {value: code for code, value in enumerate(dictionary)}
+        codes = array(codes_type, [index[value] for value in values])
+        return f"dict:{codes_type}", [compress(json.dumps(dictionary).encode('utf-8')),
+                                      compress(codes.tobytes())]
+
+    return "plain", [compress(json.dumps(values).encode('utf-8'))]
+
+
+def write_columnar(path: Path, columns: list[str], column_values, codec: str = None) -> int:
+    """Write a columnar file. Returns its size in bytes.
+
+    column_values yields one list of values per name in columns, in order; a
+    generator that reads one column at a time keeps only that column (and the
+    compressed segments so far) in memory.
+    """
+    codec = codec or COLUMNAR_CODEC
+    compress = _CODECS[codec][0]
+    header = {"version": 1, "codec": codec, "rows": None, "columns": []}
+    blobs = []
+    offset = 0
+    for name, values in zip(columns, column_values, strict=True):
+        if header["rows"] is None:
+            header["rows"] = len(values)
+        elif len(values) != header["rows"]:
+            raise ValueError(f"Column {name} has {len(values)} values, expected {header['rows']}")
+        encoding, segments = _encode_column(values, compress)
+        ranges = []
+        for segment in segments:
+            ranges.append([offset, len(segment)])
+            offset += len(segment)
+            blobs.append(segment)
+        header["columns"].append({"name": name, "encoding": encoding, "segments": ranges})
+    header["rows"] = header["rows"] or 0
+
+    header_bytes = json.dumps(header).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<I', len(header_bytes)))
+        f.write(header_bytes)
+        for blob in blobs:
+            f.write(blob)
+    return len(MAGIC) + 4 + len(header_bytes) + offset
+
+
+# ==================== Reading ====================
+
+class ColumnarReader:
+    """Reads a columnar file one column at a time (decoded columns are kept)."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not a columnar file: {self.path.name}")
+            (header_length,) = struct.unpack('<I', f.read(4))
+            header = json.loads(f.read(header_length).decode('utf-8'))
+        self._data_start = len(MAGIC) + 4 + header_length
+        self._decompress = _CODECS[header["codec"]][1]
+        self.rows = header["rows"]
+        self._columns = {column["name"]: column for column in header["columns"]}
+        self._decoded = {}
+        self._lock = threading.Lock()
+
+    @property
+    def columns(self) -> list[str]:
+        return list(self._columns)
+
+    def _read_segments(self, column: dict) -> list[bytes]:
+        segments = []
+        with open(self.path, 'rb') as f:
+            for offset, length in column["segments"]:
+                f.seek(self._data_start + offset)
+                segments.append(self._decompress(f.read(length)))
+        return segments
+
+    def column(self, name: str, keep: bool = True) -> list:
+        """Get one column's values (reads and decompresses only that column).
+
+        keep=False decodes it without keeping it (e.g. checking a file once).
+        """
+        with self._lock:
+            if name in self._decoded:
+                return self._decoded[name]
+
+        column = self._columns[name]
+        segments = self._read_segments(column)
+        encoding = column["encoding"]
+        if encoding == "int":
+            values = []
+            total = 0
+            for delta in array('q', segments[0]):
+                total += delta
+                values.append(total)
+        elif encoding.startswith("dict:"):
+            dictionary = json.loads(segments[0].decode('utf-8'))
+            values = [dictionary[code] for code in array(encoding[5:], segments[1])]
+        else:
+            values = json.loads(segments[0].decode('utf-8'))
+
+        if keep:
+            with self._lock:
+                self._decoded[name] = values
+        return values
+
+    def take(self, names: list[str], indices) -> list[tuple]:
+        """Get rows (tuples in names order) at the given row indices (a range or list)."""
+        columns = [self.column(name) for name in names]
+        return [tuple(column[i] for column in columns) for i in indices]
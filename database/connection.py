@@ -0,0 +1,652 @@
+"""Shared SQLite connection manager.
+
+Opening a database on the P: drive costs several SMB round trips (open, lock
+probe, PRAGMA journal_mode, PRAGMA synchronous) before any query runs. This
+module keeps a small pool of long-lived connections per database file (users,
+per-project active/imported inventory, SN lookup and the local AppData caches)
+so repeated calls only pay for the query itself.
+
+Callers keep the familiar pattern:
+
+    conn = get_pooled_connection(path)
+    cursor = conn.cursor()
+    ...
+    conn.close()  # hands the connection back to the pool
+
+A connection that is dropped without close() (an exception escaped first) is
+discarded rather than reused, and idle connections are health-checked before
+being handed out again, so a connection that saw the share drop is replaced
+transparently.
+
+It also owns the shared retry policy for remote files: with_retry() retries
+with jittered exponential backoff, failures are charged to a circuit breaker
+per database file, and an open breaker makes further calls fail fast with
+RemoteOfflineError until a background health probe sees the share again.
+get_remote_status() / add_remote_status_listener() expose the resulting
+"connecting" / "online" / "offline" state so callers can fall back to the
+local caches immediately.
+"""
+
+import atexit
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import (
+    DB_TIMEOUT, DB_POOL_MAX_IDLE, DB_POOL_HEALTH_CHECK_INTERVAL,
+    DB_RETRY_ATTEMPTS, DB_RETRY_DELAY, DB_RETRY_MAX_DELAY,
+    DB_BREAKER_FAILURE_THRESHOLD, DB_BREAKER_RESET_TIMEOUT,
+    DB_PROBE_INTERVAL, DB_PROBE_TIMEOUT
+)
+from .stamps import bump_stamp
+
+logger = logging.getLogger(__name__)
+
+
+class RemoteOfflineError(sqlite3.OperationalError):
+    """Raised instead of touching a remote database whose circuit breaker is open."""
+
+
+class PooledConnection:
+    """Proxy around a pooled sqlite3.Connection.
+
+    Behaves like the wrapped connection, except that close() returns it to
+    its pool instead of closing it, and a commit that changed rows in a remote
+    database bumps its change stamp (see database/stamps.py).
+    """
+
+    def __init__(self, pool: "ConnectionPool", conn: sqlite3.Connection):
+        self._pool = pool
+        self._conn = conn
+        self._changes_mark = conn.total_changes
+
+    def __getattr__(self, name):
+        conn = self.__dict__.get('_conn')
+        if conn is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return getattr(conn, name)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        result = self._conn.__exit__(exc_type, exc_value, traceback)
+        if exc_type is None:
+            self._note_commit()
+        return result
+
+    def commit(self):
+        """Commit, then tell other clients if this connection changed anything."""
+        self._conn.commit()
+        self._note_commit()
+
+    def _note_commit(self):
+        changes = self._conn.total_changes
+        if changes != self._changes_mark:
+            self._changes_mark = changes
+            if self._pool.remote:
+                bump_stamp(self._pool.db_path)
+
+    def close(self):
+        """Return the connection to the pool."""
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            self._pool.release(conn)
+
+    def __del__(self):
+        # Never closed: an exception escaped mid-use, so don't trust it again
+        conn = self.__dict__.get('_conn')
+        if conn is not None:
+            self._conn = None
+            try:
+                self._pool.discard(conn)
+            except Exception:
+                pass
+
+
+class ConnectionPool:
+    """Pool of reusable connections to a single database file.
+
+    Pools for remote files (remote=True) are guarded by a circuit breaker.
+    read_only pools open the file immutable (for sealed files that never change
+    again): no locking, no -wal/-shm files, nothing written to the share.
+    """
+
+    def __init__(self, db_path: Path, timeout: float = DB_TIMEOUT, synchronous: str | None = "NORMAL",
+                 remote: bool = True, read_only: bool = False):
+        self.db_path = Path(db_path)
+        self.timeout = timeout
+        self.synchronous = synchronous
+        self.remote = remote
+        self.read_only = read_only
+        self.breaker = get_breaker(str(self.db_path)) if remote else None
+        self._idle = []  # [(connection, last_used_monotonic)]
+        self._lock = threading.Lock()
+        self._reconnect_pending = False
+        self.stats = {
+            'opened': 0,
+            'reused': 0,
+            'reconnects': 0,
+            'health_check_failures': 0,
+            'discarded': 0,
+            'in_use': 0,
+        }
+
+    def _open(self) -> sqlite3.Connection:
+        """Open a new connection with WAL mode enabled."""
+        if self.remote:
+            # An unreachable share can block an open for a long time; check
+            # (and create) the folder with a deadline first and fail fast.
+            if not _run_with_timeout(lambda: self.db_path.parent.mkdir(parents=True, exist_ok=True),
+                                     DB_PROBE_TIMEOUT):
+                self.breaker.trip()
+                raise RemoteOfflineError(f"Remote folder unreachable: {self.db_path.parent}")
+        else:
+            # Ensure parent directory exists
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        if self.read_only:
+            return sqlite3.connect(self.db_path.as_uri() + "?mode=ro&immutable=1", uri=True,
+                                   timeout=self.timeout, check_same_thread=False)
+
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+
+        # Enable WAL mode for better concurrency on network drives
+        conn.execute("PRAGMA journal_mode=WAL")
+        if self.synchronous:
+            conn.execute(f"PRAGMA synchronous={self.synchronous}")
+
+        return conn
+
+    @staticmethod
+    def _is_healthy(conn: sqlite3.Connection) -> bool:
+        """Cheap liveness probe (reads the database header, so it touches the file)."""
+        try:
+            conn.execute("PRAGMA schema_version").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def acquire(self) -> PooledConnection:
+        """Get an idle connection (health-checked if it sat unused) or open a new one.
+
+        Raises RemoteOfflineError without touching the file while the breaker is open.
+        """
+        if self.remote:
+            if not self.breaker.allow_request():
+                raise RemoteOfflineError(f"Remote database offline: {self.db_path.name}")
+            _note_remote_use(str(self.db_path))
+
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                conn, last_used = self._idle.pop()
+
+            if time.monotonic() - last_used < DB_POOL_HEALTH_CHECK_INTERVAL or self._is_healthy(conn):
+                with self._lock:
+                    self.stats['reused'] += 1
+                    self.stats['in_use'] += 1
+                return PooledConnection(self, conn)
+
+            _close_quietly(conn)
+            with self._lock:
+                self.stats['health_check_failures'] += 1
+                self._reconnect_pending = True
+
+        try:
+            conn = self._open()
+        except RemoteOfflineError:
+            raise
+        except sqlite3.OperationalError:
+            if self.remote:
+                self.breaker.record_failure()
+            raise
+        with self._lock:
+            self.stats['opened'] += 1
+            self.stats['in_use'] += 1
+            if self._reconnect_pending:
+                self.stats['reconnects'] += 1
+                self._reconnect_pending = False
+        return PooledConnection(self, conn)
+
+    def release(self, conn: sqlite3.Connection):
+        """Return a connection to the pool, rolling back any unfinished transaction."""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self.discard(conn)
+            return
+
+        with self._lock:
+            self.stats['in_use'] -= 1
+            if len(self._idle) < DB_POOL_MAX_IDLE:
+                self._idle.append((conn, time.monotonic()))
+                return
+        _close_quietly(conn)
+
+    def discard(self, conn: sqlite3.Connection):
+        """Close a connection that should not be reused."""
+        with self._lock:
+            self.stats['in_use'] -= 1
+            self.stats['discarded'] += 1
+            self._reconnect_pending = True
+        _close_quietly(conn)
+
+    def close_idle(self):
+        """Close all idle connections (next acquire reconnects)."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+            if idle:
+                self._reconnect_pending = True
+        for conn, _last_used in idle:
+            _close_quietly(conn)
+
+    def get_stats(self) -> dict:
+        """Get a snapshot of this pool's statistics."""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['idle'] = len(self._idle)
+        return stats
+
+
+def _close_quietly(conn: sqlite3.Connection):
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+# ==================== Pool Registry ====================
+
+_pools = {}  # {absolute path string (+ "?immutable" for read-only pools): ConnectionPool}
+_pools_lock = threading.Lock()
+
+
+def _path_key(db_path) -> str:
+    # abspath does no I/O, unlike resolve() which would hit the share
+    return os.path.abspath(str(db_path))
+
+
+def get_pool(db_path: Path, timeout: float = DB_TIMEOUT, synchronous: str | None = "NORMAL",
+             remote: bool = True, read_only: bool = False) -> ConnectionPool:
+    """Get (or create) the pool for a database file.
+
+    Pass remote=False for local AppData caches (no circuit breaker), and
+    read_only=True for sealed files that are never written again.
+    """
+    path = _path_key(db_path)
+    key = path + "?immutable" if read_only else path
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(Path(path), timeout=timeout, synchronous=synchronous, remote=remote,
+                                  read_only=read_only)
+            _pools[key] = pool
+        return pool
+
+
+def get_pooled_connection(db_path: Path, timeout: float = DB_TIMEOUT, synchronous: str | None = "NORMAL",
+                          remote: bool = True, read_only: bool = False) -> PooledConnection:
+    """Get a pooled connection to a database file. Call close() to return it."""
+    return get_pool(db_path, timeout, synchronous, remote, read_only).acquire()
+
+
+@contextmanager
+def attached_database(conn, db_path: Path, alias: str, remote: bool = True, writes: bool = True):
+    """Attach another database file to a pooled connection for the duration of a block.
+
+    Lets one connection run set-based statements across two files (e.g.
+    INSERT INTO archive.t SELECT ... FROM main.t). The attached file goes
+    through the same breaker and change stamp as a pooled connection to it;
+    pass writes=False when the block only reads it.
+    """
+    key = str(Path(db_path))
+    if remote:
+        if not get_breaker(key).allow_request():
+            raise RemoteOfflineError(f"Remote database offline: {Path(db_path).name}")
+        _note_remote_use(key)
+
+    conn.commit()  # ATTACH can't run inside a transaction
+    conn.execute(f"ATTACH DATABASE ? AS {alias}", (key,))
+    changes_mark = conn.total_changes
+    try:
+        yield conn
+    finally:
+        # Pooled connections must go back without the attachment
+        if conn.in_transaction:
+            conn.rollback()
+        conn.execute(f"DETACH DATABASE {alias}")
+        if remote and writes and conn.total_changes != changes_mark:
+            bump_stamp(key)
+
+
+def discard_idle_connections():
+    """Drop all idle connections, e.g. after an error suggests the share dropped."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close_idle()
+
+
+def get_pool_stats() -> dict:
+    """Get connection statistics for every pooled database file.
+
+    Returns a dict of {path: {opened, reused, reconnects, health_check_failures,
+    discarded, in_use, idle}}.
+    """
+    with _pools_lock:
+        pools = dict(_pools)
+    return {key: pool.get_stats() for key, pool in pools.items()}
+
+
+def close_all_connections():
+    """Close every idle pooled connection (called at exit)."""
+    discard_idle_connections()
+
+
+atexit.register(close_all_connections)
+
+
+# ==================== Circuit Breakers ====================
+
+class CircuitBreaker:
+    """Per-file circuit breaker: closed -> open after repeated failures -> half-open trial."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """Return False while open; after the reset timeout, let trial calls through."""
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < DB_BREAKER_RESET_TIMEOUT:
+                    return False
+                self.state = self.HALF_OPEN
+            return True
+
+    def record_success(self):
+        with self._lock:
+            was_closed = self.state == self.CLOSED
+            self.state = self.CLOSED
+            self.failures = 0
+        _update_remote_status(success=True)
+        if not was_closed:
+            logger.info(f"Circuit closed for {self.name}")
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            should_open = self.state == self.HALF_OPEN or self.failures >= DB_BREAKER_FAILURE_THRESHOLD
+        if should_open:
+            self.trip()
+
+    def trip(self):
+        """Open the breaker immediately (e.g. the share did not answer at all)."""
+        with self._lock:
+            was_open = self.state == self.OPEN
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+        if not was_open:
+            logger.warning(f"Circuit opened for {self.name}, failing fast until it answers again")
+        _update_remote_status(success=False)
+        _start_probe_thread()
+
+    def is_open(self) -> bool:
+        with self._lock:
+            return self.state != self.CLOSED
+
+
+_breakers = {}  # {absolute path string: CircuitBreaker}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(db_path) -> CircuitBreaker:
+    """Get (or create) the circuit breaker for a database file."""
+    key = _path_key(db_path)
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(key)
+            _breakers[key] = breaker
+        return breaker
+
+
+def get_breaker_states() -> dict:
+    """Get {path: state} for every remote database file seen so far."""
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {key: breaker.state for key, breaker in breakers.items()}
+
+
+# ==================== Remote Status ====================
+
+REMOTE_CONNECTING = "connecting"
+REMOTE_ONLINE = "online"
+REMOTE_OFFLINE = "offline"
+
+_remote_status = REMOTE_CONNECTING
+_remote_status_lock = threading.Lock()
+_remote_status_listeners = []
+
+
+def get_remote_status() -> str:
+    """Get the remote (P: drive) state: "connecting", "online" or "offline"."""
+    with _remote_status_lock:
+        return _remote_status
+
+
+def is_remote_online() -> bool:
+    """True unless a remote database is known to be unreachable."""
+    return get_remote_status() != REMOTE_OFFLINE
+
+
+def add_remote_status_listener(callback: callable):
+    """Register callback(status) for remote status changes.
+
+    Called from whichever thread observed the change; GUI code should hop
+    back to the Tk thread (e.g. with after()).
+    """
+    with _remote_status_lock:
+        _remote_status_listeners.append(callback)
+
+
+def remove_remote_status_listener(callback: callable):
+    """Unregister a remote status listener."""
+    with _remote_status_lock:
+        if callback in _remote_status_listeners:
+            _remote_status_listeners.remove(callback)
+
+
+def _update_remote_status(success: bool):
+    global _remote_status
+    if success:
+        with _breakers_lock:
+            any_open = any(b.state == CircuitBreaker.OPEN for b in _breakers.values())
+        new_status = REMOTE_OFFLINE if any_open else REMOTE_ONLINE
+    else:
+        new_status = REMOTE_OFFLINE
+
+    with _remote_status_lock:
+        if new_status == _remote_status:
+            return
+        _remote_status = new_status
+        listeners = list(_remote_status_listeners)
+
+    logger.info(f"Remote status: {new_status}")
+    for callback in listeners:
+        try:
+            callback(new_status)
+        except Exception:
+            pass
+
+
+# ==================== Health Probe ====================
+
+_probe_thread = None
+_probe_lock = threading.Lock()
+
+
+def _run_with_timeout(func: callable, timeout: float) -> bool:
+    """Run func in a daemon thread; True if it finished without error in time.
+
+    A hung SMB call cannot be interrupted, so on timeout the thread is
+    simply abandoned.
+    """
+    result = {}
+
+    def target():
+        try:
+            func()
+            result['ok'] = True
+        except Exception:
+            result['ok'] = False
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    return result.get('ok', False)
+
+
+def _probe_database(db_path: str) -> bool:
+    """Check that a remote database answers (folder reachable and file readable)."""
+    def probe():
+        # mode=rw: a probe must never create an empty database file
+        conn = sqlite3.connect(Path(db_path).as_uri() + "?mode=rw", uri=True, timeout=DB_PROBE_TIMEOUT)
+        try:
+            conn.execute("PRAGMA schema_version").fetchone()
+        finally:
+            conn.close()
+    return _run_with_timeout(probe, DB_PROBE_TIMEOUT * 2)
+
+
+def _probe_worker():
+    """Probe open breakers until every remote database answers again."""
+    global _probe_thread
+    while True:
+        time.sleep(DB_PROBE_INTERVAL)
+        with _breakers_lock:
+            open_breakers = [b for b in _breakers.values() if b.state != CircuitBreaker.CLOSED]
+        if not open_breakers:
+            with _probe_lock:
+                _probe_thread = None
+            return
+        for breaker in open_breakers:
+            if _probe_database(breaker.name):
+                breaker.record_success()
+
+
+def _start_probe_thread():
+    global _probe_thread
+    with _probe_lock:
+        if _probe_thread is not None and _probe_thread.is_alive():
+            return
+        _probe_thread = threading.Thread(target=_probe_worker, daemon=True)
+        _probe_thread.start()
+
+
+# ==================== Retry Policy ====================
+
+_call_context = threading.local()
+
+
+def _note_remote_use(key: str):
+    """Remember that the current tracked call(s) touched a remote database file."""
+    for used in getattr(_call_context, 'stack', ()):
+        used.add(key)
+
+
+def _is_schema_error(error: sqlite3.OperationalError) -> bool:
+    """True for errors about the schema or SQL rather than reaching the file."""
+    message = str(error).lower()
+    return message.startswith(("no such ", "duplicate column", "table ")) or "syntax error" in message
+
+
+@contextmanager
+def track_remote_call(used: set | None = None):
+    """Charge the outcome of a block to the breakers of the remote files it touched.
+
+    Operational errors (locked, I/O, unreachable) count as failures; anything
+    else (including IntegrityError and schema errors such as a missing table)
+    still means the remote answered.
+    """
+    used = set() if used is None else used
+    stack = getattr(_call_context, 'stack', None)
+    if stack is None:
+        stack = _call_context.stack = []
+    # Nested calls also report into the outer set; only the outermost call
+    # charges the breakers, so one failure is not counted twice.
+    outermost = not stack
+    stack.append(used)
+    try:
+        yield used
+    except RemoteOfflineError:
+        raise
+    except sqlite3.OperationalError as e:
+        if outermost:
+            for key in used:
+                if _is_schema_error(e):
+                    get_breaker(key).record_success()
+                else:
+                    get_breaker(key).record_failure()
+        raise
+    except Exception:
+        if outermost:
+            for key in used:
+                get_breaker(key).record_success()
+        raise
+    else:
+        if outermost:
+            for key in used:
+                get_breaker(key).record_success()
+    finally:
+        stack.pop()
+
+
+def get_retry_delay(attempt: int) -> float:
+    """Jittered exponential backoff delay for a zero-based retry attempt."""
+    delay = min(DB_RETRY_MAX_DELAY, DB_RETRY_DELAY * (2 ** attempt))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def with_retry(func):
+    """Decorator to retry database operations on failure.
+
+    Retries with jittered exponential backoff. Once the circuit breaker of a
+    touched remote file opens, the call fails fast with RemoteOfflineError.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        for attempt in range(DB_RETRY_ATTEMPTS):
+            used = set()
+            try:
+                with track_remote_call(used):
+                    return func(*args, **kwargs)
+            except (RemoteOfflineError, sqlite3.IntegrityError):
+                raise
+            except sqlite3.DatabaseError:
+                if attempt >= DB_RETRY_ATTEMPTS - 1:
+                    raise
+                # Idle connections to the failing files may share the failure
+                for key in used:
+                    get_pool(key).close_idle()
+                time.sleep(get_retry_delay(attempt))
+    return wrapper
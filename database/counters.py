@@ -0,0 +1,102 @@
+"""Trigger-maintained row counters.
+
+COUNT(*) reads a whole table (or index). Instead, a database that needs its
+row counts often keeps them in a row_counters table, one row per
+(table, dimension, value):
+
+    ('inventory', 'total', '')           -> 1234
+    ('inventory', 'sync_status', 'pending') -> 3
+    ('inventory', 'entered_by', 'jsmith')   -> 210
+
+Insert, delete and update triggers keep the counts exact, including for
+writes made by other clients and older app versions. Reading a count is a
+primary-key lookup however big the table grows. install_counters() is called
+from a schema migration, so triggers and seed counts are created atomically.
+
+INSERT OR REPLACE deletes the conflicting row without firing delete triggers
+(recursive_triggers is off), so counted tables use ON CONFLICT DO UPDATE.
+"""
+
+import sqlite3
+
+
+def _dimension_value(row: str, column: str) -> str:
+    return f"COALESCE({row}.{column}, '')"
+
+
+def install_counters(cursor: sqlite3.Cursor, table: str, dimensions: list[str] = ()):
+    """Create (or rebuild) the counters for a table: a total plus one count per value of each column.
+
+    Existing rows are counted once here; the triggers keep the counts current.
+    Rebuilding with fewer columns drops the counters (and triggers) of the others.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS row_counters (
+            table_name TEXT NOT NULL,
+            dimension TEXT NOT NULL,
+            value TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (table_name, dimension, value)
+        ) WITHOUT ROWID
+    """)
+
+    increments = [f"""
+        INSERT INTO row_counters (table_name, dimension, value, count) VALUES ('{table}', 'total', '', 1)
+        ON CONFLICT(table_name, dimension, value) DO UPDATE SET count = count + 1;"""]
+    decrements = [f"""
+        UPDATE row_counters SET count = count - 1
+        WHERE table_name = '{table}' AND dimension = 'total' AND value = '';"""]
+    for column in dimensions:
+        increments.append(f"""
+        INSERT INTO row_counters (table_name, dimension, value, count)
+        VALUES ('{table}', '{column}', {_dimension_value('NEW', column)}, 1)
+        ON CONFLICT(table_name, dimension, value) DO UPDATE SET count = count + 1;""")
+        decrements.append(f"""
+        UPDATE row_counters SET count = count - 1
+        WHERE table_name = '{table}' AND dimension = '{column}' AND value = {_dimension_value('OLD', column)};""")
+
+    # Every counter trigger of the table, including those of columns no longer counted
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = ?", (table,))
+    for (trigger,) in cursor.fetchall():
+        if trigger.startswith(f"trg_{table}_count_"):
+            cursor.execute(f"DROP TRIGGER {trigger}")
+    cursor.execute(f"""
+        CREATE TRIGGER trg_{table}_count_insert AFTER INSERT ON {table}
+        BEGIN{"".join(increments)}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER trg_{table}_count_delete AFTER DELETE ON {table}
+        BEGIN{"".join(decrements)}
+        END
+    """)
+    # An update only moves a row between values of the columns it changed
+    for position, column in enumerate(dimensions):
+        cursor.execute(f"""
+            CREATE TRIGGER trg_{table}_count_update_{column} AFTER UPDATE OF {column} ON {table}
+            WHEN {_dimension_value('OLD', column)} IS NOT {_dimension_value('NEW', column)}
+            BEGIN{decrements[position + 1]}{increments[position + 1]}
+            END
+        """)
+
+    # Seed from the rows already there
+    cursor.execute("DELETE FROM row_counters WHERE table_name = ?", (table,))
+    cursor.execute(f"""
+        INSERT INTO row_counters (table_name, dimension, value, count)
+        SELECT '{table}', 'total', '', COUNT(*) FROM {table}
+    """)
+    for column in dimensions:
+        cursor.execute(f"""
+            INSERT INTO row_counters (table_name, dimension, value, count)
+            SELECT '{table}', '{column}', {_dimension_value(table, column)}, COUNT(*)
+            FROM {table} GROUP BY 3
+        """)
+
+
+def get_counter(cursor: sqlite3.Cursor, table: str, dimension: str = "total", value: str = "") -> int:
+    """Read one count (0 if nothing was ever counted for it)."""
+    cursor.execute("""
+        SELECT count FROM row_counters WHERE table_name = ? AND dimension = ? AND value = ?
+    """, (table, dimension, value))
+    row = cursor.fetchone()
+    return row[0] if row else 0
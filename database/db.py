@@ -1,61 +1,28 @@
 import sqlite3
-import time
 from datetime import datetime
-from functools import wraps
 
 import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from config import get_db_path, DB_TIMEOUT, DB_RETRY_ATTEMPTS, DB_RETRY_DELAY
+from config import get_db_path, DB_TIMEOUT
+from .connection import get_pooled_connection, with_retry
+from .migrations import ensure_schema, add_column_if_missing, get_columns
+from .counters import install_counters, get_counter
+from .stamps import get_stamp, stamp_unchanged, remember_stamp
 
 
 def get_connection():
-    """Get a connection to the SQLite database with WAL mode enabled."""
-    db_path = get_db_path()
-
-    # Ensure parent directory exists
-    db_path.parent.mkdir(parents=True, exist_ok=True)
-
-    conn = sqlite3.connect(db_path, timeout=DB_TIMEOUT)
-
-    # Enable WAL mode for better concurrency on network drives
-    conn.execute("PRAGMA journal_mode=WAL")
-    # Ensure writes are synced to disk
-    conn.execute("PRAGMA synchronous=NORMAL")
-
-    return conn
-
-
-def with_retry(func):
-    """Decorator to retry database operations on failure."""
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        last_error = None
-        for attempt in range(DB_RETRY_ATTEMPTS):
-            try:
-                return func(*args, **kwargs)
-            except sqlite3.OperationalError as e:
-                last_error = e
-                if attempt < DB_RETRY_ATTEMPTS - 1:
-                    time.sleep(DB_RETRY_DELAY)
-                    continue
-                raise
-            except sqlite3.DatabaseError as e:
-                last_error = e
-                if attempt < DB_RETRY_ATTEMPTS - 1:
-                    time.sleep(DB_RETRY_DELAY)
-                    continue
-                raise
-        raise last_error
-    return wrapper
+    """Get a pooled connection to the SQLite database (WAL mode enabled on open).
 
+    close() returns the connection to the pool instead of closing it.
+    """
+    return get_pooled_connection(get_db_path(), timeout=DB_TIMEOUT)
 
-@with_retry
-def init_db():
-    """Initialize the database and create tables if they don't exist."""
-    conn = get_connection()
-    cursor = conn.cursor()
 
+# ==================== Schema ====================
+
+def _migrate_v1(cursor):
+    """Baseline schema (also upgrades databases created before versioning)."""
     # Users table
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS users (
@@ -66,13 +33,7 @@ def init_db():
             is_admin INTEGER DEFAULT 0
         )
     """)
-    # Add is_admin column if it doesn't exist (for existing databases)
-    try:
-        cursor.execute("ALTER TABLE users ADD COLUMN is_admin INTEGER DEFAULT 0")
-    except:
-        pass  # Column already exists
-    # Ensure the 'admin' user always has admin privileges
-    cursor.execute("UPDATE users SET is_admin = 1 WHERE username = 'admin'")
+    add_column_if_missing(cursor, "users", "is_admin", "INTEGER DEFAULT 0")
 
     # Approved SKUs table (with project column for separate lists per project)
     cursor.execute("""
@@ -86,13 +47,9 @@ def init_db():
         )
     """)
 
-    # Migration: Add project column if it doesn't exist (for existing databases)
-    cursor.execute("PRAGMA table_info(approved_skus)")
-    columns = [row[1] for row in cursor.fetchall()]
-    if 'project' not in columns:
-        # Add the project column with default value
-        cursor.execute("ALTER TABLE approved_skus ADD COLUMN project TEXT NOT NULL DEFAULT 'ecoflow'")
-        # Drop old unique constraint and index by recreating the table
+    # Add project column if it doesn't exist (for existing databases)
+    if 'project' not in get_columns(cursor, "approved_skus"):
+        # Drop old unique constraint by recreating the table
         cursor.execute("""
             CREATE TABLE approved_skus_new (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -132,8 +89,28 @@ def init_db():
         INSERT OR IGNORE INTO email_settings (id) VALUES (1)
     """)
 
-    conn.commit()
-    conn.close()
+
+def _migrate_v2(cursor):
+    """Ensure the 'admin' user has admin privileges (older versions created it without)."""
+    cursor.execute("UPDATE users SET is_admin = 1 WHERE username = 'admin'")
+
+
+def _migrate_v3(cursor):
+    """Trigger-maintained approved SKU counts per project."""
+    install_counters(cursor, "approved_skus", ["project"])
+
+
+_MIGRATIONS = [
+    (1, "Baseline users, approved SKUs and email settings", _migrate_v1),
+    (2, "Promote admin user", _migrate_v2),
+    (3, "Approved SKU counters", _migrate_v3),
+]
+
+
+@with_retry
+def init_db():
+    """Initialize the database, applying any schema migrations it hasn't seen yet."""
+    ensure_schema(get_connection, get_db_path(), _MIGRATIONS)
 
 
 @with_retry
@@ -390,11 +367,9 @@ def is_valid_sku(sku: str, project: str = "ecoflow") -> bool:
 
 @with_retry
 def get_sku_count(project: str = "ecoflow") -> int:
-    """Get the total number of approved SKUs for a specific project."""
+    """Get the total number of approved SKUs for a specific project (a counter row, not a scan)."""
     conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT COUNT(*) FROM approved_skus WHERE project = ?", (project.lower(),))
-    count = cursor.fetchone()[0]
+    count = get_counter(conn.cursor(), "approved_skus", "project", project.lower())
     conn.close()
     return count
 
@@ -413,9 +388,28 @@ def clear_all_skus(project: str = "ecoflow") -> int:
 
 # ==================== Email Settings Functions ====================
 
-@with_retry
+_email_settings_cache = None  # Last settings read, valid while users.db's stamp is unchanged
+
+
 def get_email_settings() -> dict:
-    """Get email settings from the database."""
+    """Get email settings from the database.
+
+    Served from memory while the users.db stamp file shows no write since the
+    last read.
+    """
+    global _email_settings_cache
+    stamp = get_stamp(get_db_path())
+    if _email_settings_cache is not None and stamp_unchanged("email_settings", stamp):
+        return dict(_email_settings_cache)
+
+    settings = _read_email_settings()
+    _email_settings_cache = settings
+    remember_stamp("email_settings", stamp)
+    return dict(settings)
+
+
+@with_retry
+def _read_email_settings() -> dict:
     conn = get_connection()
     cursor = conn.cursor()
     cursor.execute("""
@@ -454,6 +448,8 @@ def update_email_settings(
     enabled: bool
 ) -> bool:
     """Update email settings in the database."""
+    global _email_settings_cache
+    _email_settings_cache = None
     conn = get_connection()
     cursor = conn.cursor()
     cursor.execute("""
@@ -0,0 +1,204 @@
+"""Streaming inventory export.
+
+An export is a chain of generators, so memory stays flat however many rows
+are exported:
+
+    iter_active_inventory()   rows from the remote active table, fetched in batches
+    format_inventory_rows()   batches of rows in the project's declared CSV layout
+    write_csv()               writerows() per batch into a .part file
+
+export_active_inventory() runs the chain with progress reporting and
+cancellation, archives exactly the exported rows once the CSV is complete,
+and only then renames the .part file into place. A cancelled or failed export
+leaves neither a partial CSV nor archived rows behind.
+export_archived_inventory() does the same for the archive (optionally one
+date range), reading only the archive partitions that cover the range.
+"""
+
+import csv
+import os
+from datetime import date
+from itertools import islice
+
+from .archive import get_archive_count, iter_archived_inventory
+from .export_formats import get_export_format
+from .inventory import get_connection, init_inventory_db
+
+EXPORT_FETCH_SIZE = 500  # rows fetched from P: per round trip
+EXPORT_WRITE_CHUNK = 500  # rows written (and progress/cancel checked) per chunk
+
+
+class ExportCancelled(Exception):
+    """Raised when an export is cancelled before it completes."""
+
+
+# ==================== Pipeline Stages ====================
+
+def get_active_snapshot(project: str = "ecoflow") -> tuple[int, int]:
+    """Get (row count, max id) of the remote active table; rows above max id are left for next time."""
+    init_inventory_db(project)
+    conn = get_connection(project)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*), COALESCE(MAX(id), 0) FROM inventory")
+        return cursor.fetchone()
+    finally:
+        conn.close()
+
+
+def iter_active_inventory(project: str = "ecoflow", up_to_id: int = None, batch_size: int = EXPORT_FETCH_SIZE):
+    """Stream active inventory rows (newest first) as dicts."""
+    conn = get_connection(project)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT id, item_sku, serial_number, lpn, location, repair_state,
+                   entered_by, created_at, order_number, tracking_number
+            FROM inventory
+            WHERE ? IS NULL OR id <= ?
+            ORDER BY created_at DESC
+        """, (up_to_id, up_to_id))
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield {
+                    "id": row[0],
+                    "item_sku": row[1],
+                    "serial_number": row[2],
+                    "lpn": row[3],
+                    "location": row[4] or '',
+                    "repair_state": row[5],
+                    "entered_by": row[6],
+                    "created_at": row[7],
+                    "order_number": row[8] or '',
+                    "tracking_number": row[9] or ''
+                }
+    finally:
+        conn.close()
+
+
+def format_inventory_rows(items, project: str = "ecoflow", batch_size: int = EXPORT_WRITE_CHUNK,
+                          archive: bool = False):
+    """Turn inventory dicts into batches of the project's CSV rows (header rows first)."""
+    export_format = get_export_format(project, archive)
+    yield list(export_format.headers)
+    items = iter(items)
+    while True:
+        batch = list(islice(items, batch_size))
+        if not batch:
+            break
+        yield export_format.format_batch(batch)
+
+
+def track_progress(items, total: int = 0, progress: callable = None, cancel_event=None,
+                   every: int = EXPORT_WRITE_CHUNK):
+    """Pass items through, reporting progress(done, total) and honouring cancel_event."""
+    done = 0
+    for item in items:
+        if done % every == 0:
+            if cancel_event is not None and cancel_event.is_set():
+                raise ExportCancelled()
+            if progress and done:
+                progress(done, total)
+        yield item
+        done += 1
+    if progress:
+        progress(done, total)
+
+
+def write_csv(row_batches, filepath: str) -> int:
+    """Write batches of CSV rows to a file. Returns the number of rows written."""
+    written = 0
+    with open(filepath, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        for rows in row_batches:
+            writer.writerows(rows)
+            written += len(rows)
+    return written
+
+
+# ==================== Export + Archive ====================
+
+def export_active_inventory(project: str, filepath: str, progress: callable = None, cancel_event=None) -> int:
+    """Export a project's active inventory to CSV and archive the exported rows.
+
+    Args:
+        project: Project name
+        filepath: Destination CSV path (written as filepath + ".part" until complete)
+        progress: Optional progress(done, total) callback, called from this thread
+        cancel_event: Optional threading.Event; setting it aborts before archiving
+
+    Returns the number of items exported. Raises ExportCancelled if cancelled.
+    """
+    from .inventory_cache import force_sync_now, archive_inventory_cached
+
+    # Pending local rows must reach the remote before the snapshot is taken
+    force_sync_now(project)
+    total, max_id = get_active_snapshot(project)
+    if progress:
+        progress(0, total)
+
+    part_path = f"{filepath}.part"
+    exported = 0
+
+    def report(done, total):
+        nonlocal exported
+        exported = done
+        if progress:
+            progress(done, total)
+
+    try:
+        items = track_progress(iter_active_inventory(project, max_id), total, report, cancel_event)
+        write_csv(format_inventory_rows(items, project), part_path)
+        if cancel_event is not None and cancel_event.is_set():
+            raise ExportCancelled()
+        if exported:
+            archive_inventory_cached(project, up_to_id=max_id)
+    except BaseException:
+        try:
+            os.remove(part_path)
+        except OSError:
+            pass
+        raise
+
+    # Rows are archived now; if this fails the finished CSV stays at part_path
+    os.replace(part_path, filepath)
+    return exported
+
+
+def export_archived_inventory(project: str, filepath: str, date_from: date = None, date_to: date = None,
+                              progress: callable = None, cancel_event=None) -> int:
+    """Export archived inventory (optionally one date range) to CSV, streaming from P:.
+
+    Args mirror export_active_inventory(); date_from/date_to filter on the
+    archive date, inclusive. Returns the number of items exported. Raises
+    ExportCancelled if cancelled.
+    """
+    total = get_archive_count(project, date_from, date_to)
+    if progress:
+        progress(0, total)
+
+    part_path = f"{filepath}.part"
+    exported = 0
+
+    def report(done, total):
+        nonlocal exported
+        exported = done
+        if progress:
+            progress(done, total)
+
+    try:
+        items = track_progress(iter_archived_inventory(project, date_from, date_to), total, report, cancel_event)
+        write_csv(format_inventory_rows(items, project, archive=True), part_path)
+        if cancel_event is not None and cancel_event.is_set():
+            raise ExportCancelled()
+        os.replace(part_path, filepath)
+    except BaseException:
+        try:
+            os.remove(part_path)
+        except OSError:
+            pass
+        raise
+    return exported
@@ -0,0 +1,159 @@
+"""Per-project CSV export formats.
+
+Each project declares its columns once, as (header, source) pairs:
+
+    "serial_number"   an inventory field ('0' when empty)
+    "order_number?"   an inventory field ('' when empty)
+    "=57"             a constant
+    "@rec_date"       a derived value (see DERIVED_FIELDS)
+
+get_export_format() compiles a declaration into one getter per column and a
+function that turns a batch of inventory dicts into a list of row tuples for
+csv.writer.writerows(), with no per-row branching on the declaration. Derived values that need a lookup (Halo PO numbers)
+are resolved once per batch. A new client is a new EXPORT_FORMATS entry.
+"""
+
+import threading
+from collections import namedtuple
+
+from .inventory import lookup_halo_po_numbers
+
+# ==================== Declarations ====================
+
+_ECOFLOW_COLUMNS = [
+    ("SN", "serial_number"),
+    ("LPN", "lpn"),
+    ("Location", "location"),
+    ("Client", "=82"),
+    ("PO #", "tracking_number"),
+    ("Order #", "order_number"),
+    ("Item", "item_sku"),
+    ("Rec Date", "@rec_date"),
+    ("Qty", "=1"),
+    ("Qty Free", "=1"),
+    ("Shippable", "=0"),
+    ("Repair State", "repair_state"),
+    ("Firmware", "=0"),
+    ("Program", "=0"),
+    ("Warranty", "=0"),
+    ("Consigned", "=0"),
+    ("PartType", "=0"),
+    ("Grade", "=0"),
+]
+
+EXPORT_FORMATS = {
+    "halo": {
+        "numbered_header": True,
+        "columns": [
+            ("SN", "serial_number"),
+            ("LPN", "lpn"),
+            ("Location", "location"),
+            ("Client", "=57"),
+            ("PONo", "@halo_po"),
+            ("Client Order", "=0"),
+            ("SKU", "item_sku"),
+            ("Asset", "=0"),
+            ("RecDate", "@rec_date"),
+            ("Qty", "=1"),
+            ("Qty Free", "=1"),
+            ("WO #", "=0"),
+            ("Repair State", "repair_state"),
+            ("Grade", "=0"),
+            ("Shippable", "=0"),
+            ("RMA #", "=0"),
+        ],
+    },
+    "ecoflow": {
+        "numbered_header": True,
+        "columns": _ECOFLOW_COLUMNS,
+    },
+    # AMS INE is imported through the same 3PL stock import as EcoFlow
+    "ams_ine": {
+        "numbered_header": True,
+        "columns": _ECOFLOW_COLUMNS,
+    },
+}
+
+# Full-archive exports from the admin panel (plain listing, not a stock import)
+_ARCHIVE_COLUMNS = [
+    ("SKU", "item_sku?"),
+    ("Serial Number", "serial_number?"),
+    ("LPN", "lpn?"),
+    ("Order #", "order_number?"),
+    ("Repair State", "repair_state?"),
+    ("Entered By", "entered_by?"),
+    ("Created", "created_at?"),
+    ("Archived", "imported_at?"),
+]
+
+ARCHIVE_EXPORT_FORMATS = {
+    # Halo has no order numbers
+    "halo": {"columns": [column for column in _ARCHIVE_COLUMNS if column[0] != "Order #"]},
+    "ecoflow": {"columns": _ARCHIVE_COLUMNS},
+    "ams_ine": {"columns": _ARCHIVE_COLUMNS},
+}
+
+# Derived values: name -> f(item, lookups) (lookups holds the batch-resolved values)
+DERIVED_FIELDS = {
+    # ISO timestamp -> "YYYY-MM-DD HH:MM:SS"
+    "rec_date": lambda item, lookups: (item['created_at'] or '')[:19].replace('T', ' ') or '0',
+    "halo_po": lambda item, lookups: lookups['halo_po'].get(item['serial_number']) or '0',
+}
+
+# Batch resolvers for lookup-backed derived values: name -> f(items) -> {key: value}
+BATCH_LOOKUPS = {
+    "halo_po": lambda items: lookup_halo_po_numbers(item['serial_number'] for item in items),
+}
+
+
+# ==================== Compilation ====================
+
+CompiledFormat = namedtuple("CompiledFormat", ["headers", "format_batch"])
+
+_compiled = {}
+_compiled_lock = threading.Lock()
+
+
+def _column_getter(source: str) -> callable:
+    """Get f(item, lookups) -> the column's value for one declared source."""
+    if source.startswith("="):
+        value = source[1:]
+        return lambda item, lookups: value
+    if source.startswith("@"):
+        return DERIVED_FIELDS[source[1:]]
+    if source.endswith("?"):
+        field = source[:-1]
+        return lambda item, lookups: item[field] or ''
+    return lambda item, lookups: item[source] or '0'
+
+
+def compile_export_format(declaration: dict) -> CompiledFormat:
+    """Compile a format declaration into header rows and a batch row function."""
+    columns = declaration["columns"]
+    headers = []
+    if declaration.get("numbered_header"):
+        headers.append(tuple(str(i) for i in range(1, len(columns) + 1)))
+    headers.append(tuple(header for header, _source in columns))
+
+    lookups = sorted({source[1:] for _header, source in columns
+                      if source.startswith("@") and source[1:] in BATCH_LOOKUPS})
+    getters = [_column_getter(source) for _header, source in columns]
+
+    def format_batch(items: list) -> list[tuple]:
+        """Format a batch of inventory dicts as CSV row tuples."""
+        resolved = {name: BATCH_LOOKUPS[name](items) for name in lookups}
+        return [tuple([getter(item, resolved) for getter in getters]) for item in items]
+
+    return CompiledFormat(headers, format_batch)
+
+
+def get_export_format(project: str, archive: bool = False) -> CompiledFormat:
+    """Get the compiled export format for a project (archive=True: full-archive listing)."""
+    formats = ARCHIVE_EXPORT_FORMATS if archive else EXPORT_FORMATS
+    key = (project, archive)
+    with _compiled_lock:
+        if key not in _compiled:
+            if project not in formats:
+                raise ValueError(f"No export format declared for project '{project}'")
+            _compiled[key] = compile_export_format(formats[project])
+        return _compiled[key]
@@ -1,19 +1,33 @@
-import sqlite3
-import time
 import threading
+import time
+import uuid
 from datetime import datetime
-from functools import wraps
 
 import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from config import get_db_path, DB_TIMEOUT, DB_RETRY_ATTEMPTS, DB_RETRY_DELAY
+from config import get_db_path, DB_TIMEOUT
+from .connection import get_pooled_connection, with_retry
+from .migrations import ensure_schema, add_column_if_missing
+from .counters import install_counters, get_counter
+from .archive import (
+    archive_active_inventory,
+    iter_archive_batch,
+    get_all_imported_inventory,
+    get_imported_inventory_count,
+)
+from .stamps import get_stamp, stamp_unchanged, remember_stamp, forget_stamp
 
 # ==================== Halo SN Lookup Cache ====================
 # In-memory cache for Halo PO number lookups to reduce network traffic
 _halo_sn_cache = {}  # {serial_number: po_number}
 _halo_sn_cache_loaded = False
 _halo_sn_cache_lock = threading.Lock()
+_halo_sn_cache_checked_at = 0.0  # monotonic time of the last stamp check
+_halo_sn_cache_checking = False
+
+# Seconds between stamp checks for SN lookup rows imported on other machines
+HALO_SN_CACHE_CHECK_INTERVAL = 60
 
 
 def get_inventory_db_path(project: str = "ecoflow") -> Path:
@@ -23,50 +37,12 @@ def get_inventory_db_path(project: str = "ecoflow") -> Path:
 
 
 def get_connection(project: str = "ecoflow"):
-    """Get a connection to the inventory database with WAL mode enabled."""
-    db_path = get_inventory_db_path(project)
-
-    # Ensure parent directory exists
-    db_path.parent.mkdir(parents=True, exist_ok=True)
-
-    conn = sqlite3.connect(db_path, timeout=DB_TIMEOUT)
-
-    # Enable WAL mode for better concurrency on network drives
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA synchronous=NORMAL")
-
-    return conn
-
-
-def with_retry(func):
-    """Decorator to retry database operations on failure."""
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        last_error = None
-        for attempt in range(DB_RETRY_ATTEMPTS):
-            try:
-                return func(*args, **kwargs)
-            except sqlite3.OperationalError as e:
-                last_error = e
-                if attempt < DB_RETRY_ATTEMPTS - 1:
-                    time.sleep(DB_RETRY_DELAY)
-                    continue
-                raise
-            except sqlite3.DatabaseError as e:
-                last_error = e
-                if attempt < DB_RETRY_ATTEMPTS - 1:
-                    time.sleep(DB_RETRY_DELAY)
-                    continue
-                raise
-        raise last_error
-    return wrapper
+    """Get a pooled connection to the inventory database (WAL mode enabled on open)."""
+    return get_pooled_connection(get_inventory_db_path(project), timeout=DB_TIMEOUT)
 
 
-@with_retry
-def init_inventory_db(project: str = "ecoflow"):
-    """Initialize the inventory database and create the table if it doesn't exist."""
-    conn = get_connection(project)
-    cursor = conn.cursor()
+def _migrate_inventory_v1(cursor):
+    """Baseline active inventory schema (also upgrades pre-versioning databases)."""
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS inventory (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -80,23 +56,117 @@ def init_inventory_db(project: str = "ecoflow"):
             order_number TEXT DEFAULT ''
         )
     """)
-    # Add location column if it doesn't exist (for existing databases)
-    try:
-        cursor.execute("ALTER TABLE inventory ADD COLUMN location TEXT DEFAULT ''")
-    except:
-        pass  # Column already exists
-    # Add order_number column if it doesn't exist (for existing databases)
-    try:
-        cursor.execute("ALTER TABLE inventory ADD COLUMN order_number TEXT DEFAULT ''")
-    except:
-        pass  # Column already exists
-    # Add tracking_number column if it doesn't exist (for existing databases)
-    try:
-        cursor.execute("ALTER TABLE inventory ADD COLUMN tracking_number TEXT DEFAULT ''")
-    except:
-        pass  # Column already exists
+    # Columns added after the first release (for existing databases)
+    add_column_if_missing(cursor, "inventory", "location", "TEXT DEFAULT ''")
+    add_column_if_missing(cursor, "inventory", "order_number", "TEXT DEFAULT ''")
+    add_column_if_missing(cursor, "inventory", "tracking_number", "TEXT DEFAULT ''")
+
+
+def _migrate_inventory_v2(cursor):
+    """Change log: every insert/update/delete gets a monotonically increasing seq.
+
+    Clients pull only entries above their stored high-water mark, so an idle
+    sync is one indexed query returning nothing. The triggers also log writes
+    made by older app versions that don't know about the log.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            row_id INTEGER NOT NULL,
+            op TEXT NOT NULL,
+            changed_at TEXT NOT NULL DEFAULT (datetime('now'))
+        )
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_inventory_log_insert AFTER INSERT ON inventory
+        BEGIN
+            INSERT INTO change_log (row_id, op) VALUES (NEW.id, 'I');
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_inventory_log_update AFTER UPDATE ON inventory
+        BEGIN
+            INSERT INTO change_log (row_id, op) VALUES (NEW.id, 'U');
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_inventory_log_delete AFTER DELETE ON inventory
+        BEGIN
+            INSERT INTO change_log (row_id, op) VALUES (OLD.id, 'D');
+        END
+    """)
+
+
+def _migrate_inventory_v3(cursor):
+    """Stable row identity (sync_key) for idempotent upserts, plus applied push batches."""
+    add_column_if_missing(cursor, "inventory", "sync_key", "TEXT")
+    # Existing rows get a key derived from their id
+    cursor.execute("UPDATE inventory SET sync_key = 'legacy-' || id WHERE sync_key IS NULL")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_inventory_sync_key ON inventory(sync_key)")
+    # Rows inserted by older app versions (no sync_key) get one too
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_inventory_default_sync_key AFTER INSERT ON inventory
+        WHEN NEW.sync_key IS NULL
+        BEGIN
+            UPDATE inventory SET sync_key = 'legacy-' || NEW.id WHERE id = NEW.id;
+        END
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sync_batches (
+            batch_id TEXT PRIMARY KEY,
+            row_count INTEGER NOT NULL,
+            applied_at TEXT NOT NULL DEFAULT (datetime('now'))
+        )
+    """)
+
+
+def _migrate_inventory_v4(cursor):
+    """Trigger-maintained counts (total, per user and repair state)."""
+    install_counters(cursor, "inventory", ["entered_by", "repair_state"])
+
+
+def _migrate_inventory_v5(cursor):
+    """Count the total only; every write to this shared file paid for per-user and state counts nobody read."""
+    install_counters(cursor, "inventory")
+
+
+_INVENTORY_MIGRATIONS = [
+    (1, "Baseline inventory table", _migrate_inventory_v1),
+    (2, "Inventory change log", _migrate_inventory_v2),
+    (3, "Inventory sync keys and push batches", _migrate_inventory_v3),
+    (4, "Row counters", _migrate_inventory_v4),
+    (5, "Drop unread row counters", _migrate_inventory_v5),
+]
+
+
+@with_retry
+def init_inventory_db(project: str = "ecoflow"):
+    """Initialize the inventory database, applying any pending schema migrations."""
+    ensure_schema(lambda: get_connection(project), get_inventory_db_path(project), _INVENTORY_MIGRATIONS)
+
+
+@with_retry
+def prune_change_log(project: str = "ecoflow", retention_days: int = 7) -> int:
+    """Delete change log entries (and applied push batches) older than retention_days.
+
+    The newest entry is always kept so clients can tell how far the log was
+    pruned; a client whose high-water mark falls behind it does a full resync.
+    Returns the number of change log entries removed.
+    """
+    conn = get_connection(project)
+    cursor = conn.cursor()
+    cursor.execute("""
+        DELETE FROM change_log
+        WHERE changed_at < datetime('now', ?)
+          AND seq < (SELECT MAX(seq) FROM change_log)
+    """, (f"-{int(retention_days)} days",))
+    removed = cursor.rowcount
+    cursor.execute("""
+        DELETE FROM sync_batches WHERE applied_at < datetime('now', ?)
+    """, (f"-{int(retention_days)} days",))
     conn.commit()
     conn.close()
+    return removed
 
 
 @with_retry
@@ -112,9 +182,10 @@ def add_inventory_item(item_sku: str, serial_number: str, lpn: str,
     cursor = conn.cursor()
     cursor.execute(
         """INSERT INTO inventory
-           (item_sku, serial_number, lpn, location, repair_state, entered_by, created_at, order_number, tracking_number)
-           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-        (item_sku, serial_number, lpn, location, repair_state, entered_by, datetime.now().isoformat(), order_number, tracking_number)
+           (item_sku, serial_number, lpn, location, repair_state, entered_by, created_at, order_number, tracking_number, sync_key)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        (item_sku, serial_number, lpn, location, repair_state, entered_by, datetime.now().isoformat(), order_number, tracking_number,
+         str(uuid.uuid4()))
     )
     conn.commit()
     item_id = cursor.lastrowid
@@ -164,22 +235,9 @@ def get_all_inventory(project: str = "ecoflow", limit: int = None) -> list[dict]
 
 @with_retry
 def get_inventory_count(project: str = "ecoflow") -> int:
-    """Get total count of active inventory items."""
+    """Get total count of active inventory items (a counter row, not a table scan)."""
     conn = get_connection(project)
-    cursor = conn.cursor()
-    cursor.execute("SELECT COUNT(*) FROM inventory")
-    count = cursor.fetchone()[0]
-    conn.close()
-    return count
-
-
-@with_retry
-def get_imported_inventory_count(project: str = "ecoflow") -> int:
-    """Get total count of archived/imported inventory items."""
-    conn = get_connection(project)
-    cursor = conn.cursor()
-    cursor.execute("SELECT COUNT(*) FROM imported_inventory")
-    count = cursor.fetchone()[0]
+    count = get_counter(conn.cursor(), "inventory")
     conn.close()
     return count
 
@@ -252,222 +310,27 @@ def delete_inventory_item(item_id: int, project: str = "ecoflow") -> bool:
     return affected > 0
 
 
-def get_imported_inventory_db_path(project: str = "ecoflow") -> Path:
-    """Get the imported inventory database path."""
-    users_db = get_db_path()
-    return users_db.parent / f"{project}_imported_inventory.db"
-
-
-def get_imported_connection(project: str = "ecoflow"):
-    """Get a connection to the imported inventory database."""
-    db_path = get_imported_inventory_db_path(project)
-    db_path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(db_path, timeout=DB_TIMEOUT)
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA synchronous=NORMAL")
-    return conn
-
-
-@with_retry
-def init_imported_inventory_db(project: str = "ecoflow"):
-    """Initialize the imported inventory database."""
-    conn = get_imported_connection(project)
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS imported_inventory (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            item_sku TEXT NOT NULL,
-            serial_number TEXT NOT NULL,
-            lpn TEXT NOT NULL,
-            location TEXT DEFAULT '',
-            repair_state TEXT NOT NULL,
-            entered_by TEXT NOT NULL,
-            created_at TEXT NOT NULL,
-            imported_at TEXT NOT NULL,
-            order_number TEXT DEFAULT ''
-        )
-    """)
-    # Add location column if it doesn't exist (for existing databases)
-    try:
-        cursor.execute("ALTER TABLE imported_inventory ADD COLUMN location TEXT DEFAULT ''")
-    except:
-        pass  # Column already exists
-    # Add order_number column if it doesn't exist (for existing databases)
-    try:
-        cursor.execute("ALTER TABLE imported_inventory ADD COLUMN order_number TEXT DEFAULT ''")
-    except:
-        pass  # Column already exists
-    # Add tracking_number column if it doesn't exist (for existing databases)
-    try:
-        cursor.execute("ALTER TABLE imported_inventory ADD COLUMN tracking_number TEXT DEFAULT ''")
-    except:
-        pass  # Column already exists
-    conn.commit()
-    conn.close()
-
-
-@with_retry
 def move_inventory_to_imported(project: str = "ecoflow") -> list[dict]:
     """Move all items from active inventory to imported inventory.
 
-    Returns the list of moved items for CSV export.
+    Returns the list of moved items for CSV export (prefer archive_active_inventory()
+    with iter_archive_batch() for large exports).
     """
-    # Initialize imported db if needed
-    init_imported_inventory_db(project)
-
-    # Get all active inventory items
-    items = get_all_inventory(project)
-
-    if not items:
+    archive_batch, moved = archive_active_inventory(project)
+    if not moved:
         return []
+    return list(iter_archive_batch(project, archive_batch))
 
-    # Insert into imported inventory
-    imported_conn = get_imported_connection(project)
-    imported_cursor = imported_conn.cursor()
-    imported_at = datetime.now().isoformat()
-
-    for item in items:
-        imported_cursor.execute(
-            """INSERT INTO imported_inventory
-               (item_sku, serial_number, lpn, location, repair_state, entered_by, created_at, imported_at, order_number, tracking_number)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-            (item['item_sku'], item['serial_number'], item['lpn'], item.get('location', ''),
-             item['repair_state'], item['entered_by'], item['created_at'], imported_at, item.get('order_number', ''), item.get('tracking_number', ''))
-        )
-
-    imported_conn.commit()
-    imported_conn.close()
-
-    # Clear active inventory
-    active_conn = get_connection(project)
-    active_cursor = active_conn.cursor()
-    active_cursor.execute("DELETE FROM inventory")
-    active_conn.commit()
-    active_conn.close()
 
-    return items
-
-
-@with_retry
-def get_all_imported_inventory(project: str = "ecoflow", limit: int = None) -> list[dict]:
-    """Get all items from the imported inventory database.
-
-    Args:
-        project: The project name (ecoflow or halo)
-        limit: Optional limit on number of records to return (for performance)
-    """
-    init_imported_inventory_db(project)
-
-    conn = get_imported_connection(project)
-    cursor = conn.cursor()
-
-    query = """
-        SELECT id, item_sku, serial_number, lpn, location, repair_state, entered_by, created_at, imported_at, order_number, tracking_number
-        FROM imported_inventory
-        ORDER BY imported_at DESC, created_at DESC
-    """
-    if limit:
-        query += f" LIMIT {limit}"
-
-    cursor.execute(query)
-    rows = cursor.fetchall()
-    conn.close()
-
-    return [
-        {
-            "id": row[0],
-            "item_sku": row[1],
-            "serial_number": row[2],
-            "lpn": row[3],
-            "location": row[4] or '',
-            "repair_state": row[5],
-            "entered_by": row[6],
-            "created_at": row[7],
-            "imported_at": row[8],
-            "order_number": row[9] or '' if len(row) > 9 else '',
-            "tracking_number": row[10] or '' if len(row) > 10 else ''
-        }
-        for row in rows
-    ]
-
-
-def export_inventory_to_csv(items: list[dict], filepath: str, project: str = "ecoflow") -> bool:
-    """Export inventory items to CSV with project-specific format.
+def export_inventory_to_csv(items, filepath: str, project: str = "ecoflow") -> bool:
+    """Export inventory items (any iterable of dicts) to CSV with project-specific format.
 
     Returns True if successful.
     """
-    import csv
+    from .export import format_inventory_rows, write_csv
 
     try:
-        with open(filepath, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-
-            if project == "halo":
-                # Halo format - 16 columns
-                writer.writerow(['1', '2', '3', '4', '5', '6', '7', '8', '9', '10', '11', '12', '13', '14', '15', '16'])
-                writer.writerow(['SN', 'LPN', 'Location', 'Client', 'PONo', 'Client Order', 'SKU', 'Asset', 'RecDate', 'Qty', 'Qty Free', 'WO #', 'Repair State', 'Grade', 'Shippable', 'RMA #'])
-
-                for item in items:
-                    created = item['created_at']
-                    if 'T' in created:
-                        rec_date = created.replace('T', ' ').split('.')[0]
-                    else:
-                        rec_date = created[:19]
-
-                    # Look up PO # from SN lookup table
-                    po_number = lookup_halo_po_number(item['serial_number']) or '0'
-
-                    writer.writerow([
-                        item['serial_number'] or '0',           # SN
-                        item['lpn'] or '0',                     # LPN
-                        item.get('location') or '0',            # Location
-                        '57',                                   # Client
-                        po_number,                              # PONo (from SN lookup)
-                        '0',                                    # Client Order
-                        item['item_sku'] or '0',                # SKU
-                        '0',                                    # Asset
-                        rec_date or '0',                        # RecDate
-                        '1',                                    # Qty
-                        '1',                                    # Qty Free
-                        '0',                                    # WO #
-                        item['repair_state'] or '0',            # Repair State
-                        '0',                                    # Grade
-                        '0',                                    # Shippable
-                        '0'                                     # RMA #
-                    ])
-            else:
-                # EcoFlow format - 18 columns
-                writer.writerow(['1', '2', '3', '4', '5', '6', '7', '8', '9', '10', '11', '12', '13', '14', '15', '16', '17', '18'])
-                writer.writerow(['SN', 'LPN', 'Location', 'Client', 'PO #', 'Order #', 'Item', 'Rec Date', 'Qty', 'Qty Free', 'Shippable', 'Repair State', 'Firmware', 'Program', 'Warranty', 'Consigned', 'PartType', 'Grade'])
-
-                for item in items:
-                    created = item['created_at']
-                    if 'T' in created:
-                        rec_date = created.replace('T', ' ').split('.')[0]
-                    else:
-                        rec_date = created[:19]
-
-                    writer.writerow([
-                        item['serial_number'] or '0',           # SN
-                        item['lpn'] or '0',                     # LPN
-                        item.get('location') or '0',            # Location
-                        '82',                                   # Client
-                        item.get('tracking_number') or '0',     # PO #
-                        item.get('order_number') or '0',        # Order #
-                        item['item_sku'] or '0',                # Item
-                        rec_date or '0',                        # Rec Date
-                        '1',                                    # Qty
-                        '1',                                    # Qty Free
-                        '0',                                    # Shippable
-                        item['repair_state'] or '0',            # Repair State
-                        '0',                                    # Firmware
-                        '0',                                    # Program
-                        '0',                                    # Warranty
-                        '0',                                    # Consigned
-                        '0',                                    # PartType
-                        '0'                                     # Grade
-                    ])
-
+        write_csv(format_inventory_rows(items, project), filepath)
         return True
     except Exception:
         return False
@@ -482,20 +345,12 @@ def get_halo_sn_lookup_db_path() -> Path:
 
 
 def get_sn_lookup_connection():
-    """Get a connection to the Halo SN lookup database."""
-    db_path = get_halo_sn_lookup_db_path()
-    db_path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(db_path, timeout=DB_TIMEOUT)
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA synchronous=NORMAL")
-    return conn
+    """Get a pooled connection to the Halo SN lookup database."""
+    return get_pooled_connection(get_halo_sn_lookup_db_path(), timeout=DB_TIMEOUT)
 
 
-@with_retry
-def init_halo_sn_lookup_db():
-    """Initialize the Halo SN lookup database."""
-    conn = get_sn_lookup_connection()
-    cursor = conn.cursor()
+def _migrate_sn_lookup_v1(cursor):
+    """Baseline SN lookup schema."""
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS sn_lookup (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -504,8 +359,17 @@ def init_halo_sn_lookup_db():
         )
     """)
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_sn_lookup_serial ON sn_lookup(serial_number)")
-    conn.commit()
-    conn.close()
+
+
+_SN_LOOKUP_MIGRATIONS = [
+    (1, "Baseline SN lookup table", _migrate_sn_lookup_v1),
+]
+
+
+@with_retry
+def init_halo_sn_lookup_db():
+    """Initialize the Halo SN lookup database, applying any pending schema migrations."""
+    ensure_schema(get_sn_lookup_connection, get_halo_sn_lookup_db_path(), _SN_LOOKUP_MIGRATIONS)
 
 
 @with_retry
@@ -561,22 +425,58 @@ def _load_halo_sn_cache():
             return
 
         try:
-            init_halo_sn_lookup_db()
-            conn = get_sn_lookup_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT serial_number, po_number FROM sn_lookup")
-            rows = cursor.fetchall()
-            conn.close()
-
-            _halo_sn_cache = {row[0]: row[1] for row in rows}
+            _halo_sn_cache = _read_halo_sn_lookup()
             _halo_sn_cache_loaded = True
         except Exception:
             pass  # Cache remains empty, will fall back to direct lookup
 
 
+def _read_halo_sn_lookup() -> dict:
+    """Read the whole SN lookup table, remembering the stamp it corresponds to."""
+    global _halo_sn_cache_checked_at
+    stamp = get_stamp(get_halo_sn_lookup_db_path())
+    init_halo_sn_lookup_db()
+    conn = get_sn_lookup_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT serial_number, po_number FROM sn_lookup")
+    rows = cursor.fetchall()
+    conn.close()
+
+    remember_stamp("halo_sn_lookup", stamp)
+    _halo_sn_cache_checked_at = time.monotonic()
+    return {row[0]: row[1] for row in rows}
+
+
+def _reload_halo_sn_cache_if_changed():
+    """Reload the SN cache if another machine imported a new lookup CSV."""
+    global _halo_sn_cache, _halo_sn_cache_checking
+    try:
+        if not stamp_unchanged("halo_sn_lookup", get_stamp(get_halo_sn_lookup_db_path())):
+            cache = _read_halo_sn_lookup()
+            with _halo_sn_cache_lock:
+                _halo_sn_cache = cache
+    except Exception:
+        pass  # Keep serving the cache we have
+    finally:
+        _halo_sn_cache_checking = False
+
+
+def _check_halo_sn_cache():
+    """Check the lookup file's stamp in the background at most once per interval."""
+    global _halo_sn_cache_checked_at, _halo_sn_cache_checking
+    with _halo_sn_cache_lock:
+        if (_halo_sn_cache_checking
+                or time.monotonic() - _halo_sn_cache_checked_at < HALO_SN_CACHE_CHECK_INTERVAL):
+            return
+        _halo_sn_cache_checking = True
+        _halo_sn_cache_checked_at = time.monotonic()
+    threading.Thread(target=_reload_halo_sn_cache_if_changed, daemon=True).start()
+
+
 def refresh_halo_sn_cache():
     """Force refresh of the Halo SN cache from database."""
     global _halo_sn_cache_loaded
+    forget_stamp("halo_sn_lookup")
     with _halo_sn_cache_lock:
         _halo_sn_cache_loaded = False
     _load_halo_sn_cache()
@@ -599,12 +499,29 @@ def lookup_halo_po_number(serial_number: str, blocking: bool = True) -> str:
             _load_halo_sn_cache()
         else:
             return ''  # Cache not ready, return empty to avoid blocking
+    else:
+        _check_halo_sn_cache()
 
     # Use cache lookup (instant, no network)
     with _halo_sn_cache_lock:
         return _halo_sn_cache.get(serial_number, '')
 
 
+def lookup_halo_po_numbers(serial_numbers) -> dict:
+    """Look up PO numbers for many Halo serial numbers at once (blocks until the cache is loaded).
+
+    Returns {serial_number: po_number} for the serials that have one.
+    """
+    if not _halo_sn_cache_loaded:
+        _load_halo_sn_cache()
+    else:
+        _check_halo_sn_cache()
+
+    with _halo_sn_cache_lock:
+        cache = _halo_sn_cache
+    return {sn: cache[sn] for sn in serial_numbers if sn in cache}
+
+
 @with_retry
 def get_halo_sn_lookup_count() -> int:
     """Get the number of records in the Halo SN lookup table."""
@@ -5,10 +5,17 @@ database in the background. All writes go to local first for instant response,
 then sync to remote periodically.
 """
 
+import base64
+import hashlib
+import json
+import logging
 import sqlite3
 import threading
 import time
 import os
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
@@ -16,15 +23,50 @@ from typing import Optional
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from config import get_db_path
+from .connection import get_pooled_connection, track_remote_call, is_remote_online, attached_database, RemoteOfflineError
+from .migrations import ensure_schema, add_column_if_missing
+from .counters import install_counters, get_counter
+from .stamps import get_stamp, stamp_unchanged, remember_stamp
+from .query import compile_query, like_condition
+from .archive import (
+    get_manifest_path, get_partitions, get_archive_page, get_archive_page_after, maintain_archive,
+    iter_archive_rows, iter_archive_rows_after, iter_archive_serials, search_archive
+)
+from . import serial_registry
+
+logger = logging.getLogger(__name__)
 
 # ==================== Configuration ====================
-INVENTORY_CACHE_SYNC_INTERVAL = 60  # seconds between syncs (reduced frequency to minimize P: drive contention)
+INVENTORY_PULL_MIN_INTERVAL = 20  # seconds between pulls while remote data is changing
+INVENTORY_PULL_MAX_INTERVAL = 120  # pulls back off to this while nothing changes
+PUSH_DEBOUNCE_SECONDS = 0.75  # local writes within this window are pushed together
+PUSH_MAX_DELAY_SECONDS = 5  # ...but a steady stream of writes is still pushed this often
+INVENTORY_SYNC_MAX_REMOTE = 2  # sync task steps allowed to talk to P: at once (pushes have their own thread)
 INVENTORY_CACHE_ENABLED = True
+CHANGE_LOG_RETENTION_DAYS = 7  # remote change log entries older than this are pruned
+SYNC_PUSH_BATCH_SIZE = 200  # rows per remote write transaction (bounds how long the P: lock is held)
+ARCHIVE_MIRROR_WINDOW = 1000  # newest archived rows mirrored locally (None mirrors the whole archive)
+ARCHIVE_PULL_BATCH_SIZE = 500  # new archive rows downloaded per query
+ARCHIVE_PAGE_CACHE_SIZE = 20  # older archive pages (fetched on demand) kept in memory
 
 # ==================== Local Cache State ====================
 _sync_thread = None
 _sync_stop_event = threading.Event()
 _cache_lock = threading.Lock()
+_sync_stats = {}  # {project: push statistics}
+_sync_stats_lock = threading.Lock()
+
+# Push-on-write scheduling
+_push_thread = None
+_push_event = threading.Event()
+_push_requests = {}  # {project: (first_request, last_request)} monotonic times
+_push_requests_lock = threading.Lock()
+_push_locks = {}  # {project: Lock} so the push worker and pull loop never push concurrently
+_remote_sync_slots = threading.BoundedSemaphore(INVENTORY_SYNC_MAX_REMOTE)
+
+# Archive pages beyond the local mirror: {(project, offset, limit): rows}, least recently used first
+_archive_pages = OrderedDict()
+_archive_pages_lock = threading.Lock()
 
 
 def get_local_inventory_path(project: str = "ecoflow") -> Path:
@@ -39,47 +81,29 @@ def get_local_inventory_path(project: str = "ecoflow") -> Path:
     return cache_dir / f'{project}_inventory_cache.db'
 
 
+def get_local_serial_filter_path(project: str = "ecoflow") -> Path:
+    """Get the saved archive serial filter path in AppData (next to the cache)."""
+    return get_local_inventory_path(project).with_name(f'{project}_archive_serials.bloom')
+
+
 def get_remote_inventory_path(project: str = "ecoflow") -> Path:
     """Get the remote inventory database path on P: drive."""
     users_db = get_db_path()
     return users_db.parent / f"{project}_active_inventory.db"
 
 
-def get_remote_imported_path(project: str = "ecoflow") -> Path:
-    """Get the remote imported inventory database path on P: drive."""
-    users_db = get_db_path()
-    return users_db.parent / f"{project}_imported_inventory.db"
-
-
 def _get_local_connection(project: str = "ecoflow"):
-    """Get connection to local cache database."""
-    db_path = get_local_inventory_path(project)
-    conn = sqlite3.connect(db_path, timeout=5)
-    conn.execute("PRAGMA journal_mode=WAL")
-    return conn
+    """Get pooled connection to local cache database."""
+    return get_pooled_connection(get_local_inventory_path(project), timeout=5, synchronous=None, remote=False)
 
 
 def _get_remote_connection(project: str = "ecoflow"):
-    """Get connection to remote database on P: drive."""
-    db_path = get_remote_inventory_path(project)
-    conn = sqlite3.connect(db_path, timeout=30)
-    conn.execute("PRAGMA journal_mode=WAL")
-    return conn
+    """Get pooled connection to remote database on P: drive."""
+    return get_pooled_connection(get_remote_inventory_path(project), timeout=30, synchronous=None)
 
 
-def _get_remote_imported_connection(project: str = "ecoflow"):
-    """Get connection to remote imported database on P: drive."""
-    db_path = get_remote_imported_path(project)
-    conn = sqlite3.connect(db_path, timeout=30)
-    conn.execute("PRAGMA journal_mode=WAL")
-    return conn
-
-
-def init_local_inventory_cache(project: str = "ecoflow"):
-    """Initialize the local inventory cache database."""
-    conn = _get_local_connection(project)
-    cursor = conn.cursor()
-
+def _migrate_local_v1(cursor):
+    """Baseline local cache schema (also upgrades pre-versioning caches)."""
     # Active inventory table (mirrors remote structure + sync tracking)
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS inventory (
@@ -132,23 +156,161 @@ def init_local_inventory_cache(project: str = "ecoflow"):
     """)
 
     # Add tracking_number column if it doesn't exist (for existing local databases)
+    add_column_if_missing(cursor, "inventory", "tracking_number", "TEXT DEFAULT ''")
+    add_column_if_missing(cursor, "imported_inventory", "tracking_number", "TEXT DEFAULT ''")
+
+
+def _migrate_local_v2(cursor):
+    """Index remote_id so change log deltas can find their local rows."""
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_inventory_remote_id ON inventory(remote_id)")
+
+
+def _migrate_local_v3(cursor):
+    """Stable sync_key per row (matches the remote's key for rows already synced)."""
+    add_column_if_missing(cursor, "inventory", "sync_key", "TEXT")
+    cursor.execute("UPDATE inventory SET sync_key = 'legacy-' || remote_id WHERE sync_key IS NULL AND remote_id IS NOT NULL")
+    cursor.execute("UPDATE inventory SET sync_key = lower(hex(randomblob(16))) WHERE sync_key IS NULL")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_inventory_sync_key ON inventory(sync_key)")
+
+
+def _migrate_local_v4(cursor):
+    """Typed tombstone table for deletions not yet pushed (was sync_metadata 'delete_*' keys)."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS pending_deletes (
+            remote_id INTEGER PRIMARY KEY,
+            serial_number TEXT,
+            sync_key TEXT,
+            deleted_at TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    # Keys look like delete_{project}_{remote_id}
+    cursor.execute(r"""
+        INSERT OR IGNORE INTO pending_deletes (remote_id, deleted_at)
+        SELECT CAST(substr(key, length(rtrim(key, '0123456789')) + 1) AS INTEGER), value
+        FROM sync_metadata
+        WHERE key LIKE 'delete\_%' ESCAPE '\' AND key GLOB '*[0-9]'
+    """)
+    cursor.execute(r"DELETE FROM sync_metadata WHERE key LIKE 'delete\_%' ESCAPE '\'")
+
+
+def _migrate_local_v5(cursor):
+    """Incremental archive mirror: index its display order, restart it from scratch."""
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_imported_order ON imported_inventory(imported_at, created_at)
+    """)
+    # The old 100-row snapshot has no high-water mark; the next pull rebuilds it
+    cursor.execute("DELETE FROM imported_inventory")
+    cursor.execute(r"DELETE FROM sync_metadata WHERE key LIKE 'imported\_count\_%' ESCAPE '\'")
+
+
+def _migrate_local_v6(cursor):
+    """Trigger-maintained counts (total, per sync status, user and repair state)."""
+    install_counters(cursor, "inventory", ["sync_status", "entered_by", "repair_state"])
+    install_counters(cursor, "imported_inventory")
+
+
+# Columns searched by the inventory search box (indexed by inventory_fts)
+_SEARCH_COLUMNS = ["item_sku", "serial_number", "lpn", "order_number", "tracking_number",
+                   "location", "repair_state", "entered_by"]
+
+
+def _migrate_local_v7(cursor):
+    """Trigram full-text index over the searched columns, kept in sync by triggers.
+
+    SQLite builds without FTS5 or the trigram tokenizer (before 3.34) skip
+    it; search then falls back to LIKE.
+    """
+    columns = ", ".join(_SEARCH_COLUMNS)
+    new_values = ", ".join(f"NEW.{column}" for column in _SEARCH_COLUMNS)
+    old_values = ", ".join(f"OLD.{column}" for column in _SEARCH_COLUMNS)
     try:
-        cursor.execute("ALTER TABLE inventory ADD COLUMN tracking_number TEXT DEFAULT ''")
-    except:
-        pass
-    try:
-        cursor.execute("ALTER TABLE imported_inventory ADD COLUMN tracking_number TEXT DEFAULT ''")
-    except:
-        pass
+        cursor.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS inventory_fts USING fts5(
+                {columns}, content='inventory', content_rowid='id', tokenize='trigram'
+            )
+        """)
+    except sqlite3.OperationalError:
+        return
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_inventory_fts_insert AFTER INSERT ON inventory
+        BEGIN
+            INSERT INTO inventory_fts (rowid, {columns}) VALUES (NEW.id, {new_values});
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_inventory_fts_delete AFTER DELETE ON inventory
+        BEGIN
+            INSERT INTO inventory_fts (inventory_fts, rowid, {columns}) VALUES ('delete', OLD.id, {old_values});
+        END
+    """)
+    # Sync status and remote id changes don't touch the index
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_inventory_fts_update AFTER UPDATE OF {columns} ON inventory
+        BEGIN
+            INSERT INTO inventory_fts (inventory_fts, rowid, {columns}) VALUES ('delete', OLD.id, {old_values});
+            INSERT INTO inventory_fts (rowid, {columns}) VALUES (NEW.id, {new_values});
+        END
+    """)
+    cursor.execute("INSERT INTO inventory_fts (inventory_fts) VALUES ('rebuild')")
+
+
+def _migrate_local_v8(cursor):
+    """Index the inventory list order, so keyset pages are index range scans.
 
-    conn.commit()
-    conn.close()
+    The archive mirror's idx_imported_order already ends in the rowid (id).
+    """
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_inventory_created ON inventory(created_at, id)")
+
+
+def _migrate_local_v9(cursor):
+    """Case-insensitive indexes for the filter query fields (sku:, state:, user:, ...).
+
+    Equality and prefix (LIKE 'x%') terms on these columns become index lookups.
+    """
+    for column in ("item_sku", "serial_number", "lpn", "order_number", "tracking_number",
+                   "location", "repair_state", "entered_by"):
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_inventory_{column}_nocase ON inventory({column} COLLATE NOCASE)")
+
+
+def _migrate_local_v10(cursor):
+    """Index archive mirror serials, to confirm serial registry hits locally."""
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_imported_serial_nocase ON imported_inventory(serial_number COLLATE NOCASE)
+    """)
+
+
+def _migrate_local_v11(cursor):
+    """Count inventory by total and sync status only (the push sweep reads the pending count)."""
+    install_counters(cursor, "inventory", ["sync_status"])
+
+
+_LOCAL_MIGRATIONS = [
+    (1, "Baseline local inventory cache", _migrate_local_v1),
+    (2, "Index inventory remote_id", _migrate_local_v2),
+    (3, "Inventory sync keys", _migrate_local_v3),
+    (4, "Pending delete tombstones", _migrate_local_v4),
+    (5, "Incremental archive mirror", _migrate_local_v5),
+    (6, "Row counters", _migrate_local_v6),
+    (7, "Inventory full-text search index", _migrate_local_v7),
+    (8, "Inventory list order index", _migrate_local_v8),
+    (9, "Filter query field indexes", _migrate_local_v9),
+    (10, "Archive mirror serial index", _migrate_local_v10),
+    (11, "Drop unread row counters", _migrate_local_v11),
+]
+
+
+def init_local_inventory_cache(project: str = "ecoflow"):
+    """Initialize the local inventory cache database, applying any pending migrations."""
+    ensure_schema(lambda: _get_local_connection(project), get_local_inventory_path(project),
+                  _LOCAL_MIGRATIONS, remote=False)
 
 
 def init_inventory_cache():
-    """Initialize cache for all projects."""
+    """Initialize cache for all projects, and load their active serials into the serial registry."""
     for project in ["ecoflow", "halo", "ams_ine"]:
         init_local_inventory_cache(project)
+        _load_active_serials(project)
 
 
 # ==================== Write Operations (Local First) ====================
@@ -174,11 +336,15 @@ def add_inventory_item_cached(
             now = datetime.now().isoformat()
             cursor.execute("""
                 INSERT INTO inventory
-                (item_sku, serial_number, lpn, location, repair_state, entered_by, created_at, order_number, tracking_number, sync_status, last_modified)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'pending', ?)
-            """, (item_sku, serial_number, lpn, location, repair_state, entered_by, now, order_number, tracking_number, now))
+                (item_sku, serial_number, lpn, location, repair_state, entered_by, created_at, order_number, tracking_number,
+                 sync_status, last_modified, sync_key)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'pending', ?, ?)
+            """, (item_sku, serial_number, lpn, location, repair_state, entered_by, now, order_number, tracking_number,
+                  now, str(uuid.uuid4())))
 
             conn.commit()
+            serial_registry.add_active_serial(project, serial_number)
+            _request_push(project)
             return True
         except sqlite3.IntegrityError:
             return False
@@ -207,6 +373,9 @@ def update_inventory_item_cached(
             conn = _get_local_connection(project)
             cursor = conn.cursor()
 
+            cursor.execute("SELECT serial_number FROM inventory WHERE id = ?", (item_id,))
+            row = cursor.fetchone()
+
             now = datetime.now().isoformat()
             cursor.execute("""
                 UPDATE inventory
@@ -216,6 +385,9 @@ def update_inventory_item_cached(
             """, (item_sku, serial_number, lpn, location, repair_state, order_number, tracking_number, now, item_id))
 
             conn.commit()
+            if row:
+                serial_registry.replace_active_serial(project, row[0], serial_number)
+            _request_push(project)
             return True
         except Exception:
             return False
@@ -232,22 +404,25 @@ def delete_inventory_item_cached(item_id: int, project: str = "ecoflow") -> bool
             conn = _get_local_connection(project)
             cursor = conn.cursor()
 
-            # Get remote_id before deleting
-            cursor.execute("SELECT remote_id FROM inventory WHERE id = ?", (item_id,))
+            # Get remote identity before deleting
+            cursor.execute("SELECT remote_id, serial_number, sync_key FROM inventory WHERE id = ?", (item_id,))
             row = cursor.fetchone()
             remote_id = row[0] if row else None
 
             # Delete locally
             cursor.execute("DELETE FROM inventory WHERE id = ?", (item_id,))
 
-            # Track deletion for sync if it was synced
+            # Leave a tombstone for sync if it was synced
             if remote_id:
                 cursor.execute("""
-                    INSERT OR REPLACE INTO sync_metadata (key, value)
-                    VALUES (?, ?)
-                """, (f"delete_{project}_{remote_id}", datetime.now().isoformat()))
+                    INSERT OR REPLACE INTO pending_deletes (remote_id, serial_number, sync_key, deleted_at)
+                    VALUES (?, ?, ?, ?)
+                """, (remote_id, row[1], row[2], datetime.now().isoformat()))
 
             conn.commit()
+            if row:
+                serial_registry.remove_active_serials(project, [row[1]])
+            _request_push(project)
             return True
         except Exception:
             return False
@@ -258,59 +433,128 @@ def delete_inventory_item_cached(item_id: int, project: str = "ecoflow") -> bool
 
 # ==================== Read Operations (Local Only) ====================
 
+_INVENTORY_COLUMNS = """
+    id, item_sku, serial_number, lpn, location, repair_state,
+    entered_by, created_at, order_number, tracking_number, sync_status
+"""
+
+
+def _inventory_row_to_dict(row) -> dict:
+    return {
+        "id": row[0],
+        "item_sku": row[1],
+        "serial_number": row[2],
+        "lpn": row[3],
+        "location": row[4] or '',
+        "repair_state": row[5],
+        "entered_by": row[6],
+        "created_at": row[7],
+        "order_number": row[8] or '',
+        "tracking_number": row[9] or '',
+        "sync_status": row[10]
+    }
+
+
+def _limit_clause(limit: int = None, offset: int = 0) -> tuple[str, tuple]:
+    """LIMIT/OFFSET clause and params for the offset-based listing functions."""
+    if not limit:
+        return "", ()
+    return " LIMIT ? OFFSET ?", (limit, offset or 0)
+
+
+def encode_page_token(key: tuple) -> str:
+    """Opaque continuation token for the row a page ended on (its sort key)."""
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode('utf-8')).decode('ascii')
+
+
+def decode_page_token(token: str | None) -> tuple | None:
+    """Sort key from a continuation token (None, or an unreadable token, starts at the first page)."""
+    if not token:
+        return None
+    try:
+        return tuple(json.loads(base64.urlsafe_b64decode(token.encode('ascii'))))
+    except (ValueError, TypeError):
+        return None
+
+
 def get_all_inventory_cached(project: str = "ecoflow", limit: int = None, offset: int = 0) -> list[dict]:
-    """Get inventory items from local cache (fast)."""
+    """Get inventory items from local cache (fast).
+
+    Prefer get_inventory_page_cached() for paging: OFFSET reads every row it skips.
+    """
     conn = None
     try:
         conn = _get_local_connection(project)
         cursor = conn.cursor()
 
-        query = """
-            SELECT id, item_sku, serial_number, lpn, location, repair_state,
-                   entered_by, created_at, order_number, tracking_number, sync_status
+        limit_sql, limit_params = _limit_clause(limit, offset)
+        cursor.execute(f"""
+            SELECT {_INVENTORY_COLUMNS}
             FROM inventory
-            ORDER BY created_at DESC
-        """
-        if limit:
-            query += f" LIMIT {limit}"
-            if offset:
-                query += f" OFFSET {offset}"
+            ORDER BY created_at DESC, id DESC
+        """ + limit_sql, limit_params)
+        return [_inventory_row_to_dict(row) for row in cursor.fetchall()]
+    except Exception:
+        return []
+    finally:
+        if conn:
+            conn.close()
 
-        cursor.execute(query)
-        rows = cursor.fetchall()
 
-        return [
-            {
-                "id": row[0],
-                "item_sku": row[1],
-                "serial_number": row[2],
-                "lpn": row[3],
-                "location": row[4] or '',
-                "repair_state": row[5],
-                "entered_by": row[6],
-                "created_at": row[7],
-                "order_number": row[8] or '',
-                "tracking_number": row[9] or '',
-                "sync_status": row[10]
-            }
-            for row in rows
-        ]
+def get_inventory_page_cached(project: str = "ecoflow", limit: int = 20, token: str = None,
+                              search_term: str = None) -> tuple[list[dict], str | None]:
+    """Get one page of inventory (newest first), optionally filtered by a search term.
+
+    Pages are keyed on (created_at, id) rather than an offset: token is the
+    continuation token returned with the previous page (None for the first
+    page). Every page is one index range scan, and rows inserted or deleted
+    by the background sync never shift rows between pages.
+
+    Returns (items, next_token); next_token is None on the last page.
+    """
+    conn = None
+    try:
+        conn = _get_local_connection(project)
+        cursor = conn.cursor()
+
+        conditions, params = [], []
+        if search_term:
+            condition, params = _search_condition(cursor, search_term)
+            conditions.append(condition)
+        after = decode_page_token(token)
+        if after is not None:
+            conditions.append("(created_at, id) < (?, ?)")
+            params += list(after)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        # One extra row tells whether there is a next page
+        cursor.execute(f"""
+            SELECT {_INVENTORY_COLUMNS}
+            FROM inventory
+            {where}
+            ORDER BY created_at DESC, id DESC
+            LIMIT ?
+        """, params + [limit + 1])
+        rows = cursor.fetchall()
     except Exception:
-        return []
+        return [], None
     finally:
         if conn:
             conn.close()
 
+    items = [_inventory_row_to_dict(row) for row in rows[:limit]]
+    next_token = None
+    if len(rows) > limit:
+        next_token = encode_page_token((items[-1]["created_at"], items[-1]["id"]))
+    return items, next_token
+
 
 def get_inventory_count_cached(project: str = "ecoflow") -> int:
-    """Get total inventory count from local cache."""
+    """Get total inventory count from local cache (a counter row, not a table scan)."""
     conn = None
     try:
         conn = _get_local_connection(project)
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM inventory")
-        count = cursor.fetchone()[0]
-        return count
+        return get_counter(conn.cursor(), "inventory")
     except Exception:
         return 0
     finally:
@@ -318,48 +562,46 @@ def get_inventory_count_cached(project: str = "ecoflow") -> int:
             conn.close()
 
 
+def _search_condition(cursor, search_term: str) -> tuple[str, list]:
+    """WHERE condition (and params) for a search box query (see database/query.py).
+
+    Field terms (sku:, state:, date:, ...) use the column indexes; the rest
+    is free text matched anywhere in the searched columns.
+    """
+    return compile_query(search_term, lambda text: _text_condition(cursor, text))
+
+
+def _text_condition(cursor, search_term: str) -> tuple[str, list]:
+    """WHERE condition (and params) matching search_term anywhere in the searched columns.
+
+    Terms of three or more characters are looked up in the trigram index;
+    shorter ones, and caches without the index, fall back to LIKE.
+    """
+    if len(search_term) >= 3:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'inventory_fts'")
+        if cursor.fetchone():
+            phrase = '"' + search_term.replace('"', '""') + '"'
+            return "id IN (SELECT rowid FROM inventory_fts WHERE inventory_fts MATCH ?)", [phrase]
+
+    return like_condition(search_term, _SEARCH_COLUMNS)
+
+
 def search_inventory_cached(search_term: str, project: str = "ecoflow", limit: int = None, offset: int = 0) -> list[dict]:
-    """Search inventory items in local cache across all text fields."""
+    """Search inventory items in local cache: free text across all text fields, plus field filters (database/query.py)."""
     conn = None
     try:
         conn = _get_local_connection(project)
         cursor = conn.cursor()
 
-        like = f"%{search_term}%"
-        query = """
-            SELECT id, item_sku, serial_number, lpn, location, repair_state,
-                   entered_by, created_at, order_number, tracking_number, sync_status
+        condition, params = _search_condition(cursor, search_term)
+        limit_sql, limit_params = _limit_clause(limit, offset)
+        cursor.execute(f"""
+            SELECT {_INVENTORY_COLUMNS}
             FROM inventory
-            WHERE item_sku LIKE ? OR serial_number LIKE ? OR lpn LIKE ?
-               OR order_number LIKE ? OR tracking_number LIKE ? OR location LIKE ?
-               OR repair_state LIKE ? OR entered_by LIKE ?
-            ORDER BY created_at DESC
-        """
-        params = [like] * 8
-        if limit:
-            query += f" LIMIT {limit}"
-            if offset:
-                query += f" OFFSET {offset}"
-
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-
-        return [
-            {
-                "id": row[0],
-                "item_sku": row[1],
-                "serial_number": row[2],
-                "lpn": row[3],
-                "location": row[4] or '',
-                "repair_state": row[5],
-                "entered_by": row[6],
-                "created_at": row[7],
-                "order_number": row[8] or '',
-                "tracking_number": row[9] or '',
-                "sync_status": row[10]
-            }
-            for row in rows
-        ]
+            WHERE {condition}
+            ORDER BY created_at DESC, id DESC
+        """ + limit_sql, params + list(limit_params))
+        return [_inventory_row_to_dict(row) for row in cursor.fetchall()]
     except Exception:
         return []
     finally:
@@ -373,13 +615,8 @@ def search_inventory_count_cached(search_term: str, project: str = "ecoflow") ->
     try:
         conn = _get_local_connection(project)
         cursor = conn.cursor()
-        like = f"%{search_term}%"
-        cursor.execute("""
-            SELECT COUNT(*) FROM inventory
-            WHERE item_sku LIKE ? OR serial_number LIKE ? OR lpn LIKE ?
-               OR order_number LIKE ? OR tracking_number LIKE ? OR location LIKE ?
-               OR repair_state LIKE ? OR entered_by LIKE ?
-        """, [like] * 8)
+        condition, params = _search_condition(cursor, search_term)
+        cursor.execute(f"SELECT COUNT(*) FROM inventory WHERE {condition}", params)
         return cursor.fetchone()[0]
     except Exception:
         return 0
@@ -388,64 +625,222 @@ def search_inventory_count_cached(search_term: str, project: str = "ecoflow") ->
             conn.close()
 
 
+_IMPORTED_COLUMNS = """
+    id, item_sku, serial_number, lpn, location, repair_state,
+    entered_by, created_at, imported_at, order_number, tracking_number
+"""
+
+
+def _imported_row_to_dict(row) -> dict:
+    return {
+        "id": row[0],
+        "item_sku": row[1],
+        "serial_number": row[2],
+        "lpn": row[3],
+        "location": row[4] or '',
+        "repair_state": row[5],
+        "entered_by": row[6],
+        "created_at": row[7],
+        "imported_at": row[8],
+        "order_number": row[9] or '',
+        "tracking_number": row[10] or ''
+    }
+
+
+def _get_imported_total(local_cursor, project: str) -> int | None:
+    """Get the archive's total row count as of the last pull (None = never pulled)."""
+    local_cursor.execute("SELECT value FROM sync_metadata WHERE key = ?", (f"imported_count_{project}",))
+    row = local_cursor.fetchone()
+    try:
+        return int(row[0]) if row else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _fetch_archive_page(project: str, limit: int, offset: int = 0, after: tuple = None) -> list | None:
+    """Fetch an archive page beyond the local mirror from remote (LRU cached).
+
+    The page starts at offset, or (when offset is 0) after an
+    (imported_at, created_at, id) key. Returns None if the remote can't be
+    read right now.
+    """
+    key = (project, limit, offset, after)
+    with _archive_pages_lock:
+        if key in _archive_pages:
+            _archive_pages.move_to_end(key)
+            return _archive_pages[key]
+
+    if not is_remote_online():
+        return None
+
+    try:
+        with track_remote_call():
+            if offset:
+                rows = get_archive_page(project, limit, offset)
+            else:
+                rows = get_archive_page_after(project, limit, after)
+    except Exception:
+        return None
+
+    with _archive_pages_lock:
+        _archive_pages[key] = rows
+        while len(_archive_pages) > ARCHIVE_PAGE_CACHE_SIZE:
+            _archive_pages.popitem(last=False)
+    return rows
+
+
+def _clear_archive_pages(project: str):
+    """Drop cached archive pages (offsets shift, and first pages change, once new rows are archived)."""
+    with _archive_pages_lock:
+        for key in [key for key in _archive_pages if key[0] == project]:
+            del _archive_pages[key]
+
+
 def get_all_imported_inventory_cached(project: str = "ecoflow", limit: int = None, offset: int = 0) -> list[dict]:
-    """Get imported inventory from local cache."""
+    """Get imported inventory, newest first.
+
+    Pages inside the local mirror are served from the cache; deeper pages are
+    fetched from the remote archive on demand.
+    """
     conn = None
     try:
         conn = _get_local_connection(project)
         cursor = conn.cursor()
 
-        query = """
-            SELECT id, item_sku, serial_number, lpn, location, repair_state,
-                   entered_by, created_at, imported_at, order_number, tracking_number
-            FROM imported_inventory
-            ORDER BY imported_at DESC, created_at DESC
-        """
         if limit:
-            query += f" LIMIT {limit}"
-            if offset:
-                query += f" OFFSET {offset}"
+            local_count = get_counter(cursor, "imported_inventory")
+            total_count = _get_imported_total(cursor, project) or 0
+            if offset + limit > local_count and local_count < total_count:
+                conn.close()
+                conn = None
+                rows = _fetch_archive_page(project, limit, offset)
+                return [_imported_row_to_dict(row) for row in rows or []]
+
+        limit_sql, limit_params = _limit_clause(limit, offset)
+        cursor.execute(f"""
+            SELECT {_IMPORTED_COLUMNS}
+            FROM imported_inventory
+            ORDER BY imported_at DESC, created_at DESC, id DESC
+        """ + limit_sql, limit_params)
+        return [_imported_row_to_dict(row) for row in cursor.fetchall()]
+    except Exception:
+        return []
+    finally:
+        if conn:
+            conn.close()
+
 
-        cursor.execute(query)
+def get_imported_inventory_page_cached(project: str = "ecoflow", limit: int = 20,
+                                       token: str = None) -> tuple[list[dict], str | None]:
+    """Get one page of imported inventory (newest first), keyed on (imported_at, created_at, id).
+
+    Works like get_inventory_page_cached(): pass back the returned token for
+    the next page. Pages past the local mirror are read from the remote
+    archive partitions with the same key, so they cost the same at any depth.
+
+    Returns (items, next_token); next_token is None on the last page.
+    """
+    after = decode_page_token(token)
+    conn = None
+    try:
+        conn = _get_local_connection(project)
+        cursor = conn.cursor()
+
+        condition, params = "", []
+        if after is not None:
+            condition, params = "WHERE (imported_at, created_at, id) < (?, ?, ?)", list(after)
+        cursor.execute(f"""
+            SELECT {_IMPORTED_COLUMNS}
+            FROM imported_inventory
+            {condition}
+            ORDER BY imported_at DESC, created_at DESC, id DESC
+            LIMIT ?
+        """, params + [limit + 1])
         rows = cursor.fetchall()
 
-        return [
-            {
-                "id": row[0],
-                "item_sku": row[1],
-                "serial_number": row[2],
-                "lpn": row[3],
-                "location": row[4] or '',
-                "repair_state": row[5],
-                "entered_by": row[6],
-                "created_at": row[7],
-                "imported_at": row[8],
-                "order_number": row[9] or '',
-                "tracking_number": row[10] or ''
-            }
-            for row in rows
-        ]
+        # The mirror holds the newest rows; a short page continues in the remote archive
+        if len(rows) <= limit:
+            local_count = get_counter(cursor, "imported_inventory")
+            total_count = _get_imported_total(cursor, project) or 0
+            if local_count < total_count:
+                conn.close()
+                conn = None
+                remote_rows = _fetch_archive_page(project, limit + 1, after=after)
+                if remote_rows is not None:
+                    rows = remote_rows
     except Exception:
-        return []
+        return [], None
     finally:
         if conn:
             conn.close()
 
+    items = [_imported_row_to_dict(row) for row in rows[:limit]]
+    next_token = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_token = encode_page_token((last["imported_at"], last["created_at"], last["id"]))
+    return items, next_token
 
-def get_imported_inventory_count_cached(project: str = "ecoflow") -> int:
-    """Get total imported inventory count (real count from remote, stored during sync)."""
+
+def search_imported_inventory_cached(search_term: str, project: str = "ecoflow",
+                                     limit: int = 100) -> tuple[list[dict], int, bool]:
+    """Search the archive with a filter query: the local mirror, then the older rows on remote.
+
+    Returns (items, count, complete): up to limit matches (newest first), the
+    number of matches in all, and False if the rows past the mirror couldn't
+    be searched (remote offline).
+    """
+    condition, params = compile_query(search_term, lambda text: like_condition(text, _SEARCH_COLUMNS))
     conn = None
     try:
         conn = _get_local_connection(project)
         cursor = conn.cursor()
-        cursor.execute(
-            "SELECT value FROM sync_metadata WHERE key = ?",
-            (f"imported_count_{project}",)
-        )
-        row = cursor.fetchone()
-        if row:
-            return int(row[0])
-        return 0
+        cursor.execute(f"SELECT COUNT(*) FROM imported_inventory WHERE {condition}", params)
+        count = cursor.fetchone()[0]
+        cursor.execute(f"""
+            SELECT {_IMPORTED_COLUMNS}
+            FROM imported_inventory
+            WHERE {condition}
+            ORDER BY imported_at DESC, created_at DESC, id DESC
+            LIMIT ?
+        """, params + [limit])
+        rows = cursor.fetchall()
+
+        total_count = _get_imported_total(cursor, project)
+        needs_remote = total_count is None or get_counter(cursor, "imported_inventory") < total_count
+        cursor.execute("""
+            SELECT imported_at, created_at, id FROM imported_inventory
+            ORDER BY imported_at, created_at, id LIMIT 1
+        """)
+        oldest = cursor.fetchone()
+    except Exception:
+        return [], 0, False
+    finally:
+        if conn:
+            conn.close()
+
+    complete = True
+    if needs_remote:
+        complete = False
+        if is_remote_online():
+            try:
+                with track_remote_call():
+                    remote_rows, remote_count = search_archive(project, search_term, limit - len(rows),
+                                                               before=tuple(oldest) if oldest else None)
+                rows += remote_rows
+                count += remote_count
+                complete = True
+            except Exception:
+                pass
+    return [_imported_row_to_dict(row) for row in rows], count, complete
+
+
+def get_imported_inventory_count_cached(project: str = "ecoflow") -> int:
+    """Get total imported inventory count (maintained by the archive mirror pull)."""
+    conn = None
+    try:
+        conn = _get_local_connection(project)
+        return _get_imported_total(conn.cursor(), project) or 0
     except Exception:
         return 0
     finally:
@@ -453,6 +848,99 @@ def get_imported_inventory_count_cached(project: str = "ecoflow") -> int:
             conn.close()
 
 
+# ==================== Serial Registry (Duplicate Detection) ====================
+
+def _load_active_serials(project: str, cursor=None):
+    """Reload a project's active serials from the local cache into the serial registry."""
+    conn = None
+    try:
+        if cursor is None:
+            conn = _get_local_connection(project)
+            cursor = conn.cursor()
+        cursor.execute("SELECT serial_number FROM inventory")
+        serial_registry.set_active_serials(project, (row[0] for row in cursor.fetchall()))
+    except Exception:
+        pass
+    finally:
+        if conn:
+            conn.close()
+
+
+def _add_archived_serials(project: str, rows: list[tuple]) -> bool:
+    """Add archive rows' serials to the project's filter. Returns False once it has none."""
+    if not rows:
+        return serial_registry.has_archive_serials(project)
+    return serial_registry.add_archived_serials(project, (row[2] for row in rows), max(row[0] for row in rows))
+
+
+def _add_archived_serials_after(project: str, after_id: int) -> bool:
+    """Add the serials of every row archived above after_id to the project's filter."""
+    batch = []
+    for row in iter_archive_rows_after(project, after_id, ARCHIVE_PULL_BATCH_SIZE):
+        batch.append(row)
+        if len(batch) >= ARCHIVE_PULL_BATCH_SIZE:
+            if not _add_archived_serials(project, batch):
+                return False
+            batch = []
+    return _add_archived_serials(project, batch)
+
+
+def _load_archive_serials(project: str):
+    """Load a project's archive serial filter (once per process).
+
+    The filter saved by the last run is topped up with the rows archived since
+    (only partitions past its id are read). Without a usable saved filter it is
+    built from every archived serial in the remote partitions.
+    """
+    if serial_registry.has_archive_serials(project):
+        return
+    path = get_local_serial_filter_path(project)
+    try:
+        with track_remote_call():
+            partitions = get_partitions(project)
+            max_id = max((partition["max_id"] or 0 for partition in partitions), default=0)
+            loaded = serial_registry.load_archive_filter(project, path)
+            # A saved filter past the archive's end belongs to an archive that has been replaced
+            if not (loaded and serial_registry.get_archive_max_id(project) <= max_id
+                    and _add_archived_serials_after(project, serial_registry.get_archive_max_id(project))):
+                expected = sum(partition["row_count"] for partition in partitions)
+                serial_registry.load_archive_serials(project, iter_archive_serials(project), expected, max_id)
+        serial_registry.save_archive_filter(project, path)
+    except Exception:
+        pass
+
+
+def find_serial_cached(serial_number: str) -> list[dict]:
+    """Find a serial in any project's active inventory or archive, without touching remote.
+
+    Returns [{"project", "source" ("active"/"archive"), "confirmed", "imported_at"}].
+    Archive hits come from the registry's Bloom filters; those found in the local
+    archive mirror are confirmed (with their archive date), the rest are probable.
+    """
+    found = []
+    for project, source in serial_registry.find_serial(serial_number):
+        match = {"project": project, "source": source, "confirmed": source == "active", "imported_at": None}
+        if source == "archive":
+            conn = None
+            try:
+                conn = _get_local_connection(project)
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT MAX(imported_at) FROM imported_inventory WHERE serial_number = ? COLLATE NOCASE
+                """, (serial_registry.normalize_serial(serial_number),))
+                imported_at = cursor.fetchone()[0]
+                if imported_at:
+                    match["confirmed"] = True
+                    match["imported_at"] = imported_at
+            except Exception:
+                pass
+            finally:
+                if conn:
+                    conn.close()
+        found.append(match)
+    return found
+
+
 # ==================== CSV Serial Number Upload (Halo Duplicate Detection) ====================
 
 def save_csv_serials(serials: list, project: str = "halo"):
@@ -498,70 +986,192 @@ def get_csv_serials(project: str = "halo") -> set:
 
 # ==================== Background Sync ====================
 
-def _sync_to_remote(project: str):
-    """Sync pending local changes to remote database."""
-    local_conn = None
-    remote_conn = None
-    try:
-        local_conn = _get_local_connection(project)
-        local_cursor = local_conn.cursor()
+def _push_batch_id(project: str, pending_items: list) -> str:
+    """Batch ID for a set of pending rows.
 
-        local_cursor.execute("""
-            SELECT id, item_sku, serial_number, lpn, location, repair_state,
-                   entered_by, created_at, order_number, tracking_number
-            FROM inventory
-            WHERE sync_status = 'pending'
-        """)
-        pending_items = local_cursor.fetchall()
+    Derived from the rows' sync keys and modification times, so re-pushing the
+    same rows after a crash (remote committed, local didn't) produces the same
+    ID and the remote skips it.
+    """
+    digest = hashlib.sha1(project.encode('utf-8'))
+    for item in pending_items:
+        digest.update(f"{item[1]}|{item[-1]}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+_UPSERT_INVENTORY_SQL = """
+    INSERT INTO inventory
+    (sync_key, item_sku, serial_number, lpn, location, repair_state,
+     entered_by, created_at, order_number, tracking_number)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(sync_key) DO UPDATE SET
+        item_sku = excluded.item_sku,
+        serial_number = excluded.serial_number,
+        lpn = excluded.lpn,
+        location = excluded.location,
+        repair_state = excluded.repair_state,
+        order_number = excluded.order_number,
+        tracking_number = excluded.tracking_number
+    WHERE (inventory.item_sku, inventory.serial_number, inventory.lpn, inventory.location,
+           inventory.repair_state, inventory.order_number, inventory.tracking_number)
+          IS NOT (excluded.item_sku, excluded.serial_number, excluded.lpn, excluded.location,
+                  excluded.repair_state, excluded.order_number, excluded.tracking_number)
+"""
 
-        # Collect pending deletions from metadata
-        prefix = f"delete_{project}_"
-        local_cursor.execute(
-            "SELECT key, value FROM sync_metadata WHERE key LIKE ?",
-            (f"{prefix}%",)
-        )
-        pending_deletes = local_cursor.fetchall()
 
-        if not pending_items and not pending_deletes:
-            return
+def _project_sync_stats(project: str) -> dict:
+    return _sync_stats.setdefault(project, {
+        'pushes': 0, 'rows_pushed': 0, 'batches': 0, 'max_lock_hold_ms': 0.0, 'failures': 0, 'failing': False,
+    })
 
-        remote_conn = _get_remote_connection(project)
-        remote_cursor = remote_conn.cursor()
 
-        for item in pending_items:
-            local_id = item[0]
-            try:
-                remote_cursor.execute("""
-                    INSERT OR REPLACE INTO inventory
-                    (item_sku, serial_number, lpn, location, repair_state,
-                     entered_by, created_at, order_number, tracking_number)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, item[1:])
+def _record_push_stats(project: str, rows: int, lock_hold_times: list):
+    """Remember how long the last push held the remote write lock."""
+    with _sync_stats_lock:
+        stats = _project_sync_stats(project)
+        stats['failing'] = False
+        stats['pushes'] += 1
+        stats['rows_pushed'] += rows
+        stats['batches'] += len(lock_hold_times)
+        stats['last_push'] = datetime.now().isoformat()
+        stats['last_lock_hold_ms'] = [round(t * 1000, 1) for t in lock_hold_times]
+        if lock_hold_times:
+            stats['max_lock_hold_ms'] = max(stats['max_lock_hold_ms'], round(max(lock_hold_times) * 1000, 1))
 
-                remote_id = remote_cursor.lastrowid
 
-                local_cursor.execute("""
-                    UPDATE inventory
-                    SET sync_status = 'synced', remote_id = ?
-                    WHERE id = ?
-                """, (remote_id, local_id))
-            except Exception:
-                continue
+def _record_push_failure(project: str, error: Exception):
+    """Remember that a push failed; 'failing' stays set until one succeeds."""
+    with _sync_stats_lock:
+        stats = _project_sync_stats(project)
+        stats['failing'] = True
+        stats['failures'] += 1
+        stats['last_error'] = str(error)
+        stats['last_error_at'] = datetime.now().isoformat()
 
-        # Process pending deletions: delete from remote and clean up metadata
-        for key, _value in pending_deletes:
-            remote_id_str = key[len(prefix):]
-            try:
-                remote_id = int(remote_id_str)
-                remote_cursor.execute("DELETE FROM inventory WHERE id = ?", (remote_id,))
-                local_cursor.execute("DELETE FROM sync_metadata WHERE key = ?", (key,))
-            except (ValueError, Exception):
-                continue
 
-        remote_conn.commit()
-        local_conn.commit()
-    except Exception:
-        pass
+def get_sync_stats() -> dict:
+    """Get push statistics per project (rows, batches, remote lock hold times, failures)."""
+    with _sync_stats_lock:
+        return {project: dict(stats) for project, stats in _sync_stats.items()}
+
+
+def _sync_to_remote(project: str):
+    """Sync pending local changes to remote database.
+
+    Everything is prepared in memory first; rows are then upserted by sync_key
+    with executemany in short BEGIN IMMEDIATE transactions of
+    SYNC_PUSH_BATCH_SIZE rows, each tagged with a batch ID so a retried batch
+    is a no-op. Other stations only wait on the remote lock for one batch.
+    """
+    push_lock = _push_locks.setdefault(project, threading.Lock())
+    push_lock.acquire()
+    local_conn = None
+    remote_conn = None
+    try:
+        # Charge failures on the share to its circuit breaker
+        with track_remote_call():
+            local_conn = _get_local_connection(project)
+            local_cursor = local_conn.cursor()
+
+            # The sync_status counter spares an idle sweep the table scan
+            pending_items = []
+            if get_counter(local_cursor, "inventory", "sync_status", "pending"):
+                local_cursor.execute("""
+                    SELECT id, sync_key, item_sku, serial_number, lpn, location, repair_state,
+                           entered_by, created_at, order_number, tracking_number, last_modified
+                    FROM inventory
+                    WHERE sync_status = 'pending'
+                    ORDER BY id
+                """)
+                pending_items = local_cursor.fetchall()
+
+            local_cursor.execute("SELECT remote_id FROM pending_deletes")
+            pending_deletes = [row[0] for row in local_cursor.fetchall()]
+
+            if not pending_items and not pending_deletes:
+                return
+
+            if pending_deletes:
+                # Count the attempt even if the push below fails
+                local_cursor.execute("UPDATE pending_deletes SET attempts = attempts + 1")
+                local_conn.commit()
+
+            # Make sure the remote has sync keys (no-op once verified)
+            from .inventory import init_inventory_db
+            init_inventory_db(project)
+
+            # Prepare every batch before taking the remote lock
+            batches = []
+            for i in range(0, len(pending_items), SYNC_PUSH_BATCH_SIZE):
+                chunk = pending_items[i:i + SYNC_PUSH_BATCH_SIZE]
+                batches.append((_push_batch_id(project, chunk), [item[1:11] for item in chunk]))
+            delete_chunks = [
+                pending_deletes[i:i + SYNC_PUSH_BATCH_SIZE]
+                for i in range(0, len(pending_deletes), SYNC_PUSH_BATCH_SIZE)
+            ]
+
+            remote_conn = _get_remote_connection(project)
+            remote_cursor = remote_conn.cursor()
+            lock_hold_times = []
+
+            for batch_id, rows in batches:
+                started = time.monotonic()
+                remote_cursor.execute("BEGIN IMMEDIATE")
+                remote_cursor.execute("SELECT 1 FROM sync_batches WHERE batch_id = ?", (batch_id,))
+                if remote_cursor.fetchone() is None:
+                    remote_cursor.executemany(_UPSERT_INVENTORY_SQL, rows)
+                    remote_cursor.execute(
+                        "INSERT INTO sync_batches (batch_id, row_count) VALUES (?, ?)",
+                        (batch_id, len(rows))
+                    )
+                remote_conn.commit()
+                lock_hold_times.append(time.monotonic() - started)
+
+            # Push tombstones as batched deletes
+            for chunk in delete_chunks:
+                placeholders = ','.join('?' * len(chunk))
+                started = time.monotonic()
+                remote_cursor.execute("BEGIN IMMEDIATE")
+                remote_cursor.execute(f"DELETE FROM inventory WHERE id IN ({placeholders})", chunk)
+                remote_conn.commit()
+                lock_hold_times.append(time.monotonic() - started)
+
+            _record_push_stats(project, len(pending_items), lock_hold_times)
+
+            # Look up remote IDs by sync key (reads only, no lock held)
+            remote_ids = {}
+            sync_keys = [item[1] for item in pending_items]
+            for i in range(0, len(sync_keys), 500):
+                chunk = sync_keys[i:i + 500]
+                placeholders = ','.join('?' * len(chunk))
+                remote_cursor.execute(
+                    f"SELECT sync_key, id FROM inventory WHERE sync_key IN ({placeholders})", chunk
+                )
+                remote_ids.update(remote_cursor.fetchall())
+
+            # Mark rows synced in one batch, unless they were edited again
+            # while the push was running
+            local_cursor.executemany("""
+                UPDATE inventory
+                SET sync_status = 'synced', remote_id = ?
+                WHERE id = ? AND last_modified = ?
+            """, [
+                (remote_ids[item[1]], item[0], item[-1])
+                for item in pending_items if item[1] in remote_ids
+            ])
+
+            # Deletes are acknowledged: compact their tombstones
+            for chunk in delete_chunks:
+                placeholders = ','.join('?' * len(chunk))
+                local_cursor.execute(f"DELETE FROM pending_deletes WHERE remote_id IN ({placeholders})", chunk)
+            local_conn.commit()
+    except RemoteOfflineError as e:
+        # Expected while the share is down; the rows stay pending
+        logger.debug(f"Remote offline, push for {project} deferred")
+        _record_push_failure(project, e)
+    except Exception as e:
+        logger.exception(f"Error pushing local changes for {project}")
+        _record_push_failure(project, e)
     finally:
         if remote_conn:
             try: remote_conn.close()
@@ -569,81 +1179,256 @@ def _sync_to_remote(project: str):
         if local_conn:
             try: local_conn.close()
             except: pass
+        push_lock.release()
 
 
-def _sync_from_remote(project: str):
-    """Pull new items from remote to local cache."""
-    local_conn = None
-    remote_conn = None
+def _get_change_seq(local_cursor, project: str) -> int | None:
+    """Get the last remote change_log seq applied locally (None = never synced)."""
+    local_cursor.execute("SELECT value FROM sync_metadata WHERE key = ?", (f"change_seq_{project}",))
+    row = local_cursor.fetchone()
     try:
-        local_conn = _get_local_connection(project)
-        local_cursor = local_conn.cursor()
+        return int(row[0]) if row else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _set_change_seq(local_cursor, project: str, seq: int):
+    local_cursor.execute("""
+        INSERT OR REPLACE INTO sync_metadata (key, value) VALUES (?, ?)
+    """, (f"change_seq_{project}", str(seq)))
+
+
+def _get_pending_delete_ids(local_cursor) -> set:
+    """Remote IDs deleted locally but not yet on remote (never re-insert these)."""
+    local_cursor.execute("SELECT remote_id FROM pending_deletes")
+    return {row[0] for row in local_cursor.fetchall()}
+
+
+def _change_log_needs_resync(local_cursor, remote_cursor, project: str, mark: int) -> bool:
+    """Daily change log housekeeping: prune old entries, detect a replaced remote file.
+
+    Returns True if the local mark is ahead of the remote log (file was
+    restored or recreated), which needs a full resync.
+    """
+    local_cursor.execute("SELECT value FROM sync_metadata WHERE key = ?", (f"change_log_checked_{project}",))
+    row = local_cursor.fetchone()
+    if row:
+        try:
+            if (datetime.now() - datetime.fromisoformat(row[0])).total_seconds() < 86400:
+                return False
+        except ValueError:
+            pass
+
+    local_cursor.execute("""
+        INSERT OR REPLACE INTO sync_metadata (key, value) VALUES (?, ?)
+    """, (f"change_log_checked_{project}", datetime.now().isoformat()))
+
+    try:
+        from .inventory import prune_change_log
+        prune_change_log(project, CHANGE_LOG_RETENTION_DAYS)
+    except Exception:
+        pass  # Pruning is housekeeping only
+
+    remote_cursor.execute("SELECT COALESCE(MAX(seq), 0) FROM change_log")
+    return remote_cursor.fetchone()[0] < mark
+
+
+def _full_resync_from_remote(local_cursor, project: str) -> int:
+    """Reconcile the whole local cache with the remote table (attached as "remote").
+
+    Used on first run and when the change log no longer covers the local mark.
+    Runs as set operations inside SQLite, matched on sync_key (unique index on
+    both sides), so memory and Python time don't grow with the inventory.
+    Leaves the local transaction open for the caller to commit.
+    Returns the change_log seq the snapshot corresponds to.
+    """
+    # One transaction: the seq and all three statements see the same remote snapshot.
+    # Deferred, not IMMEDIATE: that would write-lock every attached file, the
+    # shared remote one included, and stall other stations' pushes for the whole
+    # reconcile. Only the local file is written, so only it takes a write lock.
+    local_cursor.execute("BEGIN")
+    local_cursor.execute("SELECT COALESCE(MAX(seq), 0) FROM remote.change_log")
+    snapshot_seq = local_cursor.fetchone()[0]
+
+    # Remove local synced items that no longer exist on remote (e.g., after export)
+    local_cursor.execute("""
+        DELETE FROM main.inventory
+        WHERE sync_status = 'synced'
+          AND NOT EXISTS (SELECT 1 FROM remote.inventory r WHERE r.sync_key = main.inventory.sync_key)
+    """)
+
+    # Refresh synced rows edited on another machine
+    local_cursor.execute("""
+        UPDATE OR IGNORE main.inventory
+        SET item_sku = r.item_sku, serial_number = r.serial_number, lpn = r.lpn,
+            location = r.location, repair_state = r.repair_state, entered_by = r.entered_by,
+            created_at = r.created_at, order_number = r.order_number,
+            tracking_number = r.tracking_number, remote_id = r.id
+        FROM remote.inventory AS r
+        WHERE r.sync_key = main.inventory.sync_key
+          AND main.inventory.sync_status = 'synced'
+          AND (r.item_sku, r.serial_number, r.lpn, r.location, r.repair_state, r.entered_by,
+               r.created_at, r.order_number, r.tracking_number, r.id)
+              IS NOT (main.inventory.item_sku, main.inventory.serial_number, main.inventory.lpn,
+                      main.inventory.location, main.inventory.repair_state, main.inventory.entered_by,
+                      main.inventory.created_at, main.inventory.order_number,
+                      main.inventory.tracking_number, main.inventory.remote_id)
+    """)
+
+    # Add rows this cache hasn't seen (skipping items pending deletion here)
+    local_cursor.execute("""
+        INSERT OR IGNORE INTO main.inventory
+        (item_sku, serial_number, lpn, location, repair_state,
+         entered_by, created_at, order_number, tracking_number, sync_status, remote_id, last_modified, sync_key)
+        SELECT r.item_sku, r.serial_number, r.lpn, r.location, r.repair_state,
+               r.entered_by, r.created_at, r.order_number, r.tracking_number, 'synced', r.id, r.created_at, r.sync_key
+        FROM remote.inventory AS r
+        WHERE NOT EXISTS (SELECT 1 FROM main.inventory l WHERE l.sync_key = r.sync_key)
+          AND NOT EXISTS (SELECT 1 FROM main.pending_deletes d WHERE d.remote_id = r.id)
+    """)
 
-        local_cursor.execute("""
-            SELECT value FROM sync_metadata WHERE key = ?
-        """, (f"last_pull_{project}",))
-        row = local_cursor.fetchone()
+    return snapshot_seq
 
-        remote_conn = _get_remote_connection(project)
-        remote_cursor = remote_conn.cursor()
 
-        remote_cursor.execute("""
+def _apply_remote_changes(local_cursor, remote_cursor, project: str, changes: list) -> tuple[list, list]:
+    """Apply change_log entries (seq, row_id, op) to the local cache.
+
+    Returns the serials (removed, added), for the serial registry.
+    """
+    # Only the last operation per row matters
+    latest_ops = {}
+    for _seq, row_id, op in changes:
+        latest_ops[row_id] = op
+
+    # Fetch current values of inserted/updated rows (missing = deleted since)
+    changed_ids = [row_id for row_id, op in latest_ops.items() if op != 'D']
+    remote_rows = {}
+    for i in range(0, len(changed_ids), 500):
+        chunk = changed_ids[i:i + 500]
+        placeholders = ','.join('?' * len(chunk))
+        remote_cursor.execute(f"""
             SELECT id, item_sku, serial_number, lpn, location, repair_state,
-                   entered_by, created_at, order_number, tracking_number
+                   entered_by, created_at, order_number, tracking_number, sync_key
             FROM inventory
-            ORDER BY created_at DESC
-        """)
-        remote_items = remote_cursor.fetchall()
+            WHERE id IN ({placeholders})
+        """, chunk)
+        for row in remote_cursor.fetchall():
+            remote_rows[row[0]] = row
+
+    # Local edits not yet pushed win until they are
+    pending_delete_ids = _get_pending_delete_ids(local_cursor)
+    local_cursor.execute("SELECT remote_id FROM inventory WHERE sync_status = 'pending' AND remote_id IS NOT NULL")
+    pending_ids = {row[0] for row in local_cursor.fetchall()}
+
+    removed, added = [], []
+    for row_id in latest_ops:
+        if row_id in pending_delete_ids or row_id in pending_ids:
+            continue
+
+        item = remote_rows.get(row_id)
+        if item is None:
+            local_cursor.execute(
+                "DELETE FROM inventory WHERE remote_id = ? AND sync_status = 'synced' RETURNING serial_number",
+                (row_id,)
+            )
+            removed += [row[0] for row in local_cursor.fetchall()]
+            continue
+
+        remote_id, sku, serial, lpn, loc, state, entered, created, order, tracking, sync_key = item
+        try:
+            local_cursor.execute(
+                "SELECT serial_number FROM inventory WHERE remote_id = ? AND sync_status = 'synced'",
+                (remote_id,)
+            )
+            old_serials = [row[0] for row in local_cursor.fetchall()]
+            local_cursor.execute("""
+                UPDATE inventory
+                SET item_sku = ?, serial_number = ?, lpn = ?, location = ?, repair_state = ?,
+                    entered_by = ?, created_at = ?, order_number = ?, tracking_number = ?, sync_key = ?
+                WHERE remote_id = ? AND sync_status = 'synced'
+            """, (sku, serial, lpn, loc, state, entered, created, order, tracking, sync_key, remote_id))
+            if local_cursor.rowcount == 0:
+                local_cursor.execute("""
+                    INSERT INTO inventory
+                    (item_sku, serial_number, lpn, location, repair_state,
+                     entered_by, created_at, order_number, tracking_number, sync_status, remote_id, last_modified, sync_key)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'synced', ?, ?, ?)
+                """, (sku, serial, lpn, loc, state, entered, created, order, tracking, remote_id, created, sync_key))
+            removed += old_serials
+            added.append(serial)
+        except sqlite3.IntegrityError:
+            pass  # Serial already cached under another row
 
-        local_cursor.execute("SELECT serial_number FROM inventory WHERE sync_status = 'synced'")
-        local_synced_serials = {row[0] for row in local_cursor.fetchall()}
+    return removed, added
 
-        # Load pending deletion remote IDs so we don't re-insert deleted items
-        prefix = f"delete_{project}_"
-        local_cursor.execute(
-            "SELECT key FROM sync_metadata WHERE key LIKE ?",
-            (f"{prefix}%",)
-        )
-        pending_delete_ids = set()
-        for (key,) in local_cursor.fetchall():
-            try:
-                pending_delete_ids.add(int(key[len(prefix):]))
-            except ValueError:
-                pass
 
-        remote_serials = set()
-        for item in remote_items:
-            remote_id, sku, serial, lpn, loc, state, entered, created, order, tracking = item
-            remote_serials.add(serial)
-            if remote_id in pending_delete_ids:
-                continue  # Skip items pending deletion
-            if serial not in local_synced_serials:
-                try:
-                    local_cursor.execute("""
-                        INSERT INTO inventory
-                        (item_sku, serial_number, lpn, location, repair_state,
-                         entered_by, created_at, order_number, tracking_number, sync_status, remote_id, last_modified)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'synced', ?, ?)
-                    """, (sku, serial, lpn, loc, state, entered, created, order, tracking, remote_id, created))
-                except sqlite3.IntegrityError:
-                    pass
-
-        # Remove local synced items that no longer exist on remote (e.g., after export)
-        stale_serials = local_synced_serials - remote_serials
-        if stale_serials:
-            placeholders = ','.join('?' * len(stale_serials))
-            local_cursor.execute(f"""
-                DELETE FROM inventory
-                WHERE sync_status = 'synced' AND serial_number IN ({placeholders})
-            """, list(stale_serials))
-
-        local_cursor.execute("""
-            INSERT OR REPLACE INTO sync_metadata (key, value) VALUES (?, ?)
-        """, (f"last_pull_{project}", datetime.now().isoformat()))
+def _finish_pull(local_conn, project: str, new_mark: int):
+    """Store the new change_log mark and pull time, and commit the pull."""
+    local_cursor = local_conn.cursor()
+    _set_change_seq(local_cursor, project, new_mark)
+    local_cursor.execute("""
+        INSERT OR REPLACE INTO sync_metadata (key, value) VALUES (?, ?)
+    """, (f"last_pull_{project}", datetime.now().isoformat()))
+    local_conn.commit()
 
-        local_conn.commit()
+
+def _sync_from_remote(project: str) -> bool:
+    """Pull remote changes into the local cache. Returns True if anything changed.
+
+    Reads only change_log entries above the high-water mark stored in
+    sync_metadata, so an idle cycle is one indexed query that returns nothing.
+    Falls back to a full resync on first run or when the log was pruned past
+    the mark. Before that, an unchanged stamp file skips even that query.
+    """
+    stamp_key = f"inventory:{project}"
+    stamp = get_stamp(get_remote_inventory_path(project))
+    if stamp_unchanged(stamp_key, stamp):
+        return False
+
+    local_conn = None
+    remote_conn = None
+    try:
+        # Charge failures on the share to its circuit breaker
+        with track_remote_call():
+            # Make sure the remote has the change log (no-op once verified)
+            from .inventory import init_inventory_db
+            init_inventory_db(project)
+
+            local_conn = _get_local_connection(project)
+            local_cursor = local_conn.cursor()
+            mark = _get_change_seq(local_cursor, project)
+
+            remote_conn = _get_remote_connection(project)
+            remote_cursor = remote_conn.cursor()
+
+            needs_full_resync = mark is None or _change_log_needs_resync(local_cursor, remote_cursor, project, mark)
+            if not needs_full_resync:
+                remote_cursor.execute("""
+                    SELECT seq, row_id, op FROM change_log WHERE seq > ? ORDER BY seq
+                """, (mark,))
+                changes = remote_cursor.fetchall()
+                if not changes:
+                    local_conn.commit()
+                    remember_stamp(stamp_key, stamp)
+                    return False
+                # A gap means entries after the mark were pruned
+                needs_full_resync = changes[0][0] > mark + 1
+
+            if needs_full_resync:
+                with attached_database(local_conn, get_remote_inventory_path(project), "remote",
+                                       writes=False):
+                    new_mark = _full_resync_from_remote(local_cursor, project)
+                    _finish_pull(local_conn, project, new_mark)
+                _load_active_serials(project, local_cursor)
+            else:
+                removed, added = _apply_remote_changes(local_cursor, remote_cursor, project, changes)
+                _finish_pull(local_conn, project, changes[-1][0])
+                serial_registry.apply_active_changes(project, removed, added)
+
+            remember_stamp(stamp_key, stamp)
+            return True
     except Exception:
-        pass
+        return False
     finally:
         if remote_conn:
             try: remote_conn.close()
@@ -653,146 +1438,321 @@ def _sync_from_remote(project: str):
             except: pass
 
 
-def _sync_imported_from_remote(project: str):
-    """Pull imported/archived inventory from remote to local cache."""
-    local_conn = None
-    remote_conn = None
-    try:
-        local_conn = _get_local_connection(project)
-        local_cursor = local_conn.cursor()
-
-        remote_conn = _get_remote_imported_connection(project)
-        remote_cursor = remote_conn.cursor()
-
-        remote_cursor.execute("SELECT COUNT(*) FROM imported_inventory")
-        total_count = remote_cursor.fetchone()[0]
+def _insert_archive_rows(local_cursor, rows: list):
+    local_cursor.executemany("""
+        INSERT INTO imported_inventory
+        (id, item_sku, serial_number, lpn, location, repair_state,
+         entered_by, created_at, imported_at, order_number, tracking_number)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            item_sku = excluded.item_sku, serial_number = excluded.serial_number, lpn = excluded.lpn,
+            location = excluded.location, repair_state = excluded.repair_state,
+            entered_by = excluded.entered_by, created_at = excluded.created_at,
+            imported_at = excluded.imported_at, order_number = excluded.order_number,
+            tracking_number = excluded.tracking_number
+    """, rows)
 
-        local_cursor.execute("""
-            INSERT OR REPLACE INTO sync_metadata (key, value) VALUES (?, ?)
-        """, (f"imported_count_{project}", str(total_count)))
-
-        remote_cursor.execute("""
-            SELECT id, item_sku, serial_number, lpn, location, repair_state,
-                   entered_by, created_at, imported_at, order_number
-            FROM imported_inventory
-            ORDER BY imported_at DESC
-            LIMIT 100
-        """)
-        remote_items = remote_cursor.fetchall()
 
-        local_cursor.execute("DELETE FROM imported_inventory")
-        for item in remote_items:
-            local_cursor.execute("""
-                INSERT INTO imported_inventory
-                (id, item_sku, serial_number, lpn, location, repair_state,
-                 entered_by, created_at, imported_at, order_number)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, item)
+def _sync_imported_from_remote(project: str):
+    """Mirror new archived rows from the remote partitions into the local cache.
+
+    The archive only grows, so rows above the id high-water mark are all that
+    is downloaded, and only from partitions whose id range reaches past it;
+    the total count comes from the archive manifest. The mirror keeps the
+    newest ARCHIVE_MIRROR_WINDOW rows (whole archive batches) and older pages
+    are read on demand by get_all_imported_inventory_cached(). Skipped while
+    the manifest's stamp file is unchanged.
+    """
+    stamp_key = f"imported:{project}"
+    stamp = get_stamp(get_manifest_path(project))
+    if stamp_unchanged(stamp_key, stamp):
+        return
 
-        local_conn.commit()
+    local_conn = None
+    try:
+        # Charge failures on the share to its circuit breaker
+        with track_remote_call():
+            partitions = get_partitions(project)
+            total_count = sum(partition["row_count"] for partition in partitions)
+            max_id = max((partition["max_id"] for partition in partitions), default=0)
+
+            local_conn = _get_local_connection(project)
+            local_cursor = local_conn.cursor()
+            mark_key = f"imported_max_id_{project}"
+            local_cursor.execute("SELECT value FROM sync_metadata WHERE key = ?", (mark_key,))
+            row = local_cursor.fetchone()
+            mark = int(row[0]) if row else None
+
+            changed = mark is None
+            if mark is None:
+                # First pull: mirror only the newest window, cut on a whole archive batch
+                local_cursor.execute("DELETE FROM imported_inventory")
+                mark = 0
+                if ARCHIVE_MIRROR_WINDOW and total_count > ARCHIVE_MIRROR_WINDOW:
+                    rows = iter_archive_rows(project)
+                    batch = []
+                    mirrored = 0
+                    last_imported_at = None
+                    try:
+                        for row in rows:
+                            if mirrored >= ARCHIVE_MIRROR_WINDOW and row[8] != last_imported_at:
+                                break
+                            batch.append(row)
+                            mirrored += 1
+                            last_imported_at = row[8]
+                            if len(batch) >= ARCHIVE_PULL_BATCH_SIZE:
+                                _insert_archive_rows(local_cursor, batch)
+                                batch = []
+                    finally:
+                        rows.close()
+                    _insert_archive_rows(local_cursor, batch)
+                    mark = max_id
+
+            # Everything archived since the mark, in bounded batches
+            batch = []
+            for row in iter_archive_rows_after(project, mark, ARCHIVE_PULL_BATCH_SIZE):
+                batch.append(row)
+                if len(batch) >= ARCHIVE_PULL_BATCH_SIZE:
+                    _insert_archive_rows(local_cursor, batch)
+                    _add_archived_serials(project, batch)
+                    batch = []
+                mark = max(mark, row[0])
+                changed = True
+            _insert_archive_rows(local_cursor, batch)
+            _add_archived_serials(project, batch)
+
+            # Trim the mirror to the newest window, keeping whole archive batches
+            if ARCHIVE_MIRROR_WINDOW:
+                local_cursor.execute("""
+                    SELECT imported_at FROM imported_inventory
+                    ORDER BY imported_at DESC LIMIT 1 OFFSET ?
+                """, (ARCHIVE_MIRROR_WINDOW - 1,))
+                row = local_cursor.fetchone()
+                if row:
+                    local_cursor.execute("DELETE FROM imported_inventory WHERE imported_at < ?", (row[0],))
+
+            local_cursor.executemany("""
+                INSERT OR REPLACE INTO sync_metadata (key, value) VALUES (?, ?)
+            """, [(mark_key, str(mark)), (f"imported_count_{project}", str(total_count))])
+
+            local_conn.commit()
+            remember_stamp(stamp_key, stamp)
+            if changed:
+                _clear_archive_pages(project)
+                serial_registry.save_archive_filter(project, get_local_serial_filter_path(project))
     except Exception:
         pass
     finally:
-        if remote_conn:
-            try: remote_conn.close()
-            except: pass
         if local_conn:
             try: local_conn.close()
             except: pass
 
 
-def _background_sync_worker():
-    """Background worker that syncs with remote periodically."""
-    # Wait before first sync to let the app load without competing for P: drive
-    if _sync_stop_event.wait(10):
-        return  # Stop was requested during initial delay
-    while not _sync_stop_event.is_set():
-        for project in ["ecoflow", "halo", "ams_ine"]:
-            if _sync_stop_event.is_set():
-                return
+def _request_push(project: str):
+    """Ask the push worker to send a project's local writes (debounced)."""
+    now = time.monotonic()
+    with _push_requests_lock:
+        first, _last = _push_requests.get(project, (now, now))
+        _push_requests[project] = (first, now)
+    _push_event.set()
 
-            try:
+
+def _push_worker():
+    """Push local writes shortly after they happen, coalescing bursts per project."""
+    while not _sync_stop_event.is_set():
+        with _push_requests_lock:
+            now = time.monotonic()
+            due = []
+            next_due = None
+            for project, (first, last) in list(_push_requests.items()):
+                due_at = min(last + PUSH_DEBOUNCE_SECONDS, first + PUSH_MAX_DELAY_SECONDS)
+                if now >= due_at:
+                    due.append(project)
+                    del _push_requests[project]
+                elif next_due is None or due_at < next_due:
+                    next_due = due_at
+            _push_event.clear()
+
+        # Not under _remote_sync_slots: a user's write mustn't wait behind pulls and
+        # archive maintenance. This one thread is at most one more P: connection.
+        for project in due:
+            # Offline: rows stay pending and the pull loop sweeps them later
+            if is_remote_online():
                 _sync_to_remote(project)
-            except Exception:
-                pass
 
-            if _sync_stop_event.is_set():
-                return
+        # Sleep until the next push is due or a write arrives (wake regularly to notice stop)
+        timeout = 1.0 if next_due is None else min(1.0, max(0.0, next_due - time.monotonic()))
+        _push_event.wait(timeout)
 
-            try:
-                _sync_from_remote(project)
-            except Exception:
-                pass
 
-            if _sync_stop_event.is_set():
-                return
+def _maintain_archive(project: str):
+    with track_remote_call():
+        maintain_archive(project)
 
-            try:
-                _sync_imported_from_remote(project)
-            except Exception:
-                pass
 
-        # Wait for next sync interval (wakes early if stop event is set)
-        _sync_stop_event.wait(INVENTORY_CACHE_SYNC_INTERVAL)
+def _sync_step(step: callable, project: str, default=None):
+    """Run one step of a sync task, holding a remote slot only for that step (errors are swallowed)."""
+    with _remote_sync_slots:
+        if _sync_stop_event.is_set():
+            return default
+        try:
+            return step(project)
+        except Exception:
+            return default
+
 
+def _sync_project(project: str) -> bool:
+    """One sync task for a project: push sweep, pull, imported pull, archive maintenance.
 
-def start_inventory_sync():
-    """Start the background sync thread."""
-    global _sync_thread
+    Keeps the serial registry current along the way. Each step takes its own
+    remote slot, so a slow step (e.g. a columnar conversion) holds up other
+    projects' tasks for that step only.
 
-    if _sync_thread is not None and _sync_thread.is_alive():
-        return
+    Returns True if remote changes were pulled.
+    """
+    _sync_step(_sync_to_remote, project)
+    changed = _sync_step(_sync_from_remote, project, False)
+    _sync_step(_load_archive_serials, project)
+    _sync_step(_sync_imported_from_remote, project)
+    _sync_step(_maintain_archive, project)
+    return changed
+
+
+def _background_sync_worker():
+    """Scheduler: runs per-project sync tasks on a small thread pool.
+
+    Each project has its own interval: INVENTORY_PULL_MIN_INTERVAL while its
+    remote data is changing, doubling up to INVENTORY_PULL_MAX_INTERVAL while
+    it isn't. A slow project file doesn't hold up the others, and
+    INVENTORY_SYNC_MAX_REMOTE caps concurrent remote connections. Each task
+    also sweeps up local writes the push worker could not send (e.g. while
+    offline).
+    """
+    # Wait before first sync to let the app load without competing for P: drive
+    if _sync_stop_event.wait(10):
+        return  # Stop was requested during initial delay
+
+    projects = ["ecoflow", "halo", "ams_ine"]
+    now = time.monotonic()
+    schedule = {
+        project: {'interval': INVENTORY_PULL_MIN_INTERVAL, 'next_run': now, 'future': None}
+        for project in projects
+    }
+
+    executor = ThreadPoolExecutor(max_workers=len(projects), thread_name_prefix="inventory-sync")
+    try:
+        while not _sync_stop_event.is_set():
+            now = time.monotonic()
+
+            for project, entry in schedule.items():
+                future = entry['future']
+                if future is not None and future.done():
+                    changed = False
+                    try:
+                        changed = future.result()
+                    except Exception:
+                        pass
+                    if changed:
+                        entry['interval'] = INVENTORY_PULL_MIN_INTERVAL
+                    else:
+                        entry['interval'] = min(entry['interval'] * 2, INVENTORY_PULL_MAX_INTERVAL)
+                    entry['next_run'] = now + entry['interval']
+                    entry['future'] = None
+
+                # Remote offline: keep working from the cache until the probe sees it again
+                if entry['future'] is None and now >= entry['next_run']:
+                    if is_remote_online():
+                        entry['future'] = executor.submit(_sync_project, project)
+                    else:
+                        entry['next_run'] = now + INVENTORY_PULL_MIN_INTERVAL
+
+            # Wait for the next due project (wake regularly to collect finished tasks)
+            idle = [entry['next_run'] for entry in schedule.values() if entry['future'] is None]
+            timeout = min(idle) - time.monotonic() if idle else 1.0
+            _sync_stop_event.wait(min(1.0, max(0.1, timeout)))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def start_inventory_sync():
+    """Start the background sync scheduler and the push-on-write worker."""
+    global _sync_thread, _push_thread
 
     _sync_stop_event.clear()
-    _sync_thread = threading.Thread(target=_background_sync_worker, daemon=True)
-    _sync_thread.start()
+
+    if _sync_thread is None or not _sync_thread.is_alive():
+        _sync_thread = threading.Thread(target=_background_sync_worker, daemon=True)
+        _sync_thread.start()
+
+    if _push_thread is None or not _push_thread.is_alive():
+        _push_thread = threading.Thread(target=_push_worker, daemon=True)
+        _push_thread.start()
 
 
 def stop_inventory_sync():
-    """Stop the background sync thread."""
+    """Stop the background sync threads."""
     _sync_stop_event.set()
-    if _sync_thread is not None:
-        _sync_thread.join(timeout=15)
+    _push_event.set()
+    for thread in (_sync_thread, _push_thread):
+        if thread is not None:
+            thread.join(timeout=15)
 
 
-def force_sync_now():
-    """Force an immediate sync (useful for export operations)."""
-    for project in ["ecoflow", "halo", "ams_ine"]:
-        _sync_to_remote(project)
+def force_sync_now(project: str = None):
+    """Force an immediate push of pending local rows (useful for export operations)."""
+    for name in [project] if project else ["ecoflow", "halo", "ams_ine"]:
+        _sync_to_remote(name)
 
 
 # ==================== Export Operations ====================
 
-def move_to_imported_cached(project: str = "ecoflow") -> list[dict]:
-    """Move all items from active inventory to imported inventory.
-
-    Returns the list of moved items for CSV export.
-    """
-    local_conn = None
-    try:
-        local_items = get_all_inventory_cached(project)
+def archive_inventory_cached(project: str = "ecoflow", up_to_id: int = None) -> tuple[str, int]:
+    """Push pending local rows, archive the remote active inventory, clear the cache.
 
-        if not local_items:
-            return []
+    With up_to_id, only rows up to that remote id are archived (an export snapshot).
 
-        _sync_to_remote(project)
+    Returns (archive_batch, row count); stream the rows for the CSV with
+    inventory.iter_archive_batch(). Raises if the remote can't be archived, in
+    which case the local cache is left untouched.
+    """
+    _sync_to_remote(project)
 
-        from .inventory import move_inventory_to_imported
-        move_inventory_to_imported(project)
+    from .inventory import archive_active_inventory
+    archive_batch, moved = archive_active_inventory(project, up_to_id)
 
-        # ALWAYS clear local active inventory after export
-        local_conn = _get_local_connection(project)
+    # Archived rows are gone from the remote active table; drop them from the cache
+    local_conn = _get_local_connection(project)
+    try:
         local_cursor = local_conn.cursor()
-        local_cursor.execute("DELETE FROM inventory")
+        if up_to_id is None:
+            local_cursor.execute("DELETE FROM inventory WHERE sync_status = 'synced' RETURNING serial_number")
+        else:
+            local_cursor.execute(
+                "DELETE FROM inventory WHERE sync_status = 'synced' AND remote_id <= ? RETURNING serial_number",
+                (up_to_id,)
+            )
+        archived_serials = [row[0] for row in local_cursor.fetchall()]
         local_conn.commit()
+        serial_registry.remove_active_serials(project, archived_serials)
+    finally:
+        local_conn.close()
+
+    # Refresh imported cache
+    _sync_imported_from_remote(project)
 
-        # Refresh imported cache
-        _sync_imported_from_remote(project)
+    return archive_batch, moved
 
-        return local_items
+
+def move_to_imported_cached(project: str = "ecoflow") -> list[dict]:
+    """Move all items from active inventory to imported inventory.
+
+    Returns the list of moved items for CSV export.
+    """
+    try:
+        archive_batch, moved = archive_inventory_cached(project)
+        if not moved:
+            return []
+        from .inventory import iter_archive_batch
+        return list(iter_archive_batch(project, archive_batch))
     except Exception:
         return []
-    finally:
-        if local_conn:
-            try: local_conn.close()
-            except: pass
@@ -0,0 +1,173 @@
+"""Schema versioning and migration runner.
+
+Each database module declares its schema as an ordered list of numbered
+migrations:
+
+    _MIGRATIONS = [
+        (1, "Baseline schema", _migrate_v1),
+        (2, "Promote admin user", _migrate_v2),
+    ]
+
+ensure_schema() applies the ones a database file has not seen yet, exactly
+once, under BEGIN IMMEDIATE so two clients starting together cannot both
+migrate. Applied versions are recorded in a schema_version table and mirrored
+into PRAGMA user_version, which lives in the file header and can be read
+without touching any table.
+
+A normal launch therefore costs one cheap read per remote database file (and
+none for local AppData caches already verified on this machine), instead of
+a dozen CREATE/ALTER statements that each take the write lock on the share.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import get_schema_cache_path
+
+logger = logging.getLogger(__name__)
+
+# Files verified by this process: {absolute path: version}
+_verified = {}
+_verified_lock = threading.Lock()
+
+
+# ==================== Helpers for Migrations ====================
+
+def get_columns(cursor: sqlite3.Cursor, table: str) -> list[str]:
+    """Get the column names of a table (empty if it doesn't exist)."""
+    cursor.execute(f"PRAGMA table_info({table})")
+    return [row[1] for row in cursor.fetchall()]
+
+
+def add_column_if_missing(cursor: sqlite3.Cursor, table: str, column: str, definition: str) -> bool:
+    """Add a column unless it already exists (databases created by older versions).
+
+    Returns True if the column was added.
+    """
+    if column in get_columns(cursor, table):
+        return False
+    cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    return True
+
+
+# ==================== Local Verified-Version Cache ====================
+
+def _load_version_cache() -> dict:
+    try:
+        with open(get_schema_cache_path(), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except Exception:
+        return {}
+
+
+def _save_version_cache(key: str, version: int):
+    try:
+        path = get_schema_cache_path()
+        data = _load_version_cache()
+        if data.get(key) == version:
+            return
+        data[key] = version
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+    except Exception:
+        pass  # Cache only saves work on the next launch
+
+
+# ==================== Runner ====================
+
+def get_schema_version(conn) -> int:
+    """Read the schema version from the database header."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def _apply_migrations(conn, migrations: list, name: str) -> int:
+    """Apply pending migrations in one write transaction. Returns the new version."""
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                description TEXT NOT NULL,
+                applied_at TEXT NOT NULL
+            )
+        """)
+        # Re-read under the lock: another client may have migrated meanwhile
+        cursor.execute("SELECT MAX(version) FROM schema_version")
+        current = max(cursor.fetchone()[0] or 0, get_schema_version(conn))
+
+        for version, description, migrate in migrations:
+            if version <= current:
+                continue
+            logger.info(f"Migrating {name} to schema version {version}: {description}")
+            migrate(cursor)
+            cursor.execute(
+                "INSERT OR REPLACE INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                (version, description, datetime.now().isoformat())
+            )
+            current = version
+
+        cursor.execute(f"PRAGMA user_version = {int(current)}")
+        conn.commit()
+        return current
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def ensure_schema(get_conn: callable, db_path: Path, migrations: list, remote: bool = True) -> int:
+    """Bring a database file up to the latest migration, doing as little I/O as possible.
+
+    Args:
+        get_conn: Returns a (pooled) connection to the database
+        db_path: Path of the database file (key for the verified-version caches)
+        migrations: Ordered list of (version, description, migrate(cursor))
+        remote: False for local AppData files, which are trusted from the
+                local cache without even a read
+
+    Returns the schema version of the file.
+    """
+    key = os.path.abspath(str(db_path))
+    latest = migrations[-1][0]
+
+    with _verified_lock:
+        if _verified.get(key, 0) >= latest:
+            return _verified[key]
+
+    if not remote and _load_version_cache().get(key) == latest and os.path.exists(key):
+        with _verified_lock:
+            _verified[key] = latest
+        return latest
+
+    conn = get_conn()
+    try:
+        version = get_schema_version(conn)
+        if version < latest:
+            version = _apply_migrations(conn, migrations, Path(key).name)
+    finally:
+        conn.close()
+
+    # A newer client may already have migrated past us; that's fine
+    with _verified_lock:
+        _verified[key] = version
+    _save_version_cache(key, version)
+    return version
+
+
+def forget_verified(db_path: Path = None):
+    """Drop in-process verification (all files, or one) so the next call re-checks."""
+    with _verified_lock:
+        if db_path is None:
+            _verified.clear()
+        else:
+            _verified.pop(os.path.abspath(str(db_path)), None)
@@ -0,0 +1,168 @@
+"""Structured filter queries for the inventory views.
+
+A query is a list of space-separated terms, all of which must match:
+
+    entered_by:jsmith state:Refurb date:today sku:2Q0Q*
+
+    field:value        the field equals value (case-insensitive)
+    field:value*       the field starts with value
+    field:a,b*         any of the alternatives
+    field:"a b"        quotes keep spaces in a value
+    date:...           created date: today, yesterday, 7d (the last 7 days),
+                       2026-10-01, 2026-10, 2026, or a range such as
+                       2026-10-01..2026-10-15 (either end may be left open)
+    anything else      free text, searched across all columns as before
+
+compile_query() turns a query into a parameterized WHERE condition. Field
+terms compile to equality, prefix (LIKE 'x%') and range comparisons that the
+local cache answers from its NOCASE and created_at indexes instead of scanning.
+A field term with no value yet (typing "sku:") is ignored.
+"""
+
+import re
+from datetime import date, timedelta
+
+# Field names (and aliases) -> inventory column
+QUERY_FIELDS = {
+    "sku": "item_sku",
+    "serial": "serial_number",
+    "sn": "serial_number",
+    "lpn": "lpn",
+    "order": "order_number",
+    "po": "tracking_number",
+    "tracking": "tracking_number",
+    "location": "location",
+    "loc": "location",
+    "state": "repair_state",
+    "user": "entered_by",
+}
+QUERY_FIELDS.update({column: column for column in list(QUERY_FIELDS.values())})
+
+DATE_FIELDS = {
+    "date": "created_at",
+    "created": "created_at",
+}
+
+_TERM_PATTERN = re.compile(r'(?:([A-Za-z_]+):)?(?:"([^"]*)"?|(\S*))')
+
+
+class QueryError(ValueError):
+    """A filter query that can't be compiled (e.g. an unreadable date)."""
+
+
+def parse_query(text: str) -> tuple[list[tuple[str, str]], str]:
+    """Split a query into field terms [(field, value)] and the remaining free text.
+
+    A query without field terms is returned whole as free text.
+    """
+    terms, words = [], []
+    for match in _TERM_PATTERN.finditer(text):
+        if not match.group(0):
+            continue
+        field = (match.group(1) or "").lower()
+        value = match.group(2) if match.group(2) is not None else match.group(3)
+        if field in QUERY_FIELDS or field in DATE_FIELDS:
+            terms.append((field, value))
+        else:
+            words.append(match.group(0))
+
+    if not terms:
+        return [], text.strip()
+    return terms, " ".join(words)
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _value_condition(column: str, value: str) -> tuple[str, list]:
+    alternatives, params = [], []
+    for alternative in value.split(","):
+        if not alternative:
+            continue
+        if alternative.endswith("*"):
+            alternatives.append(f"{column} LIKE ? ESCAPE '\\'")
+            params.append(_escape_like(alternative.rstrip("*")) + "%")
+        else:
+            alternatives.append(f"{column} = ? COLLATE NOCASE")
+            params.append(alternative)
+    if not alternatives:
+        return "1", []
+    if len(alternatives) == 1:
+        return alternatives[0], params
+    return "(" + " OR ".join(alternatives) + ")", params
+
+
+def _date_bounds(text: str) -> tuple[date, date]:
+    """Half-open [start, end) dates for one date value."""
+    today = date.today()
+    text = text.lower()
+    if text == "today":
+        return today, today + timedelta(days=1)
+    if text == "yesterday":
+        return today - timedelta(days=1), today
+    if re.fullmatch(r"\d+d", text):
+        return today - timedelta(days=int(text[:-1]) - 1), today + timedelta(days=1)
+    try:
+        if re.fullmatch(r"\d{4}-\d{2}-\d{2}", text):
+            day = date.fromisoformat(text)
+            return day, day + timedelta(days=1)
+        if re.fullmatch(r"\d{4}-\d{2}", text):
+            start = date(int(text[:4]), int(text[5:]), 1)
+            return start, (start + timedelta(days=31)).replace(day=1)
+        if re.fullmatch(r"\d{4}", text):
+            return date(int(text), 1, 1), date(int(text) + 1, 1, 1)
+    except ValueError:
+        pass
+    raise QueryError(f"Unreadable date: {text}")
+
+
+def _date_condition(column: str, value: str) -> tuple[str, list]:
+    if ".." in value:
+        low, high = value.split("..", 1)
+        start = _date_bounds(low)[0] if low else None
+        end = _date_bounds(high)[1] if high else None
+    else:
+        start, end = _date_bounds(value)
+
+    # ISO timestamps compare as text, so dates bound them directly
+    conditions, params = [], []
+    if start:
+        conditions.append(f"{column} >= ?")
+        params.append(start.isoformat())
+    if end:
+        conditions.append(f"{column} < ?")
+        params.append(end.isoformat())
+    return " AND ".join(conditions) or "1", params
+
+
+def like_condition(text: str, columns: list[str]) -> tuple[str, list]:
+    """Free-text condition: text anywhere in any of the columns (a LIKE scan)."""
+    like = f"%{text}%"
+    return "(" + " OR ".join(f"{column} LIKE ?" for column in columns) + ")", [like] * len(columns)
+
+
+def compile_query(text: str, free_text_condition: callable) -> tuple[str, list]:
+    """Compile a query into a WHERE condition and its parameters.
+
+    free_text_condition(text) -> (condition, params) handles the free text
+    (the caller's full-text search). Raises QueryError for unreadable values.
+    """
+    terms, free_text = parse_query(text)
+    conditions, params = [], []
+    for field, value in terms:
+        if not value:
+            continue
+        if field in DATE_FIELDS:
+            condition, term_params = _date_condition(DATE_FIELDS[field], value)
+        else:
+            condition, term_params = _value_condition(QUERY_FIELDS[field], value)
+        conditions.append(condition)
+        params += term_params
+
+    if free_text:
+        condition, term_params = free_text_condition(free_text)
+        conditions.append(condition)
+        params += term_params
+
+    return " AND ".join(conditions) or "1", params
@@ -0,0 +1,79 @@
+"""Search every project's inventory and archive at once.
+
+search_all() fans one filter query (database/query.py) out over each
+project's active inventory cache and its archive (the local mirror, then the
+remote partitions past it). The sources run concurrently and their hits are
+merged newest first by received date (created_at). on_results is called as
+each source finishes, so hits from the local caches show up before the remote
+archive has answered.
+"""
+
+import heapq
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .inventory_cache import search_inventory_cached, search_inventory_count_cached, search_imported_inventory_cached
+from .query import compile_query
+
+SEARCH_PROJECTS = ["ecoflow", "halo", "ams_ine"]
+SEARCH_SOURCES = ["active", "archive"]
+SEARCH_RESULTS_PER_SOURCE = 100  # hits kept per (project, source); counts are always exact
+SEARCH_WORKERS = 6
+
+
+def _recency(item: dict) -> tuple:
+    return item["created_at"] or "", item["id"]
+
+
+def _search_source(project: str, source: str, search_term: str, limit: int) -> tuple[list[dict], int, bool]:
+    """Search one source: (items, match count, complete)."""
+    if source == "active":
+        items = search_inventory_cached(search_term, project, limit=limit)
+        return items, search_inventory_count_cached(search_term, project), True
+    return search_imported_inventory_cached(search_term, project, limit)
+
+
+def merge_search_results(items: list[dict], new_items: list[dict]) -> list[dict]:
+    """Merge two hit lists, each newest first, into one."""
+    return list(heapq.merge(items, sorted(new_items, key=_recency, reverse=True), key=_recency, reverse=True))
+
+
+def search_all(search_term: str, on_results: callable = None, projects: list[str] = None,
+               limit: int = SEARCH_RESULTS_PER_SOURCE) -> dict:
+    """Search active inventory and the archive of every project concurrently.
+
+    Every hit is tagged with its "project" and "source" ("active"/"archive").
+    As each source finishes, on_results(result) is called in the calling
+    thread with result = {"project", "source", "items", "count", "complete",
+    "merged"}, where merged is every hit so far, newest first.
+
+    Returns {"items": all hits newest first, "counts": {(project, source): n},
+    "incomplete": sources that couldn't be fully searched}. Raises QueryError
+    for an unreadable query.
+    """
+    compile_query(search_term, lambda text: ("1", []))  # Fail fast on a bad query
+    merged, counts, incomplete = [], {}, []
+    with ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="search") as executor:
+        futures = {
+            executor.submit(_search_source, project, source, search_term, limit): (project, source)
+            for project in projects or SEARCH_PROJECTS
+            for source in SEARCH_SOURCES
+        }
+        for future in as_completed(futures):
+            project, source = futures[future]
+            try:
+                items, count, complete = future.result()
+            except Exception:
+                items, count, complete = [], 0, False
+            for item in items:
+                item["project"] = project
+                item["source"] = source
+
+            merged = merge_search_results(merged, items)
+            counts[(project, source)] = count
+            if not complete:
+                incomplete.append((project, source))
+            if on_results:
+                on_results({"project": project, "source": source, "items": items, "count": count,
+                            "complete": complete, "merged": merged})
+
+    return {"items": merged, "counts": counts, "incomplete": incomplete}
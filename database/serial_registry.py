@@ -0,0 +1,205 @@
+"""In-memory registry of received serial numbers, for duplicate checks at entry time.
+
+    active    one hash set per project, loaded from the local inventory cache
+    archive   one Bloom filter per project over every archived serial
+
+The archive runs to millions of rows, so only a Bloom filter is kept for it
+(about 1.8 MB per million serials at SERIAL_BLOOM_ERROR_RATE). A filter has
+no false negatives; a hit is confirmed against the local archive mirror by
+the caller, or reported as probable.
+
+inventory_cache keeps the registry current serial by serial: local adds,
+edits and deletes, the rows each pull changes, the rows each archive run
+moves out, and each batch of newly archived rows it mirrors. A project's
+archive filter is saved locally with the highest archive id it covers, so a
+launch only reads the archive rows added since, not every archived serial.
+Serials are compared trimmed and upper-cased.
+"""
+
+import hashlib
+import json
+import math
+import os
+import threading
+import uuid
+from pathlib import Path
+
+SERIAL_BLOOM_ERROR_RATE = 0.001  # false positive rate at capacity
+SERIAL_BLOOM_MIN_CAPACITY = 100_000  # filters are sized for at least this many serials...
+SERIAL_BLOOM_HEADROOM = 2  # ...and this many times the archive's size when built
+
+_FILTER_HEADER = b"UPLINK-BLOOM1\n"
+
+_active = {}  # {project: set of serials}
+_archive = {}  # {project: BloomFilter}
+_lock = threading.Lock()
+
+
+class BloomFilter:
+    """Set membership with no false negatives, in a fixed bit array."""
+
+    def __init__(self, capacity: int, error_rate: float = SERIAL_BLOOM_ERROR_RATE):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self.max_id = 0  # highest archive id whose serial has been added
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value: str):
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, value: str):
+        for position in self._positions(value):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+def normalize_serial(serial: str) -> str:
+    return (serial or "").strip().upper()
+
+
+def set_active_serials(project: str, serials):
+    """Replace a project's active serials."""
+    active = {normalize_serial(serial) for serial in serials}
+    with _lock:
+        _active[project] = active
+
+
+def add_active_serial(project: str, serial: str):
+    with _lock:
+        _active.setdefault(project, set()).add(normalize_serial(serial))
+
+
+def remove_active_serials(project: str, serials):
+    with _lock:
+        active = _active.setdefault(project, set())
+        for serial in serials:
+            active.discard(normalize_serial(serial))
+
+
+def replace_active_serial(project: str, old_serial: str, new_serial: str):
+    """Swap an edited item's serial."""
+    with _lock:
+        active = _active.setdefault(project, set())
+        active.discard(normalize_serial(old_serial))
+        active.add(normalize_serial(new_serial))
+
+
+def apply_active_changes(project: str, removed, added):
+    """Apply a batch of changes: removed serials first, then added ones."""
+    with _lock:
+        active = _active.setdefault(project, set())
+        for serial in removed:
+            active.discard(normalize_serial(serial))
+        for serial in added:
+            active.add(normalize_serial(serial))
+
+
+def load_archive_serials(project: str, serials, expected: int = 0, max_id: int = 0):
+    """Build a project's archive filter from every archived serial up to max_id (an iterable)."""
+    bloom = BloomFilter(max(SERIAL_BLOOM_MIN_CAPACITY, expected * SERIAL_BLOOM_HEADROOM))
+    for serial in serials:
+        bloom.add(normalize_serial(serial))
+    bloom.max_id = max_id
+    with _lock:
+        _archive[project] = bloom
+
+
+def add_archived_serials(project: str, serials, max_id: int = None) -> bool:
+    """Add newly archived serials, up to archive id max_id.
+
+    Ignored until the project's filter has been built. Returns False if the
+    project has no filter (any more): past capacity its false positive rate
+    climbs, so it is dropped and the next sync rebuilds it.
+    """
+    with _lock:
+        bloom = _archive.get(project)
+        if bloom is None:
+            return False
+        for serial in serials:
+            bloom.add(normalize_serial(serial))
+        if max_id is not None:
+            bloom.max_id = max(bloom.max_id, max_id)
+        if bloom.count > bloom.capacity:
+            del _archive[project]
+            return False
+        return True
+
+
+def get_archive_max_id(project: str) -> int | None:
+    """Highest archive id covered by a project's filter, or None without one."""
+    with _lock:
+        bloom = _archive.get(project)
+        return bloom.max_id if bloom else None
+
+
+def save_archive_filter(project: str, path: Path):
+    """Write a project's archive filter to path (a temp file, then an atomic replace)."""
+    with _lock:
+        bloom = _archive.get(project)
+        if bloom is None:
+            return
+        header = json.dumps({"capacity": bloom.capacity, "size": bloom.size, "hashes": bloom.hashes,
+                             "count": bloom.count, "max_id": bloom.max_id}).encode('utf-8')
+        bits = bytes(bloom._bits)
+
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(_FILTER_HEADER + header + b"\n" + bits)
+        os.replace(temp_path, path)
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+
+
+def load_archive_filter(project: str, path: Path) -> bool:
+    """Load a project's archive filter saved by save_archive_filter.
+
+    Returns False (loading nothing) if the file is missing, unreadable or
+    past capacity.
+    """
+    try:
+        with open(path, 'rb') as f:
+            if f.readline() != _FILTER_HEADER:
+                return False
+            header = json.loads(f.readline())
+            bits = f.read()
+        bloom = BloomFilter(header["capacity"])
+        if (bloom.size, bloom.hashes) != (header["size"], header["hashes"]) or len(bits) != len(bloom._bits):
+            return False
+        if header["count"] > bloom.capacity:
+            return False
+        bloom.count = header["count"]
+        bloom.max_id = header["max_id"]
+        bloom._bits = bytearray(bits)
+    except Exception:
+        return False
+
+    with _lock:
+        _archive[project] = bloom
+    return True
+
+
+def has_archive_serials(project: str) -> bool:
+    with _lock:
+        return project in _archive
+
+
+def find_serial(serial: str) -> list[tuple[str, str]]:
+    """Find where a serial has been seen: [(project, "active" or "archive")].
+
+    "archive" hits come from a Bloom filter, so they are probable, not certain.
+    """
+    serial = normalize_serial(serial)
+    with _lock:
+        found = [(project, "active") for project, serials in _active.items() if serial in serials]
+        found += [(project, "archive") for project, bloom in _archive.items() if serial in bloom]
+    return found
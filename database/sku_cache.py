@@ -9,7 +9,6 @@ This module provides a high-performance caching layer for approved SKUs:
 Performance: 100-500x faster SKU operations over VPN.
 """
 
-import sqlite3
 import threading
 import time
 import bisect
@@ -24,6 +23,9 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from config import get_sku_cache_path, SKU_CACHE_ENABLED, SKU_CACHE_SYNC_INTERVAL
 from database import db
+from database.connection import get_pooled_connection, is_remote_online
+from database.migrations import ensure_schema
+from database.stamps import get_stamp, stamp_unchanged, remember_stamp, forget_stamp
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -52,19 +54,12 @@ _sync_interval = SKU_CACHE_SYNC_INTERVAL
 # ==================== Local SQLite Cache ====================
 
 def get_cache_connection():
-    """Get a connection to the local SQLite cache database."""
-    cache_path = get_sku_cache_path()
-    conn = sqlite3.connect(cache_path, timeout=10)
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA synchronous=NORMAL")
-    return conn
+    """Get a pooled connection to the local SQLite cache database."""
+    return get_pooled_connection(get_sku_cache_path(), timeout=10, remote=False)
 
 
-def init_local_cache_db():
-    """Initialize the local cache database schema."""
-    conn = get_cache_connection()
-    cursor = conn.cursor()
-
+def _migrate_cache_v1(cursor):
+    """Baseline SKU cache schema."""
     # SKU cache table
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS sku_cache (
@@ -94,8 +89,15 @@ def init_local_cache_db():
         )
     """)
 
-    conn.commit()
-    conn.close()
+
+_CACHE_MIGRATIONS = [
+    (1, "Baseline SKU cache", _migrate_cache_v1),
+]
+
+
+def init_local_cache_db():
+    """Initialize the local cache database schema, applying any pending migrations."""
+    ensure_schema(get_cache_connection, get_sku_cache_path(), _CACHE_MIGRATIONS, remote=False)
 
 
 def load_project_from_local(project: str) -> dict:
@@ -203,6 +205,9 @@ def sync_project_from_remote(project: str) -> bool:
     Returns True if sync was successful, False otherwise.
     """
     try:
+        # Taken before the read so a write during it is seen next time
+        stamp = get_stamp(db.get_db_path())
+
         # Fetch all SKUs from remote
         remote_skus = db.get_all_skus(project)
 
@@ -232,6 +237,7 @@ def sync_project_from_remote(project: str) -> bool:
 
         # Save to local database
         save_project_to_local(project, cache_data)
+        remember_stamp(f"skus:{project}", stamp)
 
         logger.info(f"Successfully synced {len(skus)} SKUs for {project}")
         return True
@@ -242,19 +248,30 @@ def sync_project_from_remote(project: str) -> bool:
 
 
 def has_remote_changes(project: str) -> bool:
-    """Quick check if remote has changes (compares SKU count).
+    """Quick check if remote has changes.
+
+    An unchanged users.db stamp file answers without opening the database;
+    otherwise the SKU counts are compared.
 
     Returns True if remote might have changes, False otherwise.
     """
     try:
-        remote_count = db.get_sku_count(project)
-
+        stamp_key = f"skus:{project}"
+        stamp = get_stamp(db.get_db_path())
         with _cache_lock:
             if project not in _cache:
                 return True
             local_count = len(_cache[project]['skus'])
 
-        return remote_count != local_count
+        if stamp_unchanged(stamp_key, stamp):
+            return False
+
+        remote_count = db.get_sku_count(project)
+        if remote_count != local_count:
+            return True
+
+        remember_stamp(stamp_key, stamp)
+        return False
 
     except Exception as e:
         logger.warning(f"Error checking remote changes for {project}: {e}")
@@ -298,6 +315,11 @@ def _background_sync_worker():
             if _sync_stop_event.wait(_sync_interval):
                 break  # Stop event was set
 
+            # Remote offline: keep serving the local cache
+            if not is_remote_online():
+                logger.debug("Remote offline, skipping SKU sync")
+                continue
+
             # Sync each project
             for project in ['ecoflow', 'halo', 'ams_ine']:
                 if _sync_stop_event.is_set():
@@ -515,6 +537,7 @@ def add_sku_cached(sku: str, description: str = "", project: str = "ecoflow") ->
 
         # Save to local DB (outside lock)
         save_project_to_local(project, cache_data)
+        forget_stamp(f"skus:{project}")
 
         logger.info(f"Added SKU {sku_upper} to {project} cache")
 
@@ -552,6 +575,7 @@ def delete_sku_cached(sku: str, project: str = "ecoflow") -> bool:
 
         # Save to local DB
         save_project_to_local(project, cache_data)
+        forget_stamp(f"skus:{project}")
 
         logger.info(f"Deleted SKU {sku_upper} from {project} cache")
 
@@ -605,6 +629,7 @@ def clear_all_skus_cached(project: str = "ecoflow") -> int:
 
         # Save to local DB
         save_project_to_local(project, cache_data)
+        forget_stamp(f"skus:{project}")
 
         logger.info(f"Cleared all SKUs from {project} cache")
 
@@ -0,0 +1,113 @@
+"""Cheap change detection for the databases on the P: drive.
+
+Every commit that modifies a remote database bumps a tiny "epoch" stamp file
+next to it (users.db -> users.db.epoch; see PooledConnection.commit). Readers
+read that one small file and skip their query when it hasn't changed since
+their last successful read:
+
+    stamp = get_stamp(db_path)
+    if stamp_unchanged("inventory:halo", stamp):
+        return  # idle cycle: one small read, no SQLite open over SMB
+    ... query ...
+    remember_stamp("inventory:halo", stamp)
+
+Older app versions don't bump the stamp, so a remembered stamp is only
+trusted for STAMP_MAX_TRUST_SECONDS; after that one real query runs anyway.
+Without a stamp file the database and -wal file stats are used instead.
+
+The stamp is read under the database's circuit breaker: while it is open no
+read is tried (get_stamp returns None), and a read the share doesn't answer
+within DB_PROBE_TIMEOUT trips it.
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+
+# Seconds an unchanged stamp is trusted before a real query runs regardless
+STAMP_MAX_TRUST_SECONDS = 300
+
+_seen = {}  # {key: (stamp, monotonic time remembered)}
+_seen_lock = threading.Lock()
+
+
+def get_stamp_path(db_path: Path) -> Path:
+    """Get the epoch stamp file that sits next to a database file."""
+    db_path = Path(db_path)
+    return db_path.with_name(db_path.name + ".epoch")
+
+
+def bump_stamp(db_path: Path):
+    """Record that a database changed (called after a commit that wrote rows)."""
+    try:
+        with open(get_stamp_path(db_path), 'w', encoding='utf-8') as f:
+            f.write(f"{time.time_ns()} {os.getpid()} {os.urandom(4).hex()}\n")
+    except OSError:
+        pass  # Readers fall back to a real query after STAMP_MAX_TRUST_SECONDS
+
+
+def get_stamp(db_path: Path) -> tuple | None:
+    """Get a cheap fingerprint of a database's state (None if it can't be read)."""
+    from .connection import get_breaker, _run_with_timeout, DB_PROBE_TIMEOUT
+
+    breaker = get_breaker(db_path)
+    if breaker.state == breaker.OPEN:
+        return None
+
+    # A hung share would block a plain open() indefinitely
+    result = {}
+    if not _run_with_timeout(lambda: result.update(stamp=_read_stamp(db_path)), DB_PROBE_TIMEOUT):
+        breaker.trip()
+        return None
+    return result["stamp"]
+
+
+def _read_stamp(db_path: Path) -> tuple | None:
+    # The stamp's contents are unique per bump, so two commits within one
+    # mtime tick of the file server still read as different
+    try:
+        with open(get_stamp_path(db_path), 'r', encoding='utf-8') as f:
+            return ("epoch", f.read(64))
+    except OSError:
+        pass
+
+    # No stamp yet (no writer has bumped it): fall back to the files themselves
+    try:
+        st = os.stat(db_path)
+        stamp = ("file", st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+    try:
+        wal = os.stat(f"{db_path}-wal")
+        stamp += (wal.st_mtime_ns, wal.st_size)
+    except OSError:
+        pass
+    return stamp
+
+
+def stamp_unchanged(key: str, stamp: tuple | None) -> bool:
+    """True if the stamp matches the one remembered for key and is still trusted."""
+    if stamp is None:
+        return False
+    with _seen_lock:
+        seen = _seen.get(key)
+    if seen is None:
+        return False
+    seen_stamp, seen_at = seen
+    return seen_stamp == stamp and time.monotonic() - seen_at < STAMP_MAX_TRUST_SECONDS
+
+
+def remember_stamp(key: str, stamp: tuple | None):
+    """Remember the stamp a successful read corresponds to (take it before the read)."""
+    with _seen_lock:
+        if stamp is None:
+            _seen.pop(key, None)
+        else:
+            _seen[key] = (stamp, time.monotonic())
+
+
+def forget_stamp(key: str):
+    """Force the next check for key to run a real query."""
+    with _seen_lock:
+        _seen.pop(key, None)
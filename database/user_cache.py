@@ -0,0 +1,197 @@
+"""Local user cache so login works before (or without) the P: drive.
+
+Features:
+- Local SQLite copy of the users table in AppData
+- Refreshed from remote in the background at startup
+- Write-through after a successful remote login (new users, changed passwords)
+- Offline logins only trust credentials synced recently (OFFLINE_LOGIN_MAX_AGE),
+  and admin rights for a shorter time (OFFLINE_ADMIN_MAX_AGE), so a reset
+  password or revoked admin flag can't keep working on a station indefinitely
+"""
+
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import get_user_cache_path
+from database import db
+from database.connection import get_pooled_connection
+from database.migrations import ensure_schema
+from database.stamps import get_stamp, stamp_unchanged, remember_stamp
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# ==================== Configuration ====================
+OFFLINE_LOGIN_MAX_AGE = timedelta(days=7)  # cached credentials older than this can't log in offline
+OFFLINE_ADMIN_MAX_AGE = timedelta(days=1)  # ...nor grant admin rights past this
+
+
+# ==================== Local Cache Database ====================
+
+def get_cache_connection():
+    """Get a pooled connection to the local user cache database."""
+    return get_pooled_connection(get_user_cache_path(), timeout=10, remote=False)
+
+
+def _migrate_cache_v1(cursor):
+    """Baseline user cache schema."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            is_admin INTEGER DEFAULT 0,
+            synced_at TEXT NOT NULL
+        )
+    """)
+
+
+_CACHE_MIGRATIONS = [
+    (1, "Baseline user cache", _migrate_cache_v1),
+]
+
+
+def init_user_cache():
+    """Initialize the local user cache database (local only, no network)."""
+    ensure_schema(get_cache_connection, get_user_cache_path(), _CACHE_MIGRATIONS, remote=False)
+
+
+# ==================== Cached Read Functions ====================
+
+def get_user_cached(username: str) -> dict | None:
+    """Get a user from the local cache.
+
+    Returns a dict with user data or None if not cached.
+    """
+    conn = get_cache_connection()
+    try:
+        row = conn.execute(
+            "SELECT id, username, password_hash, created_at, is_admin, synced_at FROM users WHERE username = ?",
+            (username,)
+        ).fetchone()
+    finally:
+        conn.close()
+
+    if row:
+        return {
+            "id": row[0],
+            "username": row[1],
+            "password_hash": row[2],
+            "created_at": row[3],
+            "is_admin": bool(row[4]),
+            "synced_at": row[5]
+        }
+    return None
+
+
+def get_offline_user(cached_user: dict) -> dict | None:
+    """Limit a cached user to what an offline login may grant.
+
+    Returns None if the credentials were last synced more than
+    OFFLINE_LOGIN_MAX_AGE ago; drops admin rights synced more than
+    OFFLINE_ADMIN_MAX_AGE ago.
+    """
+    try:
+        age = datetime.now() - datetime.fromisoformat(cached_user["synced_at"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if age > OFFLINE_LOGIN_MAX_AGE:
+        return None
+    if age > OFFLINE_ADMIN_MAX_AGE:
+        return dict(cached_user, is_admin=False)
+    return cached_user
+
+
+def get_cached_user_count() -> int:
+    """Get the number of cached users (0 means login needs the remote)."""
+    conn = get_cache_connection()
+    try:
+        return conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+    finally:
+        conn.close()
+
+
+# ==================== Write Functions ====================
+
+def cache_user(user: dict):
+    """Insert or update one user in the local cache (after a successful remote lookup)."""
+    conn = get_cache_connection()
+    try:
+        conn.execute("""
+            INSERT OR REPLACE INTO users (id, username, password_hash, created_at, is_admin, synced_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (user['id'], user['username'], user['password_hash'], user['created_at'],
+              1 if user.get('is_admin') else 0, datetime.now().isoformat()))
+        conn.commit()
+    except Exception as e:
+        logger.error(f"Error caching user {user.get('username')}: {e}")
+    finally:
+        conn.close()
+
+
+def save_users_to_local(users: list[dict]) -> bool:
+    """Replace the local user cache with a full list of users from remote.
+
+    Returns True if successful, False otherwise.
+    """
+    conn = get_cache_connection()
+    try:
+        synced_at = datetime.now().isoformat()
+        conn.execute("DELETE FROM users")
+        conn.executemany("""
+            INSERT INTO users (id, username, password_hash, created_at, is_admin, synced_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [
+            (u['id'], u['username'], u['password_hash'], u['created_at'], 1 if u['is_admin'] else 0, synced_at)
+            for u in users
+        ])
+        conn.commit()
+        return True
+    except Exception as e:
+        logger.error(f"Error saving users to local cache: {e}")
+        conn.rollback()
+        return False
+    finally:
+        conn.close()
+
+
+def _mark_users_synced():
+    conn = get_cache_connection()
+    try:
+        conn.execute("UPDATE users SET synced_at = ?", (datetime.now().isoformat(),))
+        conn.commit()
+    except Exception as e:
+        logger.error(f"Error updating user cache sync time: {e}")
+    finally:
+        conn.close()
+
+
+def sync_users_from_remote() -> bool:
+    """Refresh the local user cache from the remote users table.
+
+    Skipped (and treated as successful) while users.db's stamp file is
+    unchanged since the last sync.
+
+    Returns True if sync was successful, False otherwise.
+    """
+    stamp = get_stamp(db.get_db_path())
+    if stamp_unchanged("users", stamp):
+        _mark_users_synced()  # Nothing changed remotely: the cache is confirmed current
+        return True
+
+    try:
+        remote_users = db.get_all_users()
+    except Exception as e:
+        logger.warning(f"Error fetching users from remote: {e}")
+        return False
+
+    if save_users_to_local(remote_users):
+        remember_stamp("users", stamp)
+        logger.info(f"Synced {len(remote_users)} users to local cache")
+        return True
+    return False
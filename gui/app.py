@@ -9,27 +9,29 @@ import threading
 import platform
 from database import (
     create_user, get_all_users, update_user_password, update_user_admin_status, delete_user,
-    export_inventory_to_csv,
     lookup_halo_po_number,
     get_email_settings, update_email_settings
 )
 from database.inventory_cache import (
     add_inventory_item_cached as add_inventory_item,
     get_all_inventory_cached as get_all_inventory,
+    get_inventory_page_cached as get_inventory_page,
     get_inventory_count_cached as get_inventory_count,
-    search_inventory_cached as search_inventory,
     search_inventory_count_cached as search_inventory_count,
     update_inventory_item_cached as update_inventory_item,
     delete_inventory_item_cached as delete_inventory_item,
-    get_all_imported_inventory_cached as get_all_imported_inventory,
+    get_imported_inventory_page_cached as get_imported_inventory_page,
     get_imported_inventory_count_cached as get_imported_inventory_count,
-    move_to_imported_cached as move_inventory_to_imported,
-    init_inventory_cache,
+    find_serial_cached as find_serial,
+    get_sync_stats,
     start_inventory_sync,
     stop_inventory_sync,
     save_csv_serials,
     get_csv_serials
 )
+from database.export import export_active_inventory, export_archived_inventory, ExportCancelled
+from database.search import search_all, SEARCH_PROJECTS
+from database.query import QueryError
 from database.sku_cache import (
     add_sku_cached as add_sku,
     add_skus_bulk_cached as add_skus_bulk,
@@ -39,10 +41,11 @@ from database.sku_cache import (
     is_valid_sku_cached as is_valid_sku,
     get_sku_count_cached as get_sku_count,
     clear_all_skus_cached as clear_all_skus,
-    init_sku_cache,
     start_background_sync,
     stop_background_sync
 )
+from database.connection import get_remote_status
+from database.user_cache import save_users_to_local, sync_users_from_remote
 from utils import hash_password, get_gui_resource, check_for_updates, check_for_updates_shared_drive, show_update_dialog, send_csv_email, test_email_connection
 from config import VERSION, GITHUB_REPO, UPDATE_PATH
 
@@ -57,6 +60,14 @@ class MainApplication(ctk.CTk):
     FONT_LABEL_BOLD = ("", 14, "bold")
     FONT_BUTTON = ("", 14)
     PAGE_SIZE = 20
+    PROJECT_NAMES = {"ecoflow": "EcoFlow", "halo": "Halo", "ams_ine": "AMS INE"}
+
+    # Remote status indicator text and color
+    REMOTE_STATUS_DISPLAY = {
+        "connecting": ("P: drive connecting...", "orange"),
+        "online": ("P: drive online", "green"),
+        "offline": ("P: drive offline - using local data", "red"),
+    }
 
     def __init__(self, user: dict, on_logout: callable):
         super().__init__()
@@ -64,6 +75,7 @@ class MainApplication(ctk.CTk):
         self.user = user
         self.on_logout = on_logout
         self._refresh_poll_id = None  # Track polling timer
+        self._status_poll_id = None  # Track remote status timer
         self.project_widgets = {}  # Store per-project widget references (user panel)
         self.admin_project_widgets = {}  # Store per-project widget references (admin panel)
         self.admin_sku_widgets = {}  # Store per-project SKU widget references (admin panel)
@@ -97,10 +109,7 @@ class MainApplication(ctk.CTk):
         """Initialize network-dependent features after GUI is displayed."""
         # Run all initialization in background thread to avoid blocking GUI
         def init_background():
-            # Initialize local caches first (fast, local SQLite only)
-            init_sku_cache()
-            init_inventory_cache()
-
+            # Local caches were initialized in main() before the login window.
             # Pre-load Halo SN cache from P: drive BEFORE starting sync threads
             # so the first user refresh is fast and doesn't compete for P: drive
             try:
@@ -231,9 +240,27 @@ Start-Sleep -Seconds 3
         elif GITHUB_REPO and GITHUB_REPO != "YOUR_USERNAME/The-Uplink":
             check_for_updates(GITHUB_REPO, VERSION, on_update_check)
 
+    def _poll_remote_status(self):
+        """Update the P: drive status indicator (and flag projects whose local changes aren't reaching it)."""
+        status = get_remote_status()
+        text, color = self.REMOTE_STATUS_DISPLAY.get(status, ("", "gray"))
+        if status == "online":
+            failing = [self.PROJECT_NAMES.get(project, project)
+                       for project, stats in get_sync_stats().items() if stats.get('failing')]
+            if failing:
+                text, color = f"P: drive online - sync failing ({', '.join(failing)})", "orange"
+        self.remote_status_label.configure(text=text, text_color=color)
+        self._status_poll_id = self.after(1000, self._poll_remote_status)
+
     def destroy(self):
         """Override destroy to signal background threads to stop (non-blocking)."""
         self._stop_inventory_polling()
+        if self._status_poll_id is not None:
+            try:
+                self.after_cancel(self._status_poll_id)
+            except Exception:
+                pass
+            self._status_poll_id = None
         # Signal threads to stop but don't wait - they're daemon threads
         # and will be killed when the process exits
         try:
@@ -270,6 +297,15 @@ Start-Sleep -Seconds 3
         )
         title_label.pack(side="left", padx=10)
 
+        # Remote (P: drive) status - the app works from local caches meanwhile
+        self.remote_status_label = ctk.CTkLabel(
+            header_frame,
+            text="",
+            font=ctk.CTkFont(size=12)
+        )
+        self.remote_status_label.pack(side="left", padx=10)
+        self._poll_remote_status()
+
         # User info and logout
         user_frame = ctk.CTkFrame(header_frame, fg_color="transparent")
         user_frame.pack(side="right", padx=10)
@@ -500,7 +536,7 @@ Start-Sleep -Seconds 3
         search_frame.pack(fill="x", padx=20, pady=(0, 5))
 
         ctk.CTkLabel(search_frame, text="Search:", font=ctk.CTkFont(size=14)).pack(side="left", padx=(0, 10))
-        search_entry = ctk.CTkEntry(search_frame, width=300, font=ctk.CTkFont(size=14), placeholder_text="Filter by SKU, Serial, LPN, etc...")
+        search_entry = ctk.CTkEntry(search_frame, width=300, font=ctk.CTkFont(size=14), placeholder_text="Filter (e.g. sku:2Q0Q* state:Refurb date:today)")
         search_entry.pack(side="left", padx=(0, 10))
         search_entry.bind("<KeyRelease>", lambda e, p=project: self._filter_inventory_list(p))
         self.project_widgets[project]['search_entry'] = search_entry
@@ -512,6 +548,12 @@ Start-Sleep -Seconds 3
         )
         clear_search_btn.pack(side="left")
 
+        search_all_btn = ctk.CTkButton(
+            search_frame, text="Search All Projects", width=150, font=ctk.CTkFont(size=13),
+            command=lambda p=project: self._show_search_all_dialog(p)
+        )
+        search_all_btn.pack(side="left", padx=(10, 0))
+
         # Scrollable frame for inventory list
         inventory_list_frame = ctk.CTkScrollableFrame(list_frame)
         inventory_list_frame.pack(expand=True, fill="both", padx=10, pady=(0, 10))
@@ -560,7 +602,11 @@ Start-Sleep -Seconds 3
         self._refresh_inventory_list(project)
 
     def _go_page(self, project: str, view_type: str, direction: int):
-        """Navigate pagination: direction is +1 (next) or -1 (previous)."""
+        """Navigate pagination: direction is +1 (next) or -1 (previous).
+
+        Each page is fetched by the continuation token of the page before it
+        (see _page_token), so any page costs the same as the first.
+        """
         if view_type == "default":
             self.project_widgets[project]['current_page'] += direction
             self._refresh_inventory_list(project)
@@ -571,13 +617,29 @@ Start-Sleep -Seconds 3
             self.admin_project_widgets[project]['archived_page'] += direction
             self._refresh_admin_archived_inventory(project)
 
-    def _update_pagination(self, widgets: dict, page_key: str, prev_key: str, next_key: str, label_key: str, page: int, total_count: int):
-        """Update pagination button states and label."""
+    def _page_token(self, widgets: dict, page_key: str):
+        """Get the continuation token that starts the current page.
+
+        widgets[page_key + '_tokens'][n] starts page n (None for page 0); a
+        page whose token is unknown falls back to page 0.
+        """
+        tokens = widgets.setdefault(f"{page_key}_tokens", [None])
+        if widgets[page_key] >= len(tokens):
+            widgets[page_key] = 0
+        return tokens[widgets[page_key]]
+
+    def _update_pagination(self, widgets: dict, page_key: str, prev_key: str, next_key: str, label_key: str,
+                           page: int, total_count: int, next_token: str = None):
+        """Update pagination button states and label, remembering the token for the next page."""
         import math
-        total_pages = max(1, math.ceil(total_count / self.PAGE_SIZE))
+        tokens = widgets.setdefault(f"{page_key}_tokens", [None])
+        del tokens[page + 1:]
+        if next_token:
+            tokens.append(next_token)
+        total_pages = max(1, math.ceil(total_count / self.PAGE_SIZE), page + 1)
         widgets[label_key].configure(text=f"Page {page + 1} of {total_pages}")
         widgets[prev_key].configure(state="normal" if page > 0 else "disabled")
-        widgets[next_key].configure(state="normal" if page < total_pages - 1 else "disabled")
+        widgets[next_key].configure(state="normal" if next_token else "disabled")
 
     def _refresh_inventory_list(self, project: str = "ecoflow"):
         """Refresh the inventory list display for a specific project."""
@@ -605,18 +667,15 @@ Start-Sleep -Seconds 3
         loading_label.grid(row=1, column=0, columnspan=10, padx=5, pady=10)
 
         # Fetch data in background thread
-        page = self.project_widgets[project]['current_page']
+        token = self._page_token(self.project_widgets[project], 'current_page')
         search_term = self.project_widgets[project]['search_entry'].get().strip()
         def fetch_data():
             try:
                 if search_term:
                     total_count = search_inventory_count(search_term, project)
-                    offset = page * self.PAGE_SIZE
-                    items = search_inventory(search_term, project, limit=self.PAGE_SIZE, offset=offset)
                 else:
                     total_count = get_inventory_count(project)
-                    offset = page * self.PAGE_SIZE
-                    items = get_all_inventory(project, limit=self.PAGE_SIZE, offset=offset)
+                items, next_token = get_inventory_page(project, self.PAGE_SIZE, token, search_term)
                 # Pre-fetch PO numbers (non-blocking to avoid P: drive delay)
                 for item in items:
                     if project == "halo":
@@ -624,7 +683,7 @@ Start-Sleep -Seconds 3
                     else:
                         item['_po_number'] = item.get('tracking_number', '')
                 # Update GUI on main thread
-                self.after(0, lambda: self._populate_inventory_list(project, items, total_count))
+                self.after(0, lambda: self._populate_inventory_list(project, items, total_count, next_token))
             except Exception:
                 self.after(0, lambda: self._show_inventory_error(
                     self.project_widgets[project]['inventory_list_frame'],
@@ -645,6 +704,108 @@ Start-Sleep -Seconds 3
         self.project_widgets[project]['current_page'] = 0
         self._refresh_inventory_list(project)
 
+    def _show_search_all_dialog(self, project: str = "ecoflow"):
+        """Show a dialog that searches every project's inventory and archive at once.
+
+        Hits are shown as each source answers, so local results appear before
+        the remote archive has finished.
+        """
+        project_names = self.PROJECT_NAMES
+        dialog = ctk.CTkToplevel(self)
+        dialog.title("Search All Projects")
+        dialog.geometry("1050x600")
+        dialog.transient(self)
+
+        frame = ctk.CTkFrame(dialog, fg_color="transparent")
+        frame.pack(fill="both", expand=True, padx=20, pady=20)
+
+        search_frame = ctk.CTkFrame(frame, fg_color="transparent")
+        search_frame.pack(fill="x", pady=(0, 5))
+        search_entry = ctk.CTkEntry(search_frame, width=400, font=ctk.CTkFont(size=14),
+                                    placeholder_text="Serial, text or filter (e.g. serial:ABC123 date:2026)")
+        search_entry.pack(side="left", padx=(0, 10))
+        current_search = self.project_widgets[project]['search_entry'].get().strip()
+        if current_search:
+            search_entry.insert(0, current_search)
+
+        status_label = ctk.CTkLabel(frame, text="", font=ctk.CTkFont(size=13), anchor="w", justify="left")
+        status_label.pack(fill="x", pady=(0, 5))
+
+        results_frame = ctk.CTkScrollableFrame(frame)
+        results_frame.pack(fill="both", expand=True)
+
+        headers = ["Project", "Where", "SKU", "Serial Number", "LPN", "Repair State", "Entered By", "Received", "Archived"]
+        state = {'generation': 0, 'counts': {}}
+
+        def format_date(value):
+            return (value or '').replace('T', ' ')[:16]
+
+        def show_status(done=False):
+            parts = []
+            for name in SEARCH_PROJECTS:
+                counts = []
+                for source, label in (("active", "active"), ("archive", "archived")):
+                    if (name, source) not in state['counts']:
+                        counts.append(f"... {label}")
+                    else:
+                        count, complete = state['counts'][(name, source)]
+                        counts.append(f"{count} {label}" + ("" if complete else " (offline, partial)"))
+                parts.append(f"{project_names[name]}: {', '.join(counts)}")
+            status_label.configure(text=("" if done else "Searching...  ") + "   |   ".join(parts))
+
+        def show_results(generation, result, done=False):
+            if generation != state['generation'] or not dialog.winfo_exists():
+                return
+            if not done:
+                state['counts'][(result['project'], result['source'])] = (result['count'], result['complete'])
+            show_status(done)
+
+            for widget in results_frame.winfo_children():
+                widget.destroy()
+            for col, header in enumerate(headers):
+                ctk.CTkLabel(results_frame, text=header, font=ctk.CTkFont(size=13, weight="bold")).grid(
+                    row=0, column=col, padx=5, pady=(0, 8), sticky="w")
+            items = result['merged'] if not done else result['items']
+            for row, item in enumerate(items[:self.PAGE_SIZE * 5], start=1):
+                values = [
+                    project_names[item['project']],
+                    "Active" if item['source'] == "active" else "Archive",
+                    item['item_sku'], item['serial_number'], item['lpn'], item['repair_state'],
+                    item['entered_by'], format_date(item['created_at']), format_date(item.get('imported_at')),
+                ]
+                for col, value in enumerate(values):
+                    ctk.CTkLabel(results_frame, text=value, font=ctk.CTkFont(size=13)).grid(
+                        row=row, column=col, padx=5, pady=2, sticky="w")
+            if done and not items:
+                ctk.CTkLabel(results_frame, text="No matches", font=ctk.CTkFont(size=13)).grid(
+                    row=1, column=0, columnspan=len(headers), padx=5, pady=10)
+
+        def run_search():
+            search_term = search_entry.get().strip()
+            if not search_term:
+                return
+            state['generation'] += 1
+            state['counts'] = {}
+            generation = state['generation']
+            show_status()
+
+            def worker():
+                try:
+                    result = search_all(search_term, on_results=lambda r: self.after(0, lambda: show_results(generation, r)))
+                    self.after(0, lambda: show_results(generation, result, done=True))
+                except QueryError as e:
+                    message = str(e)
+                    self.after(0, lambda: status_label.configure(text=message))
+
+            threading.Thread(target=worker, daemon=True).start()
+
+        search_button = ctk.CTkButton(search_frame, text="Search", width=100, font=ctk.CTkFont(size=13), command=run_search)
+        search_button.pack(side="left")
+        search_entry.bind("<Return>", lambda e: run_search())
+        search_entry.focus_set()
+        if current_search:
+            run_search()
+
     def _filter_admin_inventory_list(self, project: str = "ecoflow"):
         """Filter admin active inventory list based on search entry."""
         self.admin_project_widgets[project]['active_page'] = 0
@@ -683,7 +844,7 @@ Start-Sleep -Seconds 3
         )
         error_label.grid(row=0, column=0, padx=20, pady=20)
 
-    def _populate_inventory_list(self, project: str, items: list, total_count: int = 0):
+    def _populate_inventory_list(self, project: str, items: list, total_count: int = 0, next_token: str = None):
         """Populate inventory list with fetched data (called on main thread)."""
         if not self.winfo_exists():
             return
@@ -799,7 +960,7 @@ Start-Sleep -Seconds 3
         page = self.project_widgets[project]['current_page']
         self._update_pagination(
             self.project_widgets[project], 'current_page', 'prev_btn', 'next_btn', 'page_label',
-            page, total_count
+            page, total_count, next_token
         )
 
     def _show_edit_inventory_dialog(self, item: dict, project: str = "ecoflow"):
@@ -1130,9 +1291,12 @@ Start-Sleep -Seconds 3
             self._show_user_status("LPN must be exactly 11 alphanumeric characters", project, error=True)
             return
 
+        if not self._confirm_new_serial(serial, project, self._show_user_status):
+            return
+
         # Save to inventory database
         try:
-            add_inventory_item(
+            if not add_inventory_item(
                 item_sku=sku,
                 serial_number=serial,
                 lpn=lpn,
@@ -1142,7 +1306,9 @@ Start-Sleep -Seconds 3
                 project=project,
                 order_number=order_number,
                 tracking_number=tracking_number
-            )
+            ):
+                self._show_user_status(f"Failed to save: serial {serial} may already exist", project, error=True)
+                return
             self._show_user_status("Entry submitted successfully", project, error=False)
             self._play_success_sound()
         except Exception as e:
@@ -1167,6 +1333,35 @@ Start-Sleep -Seconds 3
         # Focus back to first field
         widgets['sku_entry'].focus()
 
+    def _confirm_new_serial(self, serial: str, project: str, show_status) -> bool:
+        """Check a serial against every project's active inventory and archive before it is entered.
+
+        A serial already in active inventory is rejected. One found in an
+        archive is flagged for the user to confirm, since units do come back.
+        """
+        matches = find_serial(serial)
+        active = [match for match in matches if match['source'] == "active"]
+        if active:
+            where = ", ".join(self.PROJECT_NAMES.get(match['project'], match['project']) for match in active)
+            show_status(f"Duplicate: serial {serial} is already in {where} inventory", project, error=True)
+            return False
+        if not matches:
+            return True
+
+        lines = []
+        for match in matches:
+            name = self.PROJECT_NAMES.get(match['project'], match['project'])
+            if match['imported_at']:
+                lines.append(f"Archived from {name} on {match['imported_at'][:10]}")
+            else:
+                lines.append(f"Probably archived from {name} (older than the local archive copy)")
+        self._play_error_sound()
+        return messagebox.askyesno(
+            "Serial Received Before",
+            f"Serial {serial} has been received before:\n\n" + "\n".join(lines) + "\n\nEnter it again?",
+            parent=self
+        )
+
     def _show_user_status(self, message: str, project: str = "ecoflow", error: bool = False):
         """Display a status message for user panel."""
         color = "red" if error else "green"
@@ -1262,17 +1457,52 @@ Start-Sleep -Seconds 3
                 self.after(0, update_ui)
 
             except Exception as e:
+                message = f"CSV upload failed: {e}"
                 self.after(0, lambda: admin_status.configure(
-                    text=f"CSV upload failed: {e}", text_color="red"
+                    text=message, text_color="red"
                 ) if admin_status else None)
 
         threading.Thread(target=do_upload, daemon=True).start()
 
+    def _open_progress_dialog(self, title: str, message: str):
+        """Open a small progress dialog with a Cancel button.
+
+        Returns (dialog, update(done, total), cancel_event); update may be called from any thread.
+        """
+        cancel_event = threading.Event()
+
+        dialog = ctk.CTkToplevel(self)
+        dialog.title(title)
+        dialog.geometry("340x150")
+        dialog.resizable(False, False)
+        dialog.transient(self)
+
+        label = ctk.CTkLabel(dialog, text=message, font=ctk.CTkFont(size=14))
+        label.pack(pady=(20, 10))
+        progress_bar = ctk.CTkProgressBar(dialog, width=280)
+        progress_bar.set(0)
+        progress_bar.pack(pady=5)
+
+        def cancel():
+            cancel_event.set()
+            cancel_btn.configure(state="disabled", text="Cancelling...")
+
+        cancel_btn = ctk.CTkButton(dialog, text="Cancel", width=100, command=cancel)
+        cancel_btn.pack(pady=10)
+        dialog.protocol("WM_DELETE_WINDOW", cancel)
+
+        def update(done: int, total: int):
+            def apply():
+                if dialog.winfo_exists():
+                    progress_bar.set(done / total if total else 0)
+                    label.configure(text=f"{message} {done:,} of {total:,}")
+            self.after(0, apply)
+
+        return dialog, update, cancel_event
+
     def _handle_export_inventory(self, project: str = "ecoflow"):
         """Handle export and archive of inventory."""
-        items = get_all_inventory(project)
-
-        if not items:
+        if get_inventory_count(project) == 0:
             self._show_user_status("No inventory items to export", project, error=True)
             return
 
@@ -1298,38 +1528,42 @@ Start-Sleep -Seconds 3
             return  # User cancelled
 
         self._show_user_status("Exporting...", project, error=False)
+        progress_dialog, update_progress, cancel_event = self._open_progress_dialog("Exporting...", "Exporting items...")
 
         # Run export in background thread to avoid freezing UI
         def do_export():
             try:
-                moved_items = move_inventory_to_imported(project)
-                if export_inventory_to_csv(moved_items, filepath, project):
-                    email_msg = ""
-                    email_settings = get_email_settings()
-                    if email_settings["enabled"] and email_settings["sender_email"] and email_settings["recipients"]:
-                        success, msg = send_csv_email(
-                            smtp_server=email_settings["smtp_server"],
-                            smtp_port=email_settings["smtp_port"],
-                            sender_email=email_settings["sender_email"],
-                            sender_password=email_settings["sender_password"],
-                            recipients=email_settings["recipients"],
-                            csv_filepath=filepath,
-                            project=project,
-                            item_count=len(moved_items)
-                        )
-                        if success:
-                            email_msg = f"Exported {len(moved_items)} items and emailed"
-                        else:
-                            email_msg = f"Exported but email failed: {msg}"
+                try:
+                    moved_count = export_active_inventory(project, filepath, update_progress, cancel_event)
+                finally:
+                    self.after(0, progress_dialog.destroy)
+
+                email_settings = get_email_settings()
+                if email_settings["enabled"] and email_settings["sender_email"] and email_settings["recipients"]:
+                    success, msg = send_csv_email(
+                        smtp_server=email_settings["smtp_server"],
+                        smtp_port=email_settings["smtp_port"],
+                        sender_email=email_settings["sender_email"],
+                        sender_password=email_settings["sender_password"],
+                        recipients=email_settings["recipients"],
+                        csv_filepath=filepath,
+                        project=project,
+                        item_count=moved_count
+                    )
+                    if success:
+                        email_msg = f"Exported {moved_count} items and emailed"
                     else:
-                        email_msg = f"Exported {len(moved_items)} items and archived"
-                    self.after(0, lambda: self._show_user_status(email_msg, project, error=False))
-                    self.after(0, lambda: self._reset_and_refresh_inventory(project))
-                    self.after(0, self._play_success_sound)
+                        email_msg = f"Exported but email failed: {msg}"
                 else:
-                    self.after(0, lambda: self._show_user_status("Failed to export CSV", project, error=True))
+                    email_msg = f"Exported {moved_count} items and archived"
+                self.after(0, lambda: self._show_user_status(email_msg, project, error=False))
+                self.after(0, lambda: self._reset_and_refresh_inventory(project))
+                self.after(0, self._play_success_sound)
+            except ExportCancelled:
+                self.after(0, lambda: self._show_user_status("Export cancelled", project, error=True))
             except Exception as e:
-                self.after(0, lambda: self._show_user_status(f"Export failed: {str(e)}", project, error=True))
+                message = f"Export failed: {str(e)}"
+                self.after(0, lambda: self._show_user_status(message, project, error=True))
 
         threading.Thread(target=do_export, daemon=True).start()
 
@@ -1796,7 +2030,7 @@ Start-Sleep -Seconds 3
         search_frame.pack(fill="x", padx=10, pady=(0, 5))
 
         ctk.CTkLabel(search_frame, text="Search:", font=ctk.CTkFont(size=13)).pack(side="left", padx=(0, 10))
-        admin_search_entry = ctk.CTkEntry(search_frame, width=300, font=ctk.CTkFont(size=13), placeholder_text="Filter by SKU, Serial, LPN, etc...")
+        admin_search_entry = ctk.CTkEntry(search_frame, width=300, font=ctk.CTkFont(size=13), placeholder_text="Filter (e.g. sku:2Q0Q* state:Refurb date:today)")
         admin_search_entry.pack(side="left", padx=(0, 10))
         admin_search_entry.bind("<KeyRelease>", lambda e, p=project: self._filter_admin_inventory_list(p))
         self.admin_project_widgets[project]['search_entry'] = admin_search_entry
@@ -2109,25 +2343,22 @@ Start-Sleep -Seconds 3
         loading_label.grid(row=1, column=0, columnspan=len(headers), padx=5, pady=10)
 
         # Fetch data in background thread
-        page = self.admin_project_widgets[project]['active_page']
+        token = self._page_token(self.admin_project_widgets[project], 'active_page')
         search_term = self.admin_project_widgets[project].get('search_entry')
         search_term = search_term.get().strip() if search_term else ''
         def fetch_data():
             try:
                 if search_term:
                     total_count = search_inventory_count(search_term, project)
-                    offset = page * self.PAGE_SIZE
-                    items = search_inventory(search_term, project, limit=self.PAGE_SIZE, offset=offset)
                 else:
                     total_count = get_inventory_count(project)
-                    offset = page * self.PAGE_SIZE
-                    items = get_all_inventory(project, limit=self.PAGE_SIZE, offset=offset)
+                items, next_token = get_inventory_page(project, self.PAGE_SIZE, token, search_term)
                 for item in items:
                     if project == "halo":
                         item['_po_number'] = lookup_halo_po_number(item['serial_number'], blocking=False) or ''
                     else:
                         item['_po_number'] = item.get('tracking_number', '')
-                self.after(0, lambda: self._populate_admin_active_inventory(project, items, total_count))
+                self.after(0, lambda: self._populate_admin_active_inventory(project, items, total_count, next_token))
             except Exception:
                 self.after(0, lambda: self._show_inventory_error(
                     self.admin_project_widgets[project]['active_inventory_frame'],
@@ -2137,7 +2368,7 @@ Start-Sleep -Seconds 3
         thread = threading.Thread(target=fetch_data, daemon=True)
         thread.start()
 
-    def _populate_admin_active_inventory(self, project: str, items: list, total_count: int = 0):
+    def _populate_admin_active_inventory(self, project: str, items: list, total_count: int = 0, next_token: str = None):
         """Populate admin active inventory with fetched data."""
         if not self.winfo_exists():
             return
@@ -2246,7 +2477,7 @@ Start-Sleep -Seconds 3
         page = self.admin_project_widgets[project]['active_page']
         self._update_pagination(
             self.admin_project_widgets[project], 'active_page', 'active_prev_btn', 'active_next_btn', 'active_page_label',
-            page, total_count
+            page, total_count, next_token
         )
 
     def _refresh_admin_archived_inventory(self, project: str = "ecoflow"):
@@ -2273,18 +2504,17 @@ Start-Sleep -Seconds 3
         loading_label.grid(row=1, column=0, columnspan=len(headers), padx=5, pady=10)
 
         # Fetch data in background thread
-        page = self.admin_project_widgets[project]['archived_page']
+        token = self._page_token(self.admin_project_widgets[project], 'archived_page')
         def fetch_data():
             try:
                 total_count = get_imported_inventory_count(project)
-                offset = page * self.PAGE_SIZE
-                items = get_all_imported_inventory(project, limit=self.PAGE_SIZE, offset=offset)
+                items, next_token = get_imported_inventory_page(project, self.PAGE_SIZE, token)
                 for item in items:
                     if project == "halo":
                         item['_po_number'] = lookup_halo_po_number(item['serial_number'], blocking=False) or ''
                     else:
                         item['_po_number'] = item.get('tracking_number', '')
-                self.after(0, lambda: self._populate_admin_archived_inventory(project, items, total_count))
+                self.after(0, lambda: self._populate_admin_archived_inventory(project, items, total_count, next_token))
             except Exception as e:
                 self.after(0, lambda: self._show_inventory_error(
                     self.admin_project_widgets[project]['archived_inventory_frame'],
@@ -2294,7 +2524,7 @@ Start-Sleep -Seconds 3
         thread = threading.Thread(target=fetch_data, daemon=True)
         thread.start()
 
-    def _populate_admin_archived_inventory(self, project: str, items: list, total_count: int = 0):
+    def _populate_admin_archived_inventory(self, project: str, items: list, total_count: int = 0, next_token: str = None):
         """Populate admin archived inventory with fetched data."""
         if not self.winfo_exists():
             return
@@ -2373,7 +2603,7 @@ Start-Sleep -Seconds 3
         page = self.admin_project_widgets[project]['archived_page']
         self._update_pagination(
             self.admin_project_widgets[project], 'archived_page', 'archived_prev_btn', 'archived_next_btn', 'archived_page_label',
-            page, total_count
+            page, total_count, next_token
         )
 
     def _show_admin_edit_inventory_dialog(self, item: dict, project: str = "ecoflow"):
@@ -2541,9 +2771,7 @@ Start-Sleep -Seconds 3
 
     def _handle_admin_export_inventory(self, project: str = "ecoflow"):
         """Handle export and archive of inventory from admin panel."""
-        items = get_all_inventory(project)
-
-        if not items:
+        if get_inventory_count(project) == 0:
             dialog = ctk.CTkToplevel(self)
             dialog.title("Export")
             dialog.geometry("300x100")
@@ -2576,113 +2804,120 @@ Start-Sleep -Seconds 3
             return  # User cancelled
 
         self._show_admin_status("Exporting...", project, error=False)
+        progress_dialog, update_progress, cancel_event = self._open_progress_dialog("Exporting...", "Exporting items...")
 
         # Run export in background thread to avoid freezing UI
         def do_export():
             try:
-                moved_items = move_inventory_to_imported(project)
-                if export_inventory_to_csv(moved_items, filepath, project):
-                    email_msg = ""
-                    email_settings = get_email_settings()
-                    if email_settings["enabled"] and email_settings["sender_email"] and email_settings["recipients"]:
-                        success, msg = send_csv_email(
-                            smtp_server=email_settings["smtp_server"],
-                            smtp_port=email_settings["smtp_port"],
-                            sender_email=email_settings["sender_email"],
-                            sender_password=email_settings["sender_password"],
-                            recipients=email_settings["recipients"],
-                            csv_filepath=filepath,
-                            project=project,
-                            item_count=len(moved_items)
-                        )
-                        if success:
-                            email_msg = "\nEmail sent successfully"
-                        else:
-                            email_msg = f"\nEmail failed: {msg}"
-
-                    def show_success():
-                        self.admin_project_widgets[project]['active_page'] = 0
-                        self.admin_project_widgets[project]['archived_page'] = 0
-                        self._refresh_admin_active_inventory(project)
-                        self._refresh_admin_archived_inventory(project)
-                        self._play_success_sound()
-                        dialog = ctk.CTkToplevel(self)
-                        dialog.title("Export Complete")
-                        dialog.geometry("350x120")
-                        dialog.resizable(False, False)
-                        dialog.transient(self)
-                        ctk.CTkLabel(dialog, text=f"Exported {len(moved_items)} items{email_msg}", font=ctk.CTkFont(size=14)).pack(pady=20)
-                        ctk.CTkButton(dialog, text="OK", width=80, command=dialog.destroy).pack()
-                        dialog.wait_visibility()
-                        dialog.grab_set()
-
-                    self.after(0, show_success)
-                else:
-                    self.after(0, lambda: self._show_admin_status("Failed to export CSV", project, error=True))
+                try:
+                    moved_count = export_active_inventory(project, filepath, update_progress, cancel_event)
+                finally:
+                    self.after(0, progress_dialog.destroy)
+
+                email_msg = ""
+                email_settings = get_email_settings()
+                if email_settings["enabled"] and email_settings["sender_email"] and email_settings["recipients"]:
+                    success, msg = send_csv_email(
+                        smtp_server=email_settings["smtp_server"],
+                        smtp_port=email_settings["smtp_port"],
+                        sender_email=email_settings["sender_email"],
+                        sender_password=email_settings["sender_password"],
+                        recipients=email_settings["recipients"],
+                        csv_filepath=filepath,
+                        project=project,
+                        item_count=moved_count
+                    )
+                    if success:
+                        email_msg = "\nEmail sent successfully"
+                    else:
+                        email_msg = f"\nEmail failed: {msg}"
+
+                def show_success():
+                    self.admin_project_widgets[project]['active_page'] = 0
+                    self.admin_project_widgets[project]['archived_page'] = 0
+                    self._refresh_admin_active_inventory(project)
+                    self._refresh_admin_archived_inventory(project)
+                    self._play_success_sound()
+                    dialog = ctk.CTkToplevel(self)
+                    dialog.title("Export Complete")
+                    dialog.geometry("350x120")
+                    dialog.resizable(False, False)
+                    dialog.transient(self)
+                    ctk.CTkLabel(dialog, text=f"Exported {moved_count} items{email_msg}", font=ctk.CTkFont(size=14)).pack(pady=20)
+                    ctk.CTkButton(dialog, text="OK", width=80, command=dialog.destroy).pack()
+                    dialog.wait_visibility()
+                    dialog.grab_set()
+
+                self.after(0, show_success)
+            except ExportCancelled:
+                self.after(0, lambda: self._show_admin_status("Export cancelled", project, error=True))
             except Exception as e:
-                self.after(0, lambda: self._show_admin_status(f"Export failed: {str(e)}", project, error=True))
+                message = f"Export failed: {str(e)}"
+                self.after(0, lambda: self._show_admin_status(message, project, error=True))
 
         threading.Thread(target=do_export, daemon=True).start()
 
     def _export_all_archived_inventory(self, project: str = "ecoflow"):
-        """Export ALL archived inventory items from remote database to CSV."""
-        from database.inventory_cache import _get_remote_imported_connection
-
-        # Show loading dialog
-        loading_dialog = ctk.CTkToplevel(self)
-        loading_dialog.title("Exporting...")
-        loading_dialog.geometry("300x100")
-        loading_dialog.resizable(False, False)
-        loading_dialog.transient(self)
-        ctk.CTkLabel(loading_dialog, text="Fetching all archived items...", font=ctk.CTkFont(size=14)).pack(pady=30)
-        loading_dialog.update()
-
-        def fetch_and_export():
-            try:
-                # Fetch ALL items from remote database
-                remote_conn = _get_remote_imported_connection(project)
-                remote_cursor = remote_conn.cursor()
-
-                remote_cursor.execute("""
-                    SELECT item_sku, serial_number, lpn, location, repair_state,
-                           entered_by, created_at, imported_at, order_number
-                    FROM imported_inventory
-                    ORDER BY imported_at DESC
-                """)
-                items = remote_cursor.fetchall()
-                remote_conn.close()
-
-                # Close loading dialog and show file picker on main thread
-                self.after(0, lambda: self._finish_archived_export(loading_dialog, items, project))
+        """Export archived inventory (all, or one archive date range) to CSV."""
+        dialog = ctk.CTkToplevel(self)
+        dialog.title("Export Archived Inventory")
+        dialog.geometry("360x230")
+        dialog.resizable(False, False)
+        dialog.transient(self)
 
-            except Exception as e:
-                self.after(0, lambda: self._show_archived_export_error(loading_dialog, str(e)))
+        ctk.CTkLabel(
+            dialog,
+            text="Archived between (YYYY-MM-DD, blank = all):",
+            font=ctk.CTkFont(size=14)
+        ).pack(pady=(20, 10))
 
-        # Run in background thread
-        import threading
-        thread = threading.Thread(target=fetch_and_export, daemon=True)
-        thread.start()
+        range_frame = ctk.CTkFrame(dialog, fg_color="transparent")
+        range_frame.pack()
+        from_entry = ctk.CTkEntry(range_frame, width=120, placeholder_text="From")
+        from_entry.pack(side="left", padx=5)
+        ctk.CTkLabel(range_frame, text="to").pack(side="left")
+        to_entry = ctk.CTkEntry(range_frame, width=120, placeholder_text="To")
+        to_entry.pack(side="left", padx=5)
 
-    def _finish_archived_export(self, loading_dialog, items, project: str):
-        """Finish the archived export after fetching data."""
-        loading_dialog.destroy()
+        error_label = ctk.CTkLabel(dialog, text="", text_color="red", font=ctk.CTkFont(size=12))
+        error_label.pack(pady=(5, 0))
 
-        if not items:
-            dialog = ctk.CTkToplevel(self)
-            dialog.title("Export")
-            dialog.geometry("300x100")
-            dialog.resizable(False, False)
-            dialog.transient(self)
-            ctk.CTkLabel(dialog, text="No archived items to export", font=ctk.CTkFont(size=14)).pack(pady=20)
-            ctk.CTkButton(dialog, text="OK", width=80, command=dialog.destroy).pack()
-            dialog.wait_visibility()
-            dialog.grab_set()
-            return
+        def parse_date(text: str):
+            text = text.strip()
+            return datetime.strptime(text, "%Y-%m-%d").date() if text else None
 
+        def on_export():
+            try:
+                date_from = parse_date(from_entry.get())
+                date_to = parse_date(to_entry.get())
+            except ValueError:
+                error_label.configure(text="Dates must look like 2025-01-31")
+                return
+            if date_from and date_to and date_from > date_to:
+                error_label.configure(text="'From' is after 'To'")
+                return
+            dialog.destroy()
+            self._start_archived_export(project, date_from, date_to)
+
+        button_frame = ctk.CTkFrame(dialog, fg_color="transparent")
+        button_frame.pack(pady=15)
+        ctk.CTkButton(button_frame, text="Export", width=100, command=on_export).pack(side="left", padx=5)
+        ctk.CTkButton(button_frame, text="Cancel", width=100, fg_color="#6c757d", hover_color="#5a6268",
+                      command=dialog.destroy).pack(side="left", padx=5)
+
+        dialog.wait_visibility()
+        dialog.grab_set()
+
+    def _start_archived_export(self, project: str, date_from=None, date_to=None):
+        """Ask for a file and stream the archived rows into it in the background."""
         # Generate filename
         now = datetime.now().strftime("%Y-%m-%d %H-%M-%S")
         project_name = project.capitalize()
-        default_filename = f"{project_name} archived inventory({now}).csv"
+        if date_from or date_to:
+            period = f"{date_from or 'start'} to {date_to or now[:10]}"
+            default_filename = f"{project_name} archived inventory {period}({now}).csv"
+        else:
+            default_filename = f"{project_name} archived inventory({now}).csv"
 
         # Ask user where to save
         filepath = filedialog.asksaveasfilename(
@@ -2695,56 +2930,39 @@ Start-Sleep -Seconds 3
         if not filepath:
             return  # User cancelled
 
-        try:
-            # Write CSV
-            with open(filepath, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
+        progress_dialog, update_progress, cancel_event = self._open_progress_dialog(
+            "Exporting...", "Exporting archived items..."
+        )
 
-                # Header row
-                if project == "halo":
-                    writer.writerow(["SKU", "Serial Number", "LPN", "Repair State", "Entered By", "Created", "Archived"])
+        def do_export():
+            try:
+                try:
+                    count = export_archived_inventory(project, filepath, date_from, date_to,
+                                                      update_progress, cancel_event)
+                finally:
+                    self.after(0, progress_dialog.destroy)
+                if count:
+                    message = f"Exported {count} archived items"
                 else:
-                    writer.writerow(["SKU", "Serial Number", "LPN", "Order #", "Repair State", "Entered By", "Created", "Archived"])
-
-                # Data rows
-                for item in items:
-                    sku, serial, lpn, loc, state, entered, created, archived, order = item
-                    if project == "halo":
-                        writer.writerow([sku, serial, lpn, state, entered, created, archived])
-                    else:
-                        writer.writerow([sku, serial, lpn, order or '', state, entered, created, archived])
-
-            # Show success dialog
-            dialog = ctk.CTkToplevel(self)
-            dialog.title("Export Complete")
-            dialog.geometry("350x120")
-            dialog.resizable(False, False)
-            dialog.transient(self)
-            ctk.CTkLabel(dialog, text=f"Exported {len(items)} archived items", font=ctk.CTkFont(size=14)).pack(pady=20)
-            ctk.CTkButton(dialog, text="OK", width=80, command=dialog.destroy).pack()
-            dialog.wait_visibility()
-            dialog.grab_set()
+                    os.remove(filepath)  # Header-only file
+                    message = "No archived items to export"
+                self.after(0, lambda: self._show_archived_export_result("Export Complete", message))
+            except ExportCancelled:
+                pass
+            except Exception as e:
+                message = f"Export failed: {str(e)}"
+                self.after(0, lambda: self._show_archived_export_result("Export Error", message))
 
-        except Exception as e:
-            dialog = ctk.CTkToplevel(self)
-            dialog.title("Export Error")
-            dialog.geometry("350x120")
-            dialog.resizable(False, False)
-            dialog.transient(self)
-            ctk.CTkLabel(dialog, text=f"Export failed: {str(e)}", font=ctk.CTkFont(size=14)).pack(pady=20)
-            ctk.CTkButton(dialog, text="OK", width=80, command=dialog.destroy).pack()
-            dialog.wait_visibility()
-            dialog.grab_set()
+        threading.Thread(target=do_export, daemon=True).start()
 
-    def _show_archived_export_error(self, loading_dialog, error_msg: str):
-        """Show error dialog for archived export."""
-        loading_dialog.destroy()
+    def _show_archived_export_result(self, title: str, message: str):
+        """Show the outcome of an archived export."""
         dialog = ctk.CTkToplevel(self)
-        dialog.title("Export Error")
+        dialog.title(title)
         dialog.geometry("350x120")
         dialog.resizable(False, False)
         dialog.transient(self)
-        ctk.CTkLabel(dialog, text=f"Failed to fetch data: Network error", font=ctk.CTkFont(size=14)).pack(pady=20)
+        ctk.CTkLabel(dialog, text=message, font=ctk.CTkFont(size=14)).pack(pady=20)
         ctk.CTkButton(dialog, text="OK", width=80, command=dialog.destroy).pack()
         dialog.wait_visibility()
         dialog.grab_set()
@@ -2888,9 +3106,12 @@ Start-Sleep -Seconds 3
             self._show_admin_status("LPN must be exactly 11 alphanumeric characters", project, error=True)
             return
 
+        if not self._confirm_new_serial(serial, project, self._show_admin_status):
+            return
+
         # Save to inventory database
         try:
-            add_inventory_item(
+            if not add_inventory_item(
                 item_sku=sku,
                 serial_number=serial,
                 lpn=lpn,
@@ -2900,7 +3121,9 @@ Start-Sleep -Seconds 3
                 project=project,
                 order_number=order_number,
                 tracking_number=tracking_number
-            )
+            ):
+                self._show_admin_status(f"Failed to save: serial {serial} may already exist", project, error=True)
+                return
             self._show_admin_status("Entry submitted successfully", project, error=False)
             self._play_success_sound()
         except Exception as e:
@@ -3170,7 +3393,9 @@ Start-Sleep -Seconds 3
 
         # Fetch data in background thread
         def fetch_data():
-            users = get_all_users()[:20]  # Limit to 20 items
+            users = get_all_users()
+            save_users_to_local(users)  # Keep offline login in step with admin changes
+            users = users[:20]  # Limit to 20 items
             self.after(0, lambda: self._populate_user_list(users))
 
         thread = threading.Thread(target=fetch_data, daemon=True)
@@ -3254,6 +3479,7 @@ Start-Sleep -Seconds 3
             if update_user_admin_status(username, new_status):
                 status_text = "granted admin access" if new_status else "removed from admin"
                 self._show_status(f"User '{username}' {status_text}", error=False)
+                threading.Thread(target=sync_users_from_remote, daemon=True).start()
             else:
                 self._show_status(f"Failed to update admin status for '{username}'", error=True)
                 self._refresh_user_list()  # Refresh to reset toggle state
@@ -3326,6 +3552,7 @@ Start-Sleep -Seconds 3
             if update_user_password(username, password_hash):
                 dialog.destroy()
                 self._show_status(f"Password reset for '{username}'", error=False)
+                threading.Thread(target=sync_users_from_remote, daemon=True).start()
             else:
                 status_label.configure(text="Failed to reset password")
                 self._play_error_sound()
@@ -1,17 +1,29 @@
+import threading
 import customtkinter as ctk
 from PIL import Image, ImageTk
 from database import get_user_by_username
+from database.connection import get_remote_status, is_remote_online
+from database.user_cache import get_user_cached, get_offline_user, cache_user
 from utils import verify_password, get_gui_resource
 
 
 class LoginWindow(ctk.CTk):
     """Login window for The-Uplink application."""
 
+    # Remote status indicator text and color
+    REMOTE_STATUS_DISPLAY = {
+        "connecting": ("P: drive connecting...", "orange"),
+        "online": ("P: drive online", "green"),
+        "offline": ("P: drive offline - using local data", "red"),
+    }
+
     def __init__(self, on_login_success: callable):
         super().__init__()
 
         self.on_login_success = on_login_success
         self.logged_in_user = None
+        self._login_in_progress = False
+        self._status_poll_id = None
 
         self.title("The-Uplink - Login")
         self.geometry("400x400")
@@ -33,6 +45,7 @@ class LoginWindow(ctk.CTk):
 
         self._center_window()
         self._create_widgets()
+        self._poll_remote_status()
 
     def _center_window(self):
         """Center the window on the screen."""
@@ -93,20 +106,53 @@ class LoginWindow(ctk.CTk):
         self.error_label.pack(pady=(0, 10))
 
         # Login button
-        login_button = ctk.CTkButton(
+        self.login_button = ctk.CTkButton(
             main_frame,
             text="Login",
             width=320,
             font=ctk.CTkFont(size=14),
             command=self._handle_login
         )
-        login_button.pack()
+        self.login_button.pack()
+
+        # Remote (P: drive) status
+        self.remote_status_label = ctk.CTkLabel(
+            main_frame,
+            text="",
+            font=ctk.CTkFont(size=12)
+        )
+        self.remote_status_label.pack(pady=(15, 0))
 
         # Bind Enter key to login
         self.bind("<Return>", lambda e: self._handle_login())
 
+    def _poll_remote_status(self):
+        """Update the P: drive status indicator."""
+        text, color = self.REMOTE_STATUS_DISPLAY.get(get_remote_status(), ("", "gray"))
+        self.remote_status_label.configure(text=text, text_color=color)
+        self._status_poll_id = self.after(1000, self._poll_remote_status)
+
+    def destroy(self):
+        """Stop status polling before closing."""
+        if self._status_poll_id is not None:
+            try:
+                self.after_cancel(self._status_poll_id)
+            except Exception:
+                pass
+            self._status_poll_id = None
+        super().destroy()
+
     def _handle_login(self):
-        """Handle login button click."""
+        """Handle login button click.
+
+        Checks the remote (in a background thread) while the P: drive is
+        reachable, so reset passwords and revoked admin rights take effect at
+        once. Offline, or if the remote check can't complete, falls back to the
+        local user cache within its age limits (see database/user_cache.py).
+        """
+        if self._login_in_progress:
+            return
+
         username = self.username_entry.get().strip()
         password = self.password_entry.get()
 
@@ -114,15 +160,67 @@ class LoginWindow(ctk.CTk):
             self._show_error("Please enter username and password")
             return
 
-        user = get_user_by_username(username)
+        if not is_remote_online():
+            self._login_offline(username, password)
+            return
+
+        self._login_in_progress = True
+        self.login_button.configure(state="disabled", text="Checking...")
+        self._show_error("")
 
-        if user and verify_password(password, user["password_hash"]):
-            self.logged_in_user = user
-            self.destroy()
-            self.on_login_success(user)
+        def check_remote():
+            remote_user = None
+            failed = False
+            try:
+                user = get_user_by_username(username)
+                if user and verify_password(password, user["password_hash"]):
+                    remote_user = user
+                    cache_user(user)
+            except Exception:
+                failed = True
+            try:
+                self.after(0, lambda: self._finish_remote_login(username, password, remote_user, failed))
+            except Exception:
+                pass  # Window was closed meanwhile
+
+        threading.Thread(target=check_remote, daemon=True).start()
+
+    def _finish_remote_login(self, username: str, password: str, user: dict | None, failed: bool):
+        """Handle the result of a remote login check (on the main thread)."""
+        self._login_in_progress = False
+        self.login_button.configure(state="normal", text="Login")
+
+        if user:
+            self._complete_login(user)
+        elif failed:
+            self._login_offline(username, password)
         else:
             self._show_error("Invalid username or password")
 
+    def _login_offline(self, username: str, password: str):
+        """Log in from the local user cache (the P: drive can't be reached)."""
+        try:
+            cached_user = get_user_cached(username)
+        except Exception:
+            cached_user = None
+
+        if not cached_user:
+            self._show_error("P: drive offline - log in once while connected")
+        elif not verify_password(password, cached_user["password_hash"]):
+            self._show_error("Invalid username or password")
+        else:
+            user = get_offline_user(cached_user)
+            if user:
+                self._complete_login(user)
+            else:
+                self._show_error("P: drive offline - saved login expired, connect to log in")
+
+    def _complete_login(self, user: dict):
+        """Close the login window and hand off to the main application."""
+        self.logged_in_user = user
+        self.destroy()
+        self.on_login_success(user)
+
     def _show_error(self, message: str):
         """Display an error message."""
         self.error_label.configure(text=message)
@@ -1,10 +1,13 @@
 #!/usr/bin/env python3
 """The-Uplink - Main entry point."""
 
+import threading
+
 import customtkinter as ctk
 from database import init_db, init_inventory_db, create_user, get_user_by_username
 from database.sku_cache import init_sku_cache
 from database.inventory_cache import init_inventory_cache
+from database.user_cache import init_user_cache, sync_users_from_remote
 from utils import hash_password
 from gui import LoginWindow, MainApplication
 
@@ -21,10 +24,28 @@ def create_default_user():
     """Create default admin user if no users exist."""
     if get_user_by_username(DEFAULT_USERNAME) is None:
         password_hash = hash_password(DEFAULT_PASSWORD)
-        create_user(DEFAULT_USERNAME, password_hash)
+        create_user(DEFAULT_USERNAME, password_hash, is_admin=True)
         print(f"Created default user: {DEFAULT_USERNAME} / {DEFAULT_PASSWORD}")
 
 
+def init_remote():
+    """Initialize the shared databases on P: and refresh the local user cache.
+
+    Runs in a background thread so the login window never waits on the VPN.
+    """
+    try:
+        init_db()
+        for project in ["ecoflow", "halo", "ams_ine"]:
+            init_inventory_db(project)
+
+        # Create default user if needed
+        create_default_user()
+
+        sync_users_from_remote()
+    except Exception as e:
+        print(f"Remote initialization failed, working from local caches: {e}")
+
+
 def close_splash():
     """Close the splash screen if running as frozen executable."""
     try:
@@ -49,19 +70,13 @@ def run_app():
 
 def main():
     """Main entry point."""
-    # Initialize databases
-    init_db()
-    for project in ["ecoflow", "halo", "ams_ine"]:
-        init_inventory_db(project)
-
-    # Initialize SKU cache
+    # Initialize local caches (AppData only, no network)
+    init_user_cache()
     init_sku_cache()
-
-    # Initialize inventory cache (local-first for fast submits)
     init_inventory_cache()
 
-    # Create default user if needed
-    create_default_user()
+    # Reconcile with the P: drive in the background
+    threading.Thread(target=init_remote, daemon=True).start()
 
     # Run the application
     run_app()
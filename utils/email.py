@@ -1,12 +1,85 @@
 """Email utility for sending CSV exports."""
 
+import base64
+import re
 import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
+import uuid
+from email import policy
 from email.mime.text import MIMEText
-from email import encoders
+from email.utils import formatdate, make_msgid
 from pathlib import Path
 
+# Bytes of the attachment read per chunk (a multiple of 57 = one 76-char base64 line)
+ATTACHMENT_CHUNK_SIZE = 57 * 1024
+
+
+def _iter_csv_message(sender_email: str, recipient_list: list, subject: str, body: str, csv_filepath: str):
+    """Generate a multipart message with the CSV attached, as CRLF-terminated byte chunks.
+
+    The attachment is read and base64-encoded one chunk at a time, so the
+    message is never held in memory as a whole.
+    """
+    boundary = f"===============uplink{uuid.uuid4().hex}=="
+    filename = Path(csv_filepath).name
+
+    yield (
+        f"From: {sender_email}\r\n"
+        f"To: {', '.join(recipient_list)}\r\n"
+        f"Subject: {subject}\r\n"
+        f"Date: {formatdate(localtime=True)}\r\n"
+        f"Message-ID: {make_msgid()}\r\n"
+        "MIME-Version: 1.0\r\n"
+        f'Content-Type: multipart/mixed; boundary="{boundary}"\r\n'
+        "\r\n"
+        f"--{boundary}\r\n"
+    ).encode('utf-8')
+
+    yield MIMEText(body, "plain").as_bytes(policy=policy.SMTP)
+
+    yield (
+        f"\r\n--{boundary}\r\n"
+        "Content-Type: application/octet-stream\r\n"
+        "Content-Transfer-Encoding: base64\r\n"
+        f"Content-Disposition: attachment; filename={filename}\r\n"
+        "\r\n"
+    ).encode('utf-8')
+
+    with open(csv_filepath, "rb") as f:
+        while True:
+            chunk = f.read(ATTACHMENT_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield base64.encodebytes(chunk).replace(b"\n", b"\r\n")
+
+    yield f"--{boundary}--\r\n".encode('utf-8')
+
+
+def _send_streaming(server: smtplib.SMTP, sender_email: str, recipient_list: list, chunks):
+    """Send a message chunk by chunk (smtplib's sendmail() needs it all in memory)."""
+    code, resp = server.mail(sender_email)
+    if code != 250:
+        raise smtplib.SMTPSenderRefused(code, resp, sender_email)
+
+    refused = {}
+    for recipient in recipient_list:
+        code, resp = server.rcpt(recipient)
+        if code not in (250, 251):
+            refused[recipient] = (code, resp)
+    if len(refused) == len(recipient_list):
+        server.rset()
+        raise smtplib.SMTPRecipientsRefused(refused)
+
+    code, resp = server.docmd("DATA")
+    if code != 354:
+        raise smtplib.SMTPDataError(code, resp)
+    for chunk in chunks:
+        # Chunks end on line boundaries; escape lines starting with "." (RFC 5321)
+        server.send(re.sub(rb"(?m)^\.", b"..", chunk))
+    server.send(b".\r\n")
+    code, resp = server.getreply()
+    if code != 250:
+        raise smtplib.SMTPDataError(code, resp)
+
 
 def send_csv_email(
     smtp_server: str,
@@ -39,11 +112,7 @@ def send_csv_email(
         if not recipient_list:
             return False, "No recipients configured"
 
-        # Create message
-        msg = MIMEMultipart()
-        msg["From"] = sender_email
-        msg["To"] = ", ".join(recipient_list)
-        msg["Subject"] = f"{project.capitalize()} Inventory Export - {item_count} items"
+        subject = f"{project.capitalize()} Inventory Export - {item_count} items"
 
         # Email body
         body = f"""Inventory export from The-Uplink
@@ -54,24 +123,16 @@ File: {Path(csv_filepath).name}
 
 This is an automated message.
 """
-        msg.attach(MIMEText(body, "plain"))
-
-        # Attach CSV file
-        with open(csv_filepath, "rb") as f:
-            part = MIMEBase("application", "octet-stream")
-            part.set_payload(f.read())
-            encoders.encode_base64(part)
-            part.add_header(
-                "Content-Disposition",
-                f"attachment; filename={Path(csv_filepath).name}"
-            )
-            msg.attach(part)
-
-        # Send email
+        # Fail before connecting if the file is missing
+        if not Path(csv_filepath).is_file():
+            raise FileNotFoundError(csv_filepath)
+
+        # Send email, streaming the CSV attachment from disk
         with smtplib.SMTP(smtp_server, smtp_port, timeout=30) as server:
             server.starttls()
             server.login(sender_email, sender_password)
-            server.sendmail(sender_email, recipient_list, msg.as_string())
+            _send_streaming(server, sender_email, recipient_list,
+                            _iter_csv_message(sender_email, recipient_list, subject, body, csv_filepath))
 
         return True, f"Email sent to {len(recipient_list)} recipient(s)"
 